@@ -3,6 +3,10 @@ ASGI config for GNET project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with daphne (``daphne GNET.asgi:application``) so the live updates
+stream (/api/org/live/) holds open connections without a thread each, and
+the hot read endpoints run as async views.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +16,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'GNET.settings')
+# Serve the async variants of the hot read endpoints (see GNET/async_api.py)
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
 
 application = get_asgi_application()
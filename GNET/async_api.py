@@ -0,0 +1,39 @@
+"""
+Helpers for the async read path.
+
+The hottest public reads have `async def` variants next to their DRF
+versions (members, organization and finance views.py). They use the async
+ORM, so under ASGI (GNET.asgi, daphne) a slow query parks a coroutine
+instead of holding a worker thread. urls.py routes to them when
+settings.ASYNC_READ_VIEWS is on, which GNET/asgi.py does by default;
+WSGI deployments (gunicorn) keep the sync views.
+
+Independent queries are awaited together with asyncio.gather. Django still
+runs each async ORM call through sync_to_async on the request's own
+thread, so gathered queries don't use parallel connections; where that
+matters the views fold them into one query instead (finance_summary).
+
+Each async view builds its querysets and payload with the same helpers as
+its sync twin, and the apps' tests check both return identical responses
+(GNET.testing.sync_and_async). `python manage.py bench_read_path`
+compares the two under load.
+
+These are plain Django views, not DRF: no content negotiation or
+browsable API. The JSON is rendered with DRF's default renderer so the
+bytes match the sync endpoints.
+"""
+from django.http import HttpResponse
+from rest_framework.settings import api_settings
+
+NOT_AUTHENTICATED = 'Authentication credentials were not provided.'
+
+
+def json_response(data, status=200):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+async def authenticated_user(request):
+    """The session user, or None (DRF's IsAuthenticated answers 403 for session auth)."""
+    user = await request.auser()
+    return user if user.is_authenticated else None
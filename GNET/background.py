@@ -0,0 +1,53 @@
+"""
+Minimal in-process background jobs.
+
+Work that shouldn't hold up a response (image resizing, emails) is handed
+to a small thread pool once the current transaction commits, so the job
+always sees the rows the request wrote. Jobs must be idempotent and have a
+management command that re-runs anything left unfinished, because a worker
+restart drops whatever is still queued.
+
+Set BACKGROUND_TASKS_SYNC = True to run jobs inline (tests, debugging).
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+            thread_name_prefix='gnet-background',
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s.%s failed", func.__module__, func.__name__)
+    finally:
+        # Each worker thread has its own connections; don't leak them
+        connections.close_all()
+
+
+def submit(func, *args, **kwargs):
+    """Run func(*args, **kwargs) in the background right away."""
+    if getattr(settings, 'BACKGROUND_TASKS_SYNC', False):
+        func(*args, **kwargs)
+        return
+    _get_executor().submit(_run, func, args, kwargs)
+
+
+def submit_on_commit(func, *args, **kwargs):
+    """Run func(*args, **kwargs) in the background after the current transaction commits."""
+    transaction.on_commit(lambda: submit(func, *args, **kwargs))
@@ -0,0 +1,229 @@
+"""
+In-process broadcast hub for server-sent events.
+
+Model signals publish() small JSON payloads; every connected SSE client
+(organization.views.live_stream) holds an asyncio.Queue subscribed to the
+hub. An idle client is just a coroutine waiting on its queue, so thousands
+of them cost a few KB each and no threads.
+
+The last LIVE_EVENTS_BUFFER messages are kept in a ring buffer so a client
+reconnecting with Last-Event-ID gets what it missed.
+
+With several worker processes, a publish in one worker has to reach
+clients connected to the others. That is the backend's job, chosen with
+settings.LIVE_EVENTS_BACKEND:
+
+- 'GNET.broadcast.InProcessBackend' (default): single worker, nothing to fan out.
+- 'GNET.broadcast.UnixDatagramBackend': each worker binds a datagram
+  socket in LIVE_EVENTS_SOCKET_DIR and publishes to every socket there.
+  Works for any number of workers on one host, no extra services.
+  A message bigger than one datagram (MAX_DATAGRAM) reaches the other
+  workers' clients as a `reset` event naming the original event, so they
+  refetch instead of silently missing it.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+BUFFER_SIZE = getattr(settings, 'LIVE_EVENTS_BUFFER', 500)
+# A client whose queue is this far behind is dropped (it will reconnect and resume)
+MAX_QUEUE = 1000
+# Receive buffer of UnixDatagramBackend; anything longer would arrive truncated
+MAX_DATAGRAM = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class Message:
+    __slots__ = ('id', 'event', 'data')
+
+    def __init__(self, id, event, data):
+        self.id = id
+        self.event = event
+        self.data = data
+
+    def encode(self):
+        lines = [f'id: {self.id}', f'event: {self.event}']
+        lines += [f'data: {line}' for line in self.data.split('\n')]
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    def __init__(self, hub, loop):
+        self.hub = hub
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=MAX_QUEUE)
+        self.overflowed = False
+
+    def deliver(self, message):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+
+    def subscribe(self):
+        """
+        Register a subscriber on the running event loop. Call it from the
+        coroutine that will consume the queue (e.g. inside the streaming
+        generator), not from code that may run on a temporary loop.
+        """
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def replay(self, last_id):
+        """
+        Buffered messages newer than `last_id`, or None if `last_id` is older
+        than the buffer (the client missed too much and should refetch).
+
+        However full the buffer is: after a restart, or on a worker that
+        started later, the client's last message may predate everything
+        this process has seen, and what came in between is gone.
+        """
+        with self._lock:
+            buffered = list(self._buffer)
+        if not buffered:
+            return None if last_id else []
+        if last_id >= buffered[-1].id:
+            return []
+        if last_id < buffered[0].id - 1:
+            return None
+        return [message for message in buffered if message.id > last_id]
+
+    def dispatch(self, message):
+        """Buffer a message and hand it to every local subscriber (thread-safe)."""
+        with self._lock:
+            self._buffer.append(message)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # Loop already closed; the subscriber is gone
+                self.unsubscribe(subscription)
+
+
+# ==================== BACKENDS ====================
+
+_sequence = itertools.count()
+
+
+def next_id():
+    """Roughly time-ordered across workers, unique within one."""
+    return time.time_ns() // 1000 * 1000 + next(_sequence) % 1000
+
+
+class InProcessBackend:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, message):
+        self.hub.dispatch(message)
+
+
+class UnixDatagramBackend(InProcessBackend):
+    """Fan out to every worker on the host via unix datagram sockets."""
+
+    def __init__(self, hub):
+        super().__init__(hub)
+        self.directory = getattr(settings, 'LIVE_EVENTS_SOCKET_DIR', os.path.join(tempfile.gettempdir(), 'gnet-live'))
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f'{os.getpid()}.sock')
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.receiver.bind(self.path)
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        threading.Thread(target=self._receive, name='gnet-live-receiver', daemon=True).start()
+
+    def _receive(self):
+        while True:
+            payload = self.receiver.recv(MAX_DATAGRAM)
+            try:
+                data = json.loads(payload)
+                self.hub.dispatch(Message(data['id'], data['event'], data['data']))
+            except (ValueError, KeyError):
+                continue
+
+    @staticmethod
+    def _datagram(message):
+        return json.dumps({'id': message.id, 'event': message.event, 'data': message.data}).encode('utf-8')
+
+    def publish(self, message):
+        self.hub.dispatch(message)
+        payload = self._datagram(message)
+        if len(payload) > MAX_DATAGRAM:
+            logger.warning(
+                "Live event %s (%s) is %d bytes, over the %d-byte fan-out limit; other workers get a reset",
+                message.id, message.event, len(payload), MAX_DATAGRAM,
+            )
+            payload = self._datagram(Message(message.id, 'reset', json.dumps({'event': message.event})))
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith('.sock'):
+                continue
+            try:
+                self.sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # A worker that exited without cleaning up
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError:
+                logger.exception("Live event fan-out to %s failed", name)
+
+
+hub = Hub()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_path = getattr(settings, 'LIVE_EVENTS_BACKEND', 'GNET.broadcast.InProcessBackend')
+                _backend = import_string(backend_path)(hub)
+    return _backend
+
+
+def publish(event, payload):
+    """Send `payload` (anything DRF can serialize) to every connected client as `event`."""
+    message = Message(next_id(), event, json.dumps(payload, cls=JSONEncoder, ensure_ascii=False))
+    get_backend().publish(message)
+    return message.id
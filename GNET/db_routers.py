@@ -0,0 +1,134 @@
+"""
+Primary/replica database routing.
+
+Reads go to the replica alias (settings.DATABASE_REPLICA_ALIAS, e.g. 'replica')
+only when it is safe to do so:
+
+- the current request is a safe method (GET/HEAD/OPTIONS), as marked by
+  ReplicaRoutingMiddleware, or code explicitly opted in with use_replica();
+- nothing has been written yet in this request (after the first write every
+  read is pinned to the primary, so you read your own writes);
+- we are not inside transaction.atomic() on the primary;
+- the client didn't write within the last DATABASE_REPLICA_PIN_SECONDS
+  (tracked with a cookie, covers replication lag on the next page load);
+- the model isn't a session (sessions always come from the primary).
+
+Everything else, and every write, goes to 'default'. If no replica is
+configured the router is a no-op.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_allowed = ContextVar('replica_allowed', default=False)
+_wrote_to_primary = ContextVar('wrote_to_primary', default=False)
+
+PIN_COOKIE = 'db_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Session lookups authenticate every request; a lagging replica would log people out
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+@contextmanager
+def use_replica():
+    """Allow replica reads outside a safe request, e.g. in a reporting job."""
+    token = _replica_allowed.set(True)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Force every read in the block onto the primary."""
+    token = _replica_allowed.set(False)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias is None or not _replica_allowed.get() or _wrote_to_primary.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        _wrote_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Marks safe requests as replica-eligible and pins clients to the primary
+    for a few seconds after they write. Works in sync and async mode; the
+    context variables follow the request into sync_to_async ORM calls.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        pinned = request.COOKIES.get(PIN_COOKIE) == '1'
+        return (
+            _replica_allowed.set(request.method in SAFE_METHODS and not pinned),
+            _wrote_to_primary.set(False),
+        )
+
+    def _finish(self, response):
+        if _wrote_to_primary.get() and replica_alias():
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+                secure=settings.SESSION_COOKIE_SECURE,
+            )
+        return response
+
+    def _reset(self, tokens):
+        allowed, wrote = tokens
+        _replica_allowed.reset(allowed)
+        _wrote_to_primary.reset(wrote)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._start(request)
+        try:
+            return self._finish(self.get_response(request))
+        finally:
+            self._reset(tokens)
+
+    async def __acall__(self, request):
+        tokens = self._start(request)
+        try:
+            return self._finish(await self.get_response(request))
+        finally:
+            self._reset(tokens)
@@ -0,0 +1,78 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from GNET import renderers
+from GNET.renderers import FastJSONParser, FastJSONRenderer
+from GNET.tests import EDGE_CASES, sample_payloads
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that GNET.renderers.FastJSONRenderer/FastJSONParser produce the "
+        "same bytes/data as DRF's JSONRenderer/JSONParser (exits non-zero on a "
+        "mismatch), then compare their throughput on top-up and member directory "
+        "payloads. Uses unsaved model instances; nothing is written. The same "
+        "compatibility check runs in the test suite (GNET/tests.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed iterations per measurement')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING('⚠️ orjson is not installed; FastJSON* fall back to the stdlib.'))
+
+        payloads = sample_payloads(options['rows'])
+
+        mismatches = self._check(payloads)
+        if mismatches:
+            for name, detail in mismatches:
+                self.stdout.write(self.style.ERROR(f'❌ {name}: {detail}'))
+            raise CommandError(f'{len(mismatches)} compatibility mismatch(es)')
+        self.stdout.write(self.style.SUCCESS(f'✅ Byte-for-byte identical on {len(payloads)} payloads and {len(EDGE_CASES)} edge cases'))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'payload':<22}{'serialize':>12}{'DRF render':>12}{'fast render':>12}{'DRF parse':>12}{'fast parse':>12}{'size':>10}")
+        for name, (serializer_class, instances) in payloads.items():
+            serialize_time, data = self._time(lambda: serializer_class(instances, many=True).data, options['repeat'])
+            body = JSONRenderer().render(data)
+            drf_render, _ = self._time(lambda: JSONRenderer().render(data), options['repeat'])
+            fast_render, _ = self._time(lambda: FastJSONRenderer().render(data), options['repeat'])
+            drf_parse, _ = self._time(lambda: JSONParser().parse(io.BytesIO(body)), options['repeat'])
+            fast_parse, _ = self._time(lambda: FastJSONParser().parse(io.BytesIO(body)), options['repeat'])
+            self.stdout.write(
+                f'{name:<22}{serialize_time * 1000:>10.1f}ms{drf_render * 1000:>10.1f}ms{fast_render * 1000:>10.1f}ms'
+                f'{drf_parse * 1000:>10.1f}ms{fast_parse * 1000:>10.1f}ms{len(body) / 1024:>8.0f}KB'
+            )
+            self.stdout.write(
+                f"{'':<22}render x{drf_render / fast_render:.1f} faster, parse x{drf_parse / fast_parse:.1f} faster"
+            )
+
+    def _check(self, payloads):
+        mismatches = []
+        cases = [(f'edge:{name}', {name: value}) for name, value in EDGE_CASES.items()]
+        cases.append(('edge:all', EDGE_CASES))
+        cases += [(name, serializer_class(instances, many=True).data) for name, (serializer_class, instances) in payloads.items()]
+
+        for name, data in cases:
+            expected = JSONRenderer().render(data)
+            actual = FastJSONRenderer().render(data)
+            if expected != actual:
+                at = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+                mismatches.append((name, f'render differs at byte {at}: {expected[at - 20:at + 20]!r} vs {actual[at - 20:at + 20]!r}'))
+                continue
+            if JSONParser().parse(io.BytesIO(expected)) != FastJSONParser().parse(io.BytesIO(expected)):
+                mismatches.append((name, 'parsed data differs'))
+        return mismatches
+
+    def _time(self, func, repeat):
+        result = func()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return (time.perf_counter() - started) / repeat, result
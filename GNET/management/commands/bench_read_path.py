@@ -0,0 +1,190 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    '/api/members/count/',
+    '/api/members/directory/',
+    '/api/org/announcements/recent/',
+    '/api/org/events/next/',
+    '/api/org/stats/',
+]
+AUTHENTICATED_PATHS = ['/api/finance/summary/']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot read endpoints on a WSGI server (sync views) against '
+        'an ASGI server (async views) at high concurrency. Either point it at '
+        'running servers with --wsgi/--asgi, or pass --spawn to start '
+        '"gunicorn GNET.wsgi" and "daphne GNET.asgi" itself. Each path is '
+        'fetched over --concurrency keep-alive connections.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi', default='http://127.0.0.1:8010', help='Base URL of the WSGI server')
+        parser.add_argument('--asgi', default='http://127.0.0.1:8011', help='Base URL of the ASGI server')
+        parser.add_argument('--spawn', action='store_true', help='Start gunicorn and daphne on the --wsgi/--asgi ports')
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes for --spawn')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker for --spawn')
+        parser.add_argument('--concurrency', type=int, default=200, help='Open connections per run')
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per path and server')
+        parser.add_argument('--path', action='append', dest='paths', help='Path to fetch (repeatable); defaults to the async endpoints')
+        parser.add_argument('--session', help='sessionid cookie, to include /api/finance/summary/')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS + (AUTHENTICATED_PATHS if options['session'] else [])
+        cookie = f"sessionid={options['session']}" if options['session'] else None
+        targets = [('WSGI', options['wsgi']), ('ASGI', options['asgi'])]
+
+        servers = []
+        try:
+            if options['spawn']:
+                servers = self._spawn(options)
+            rows = []
+            for label, base in targets:
+                for path in paths:
+                    stats = asyncio.run(self._run(base, path, options['concurrency'], options['requests'], cookie))
+                    rows.append((label, path, stats))
+                    self.stdout.write(self._format(label, path, stats))
+        finally:
+            for process in servers:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=10)
+
+        self.stdout.write('')
+        for path in paths:
+            by_label = {label: stats for label, row_path, stats in rows if row_path == path}
+            wsgi, asgi = by_label.get('WSGI'), by_label.get('ASGI')
+            if wsgi and asgi and wsgi['rps']:
+                self.stdout.write(f"{path:<36} ASGI/WSGI throughput x{asgi['rps'] / wsgi['rps']:.2f}")
+
+    # ==================== SERVERS ====================
+
+    def _spawn(self, options):
+        wsgi, asgi = urlsplit(options['wsgi']), urlsplit(options['asgi'])
+        commands = [
+            [sys.executable, '-m', 'gunicorn', 'GNET.wsgi:application',
+             '-b', f'{wsgi.hostname}:{wsgi.port}', '-w', str(options['workers']),
+             '--threads', str(options['threads']), '--log-level', 'warning'],
+            [sys.executable, '-m', 'daphne', '-b', asgi.hostname, '-p', str(asgi.port), 'GNET.asgi:application'],
+        ]
+        env = {**os.environ, 'DEBUG': 'False'}
+        processes = []
+        for command, url in zip(commands, (wsgi, asgi)):
+            try:
+                processes.append(subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL))
+            except FileNotFoundError as e:
+                raise CommandError(f'❌ Could not start {command[2]}: {e}')
+            self._wait_for_port(url.hostname, url.port)
+            self.stdout.write(f'✅ Started {command[2]} on {url.hostname}:{url.port}')
+        if options['workers'] > 1:
+            self.stdout.write(
+                '⚠️ daphne runs a single process; compare per-process numbers or '
+                'put several daphne processes behind a balancer for a fair test.'
+            )
+        return processes
+
+    def _wait_for_port(self, host, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection((host, port), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'❌ Nothing listening on {host}:{port} after {timeout}s')
+
+    # ==================== LOAD ====================
+
+    async def _run(self, base, path, concurrency, total, cookie):
+        url = urlsplit(base)
+        host, port = url.hostname, url.port or 80
+        request = (
+            f'GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: application/json\r\n'
+            + (f'Cookie: {cookie}\r\n' if cookie else '')
+            + '\r\n'
+        ).encode()
+        remaining = [total]
+        latencies = []
+        errors = {}
+
+        async def client():
+            reader = writer = None
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(host, port)
+                    writer.write(request)
+                    status, keep_alive = await _read_response(reader)
+                    latencies.append(time.perf_counter() - started)
+                    if status != 200:
+                        errors[status] = errors.get(status, 0) + 1
+                    if not keep_alive:
+                        writer.close()
+                        reader = writer = None
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    if writer is not None:
+                        writer.close()
+                    reader = writer = None
+            if writer is not None:
+                writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+
+        return {
+            'rps': len(latencies) / elapsed if elapsed else 0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'errors': errors,
+        }
+
+    def _format(self, label, path, stats):
+        errors = ', '.join(f'{key}: {count}' for key, count in stats['errors'].items()) or 'none'
+        return (
+            f"{label:<5} {path:<36} {stats['rps']:>8.0f} req/s  "
+            f"p50 {stats['p50']:>7.1f}ms  p95 {stats['p95']:>7.1f}ms  p99 {stats['p99']:>7.1f}ms  errors: {errors}"
+        )
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, connection can be reused)."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get('connection', '').lower() != 'close'
@@ -0,0 +1,93 @@
+"""
+Project-wide cursor pagination (settings.REST_FRAMEWORK's DEFAULT_PAGINATION_CLASS).
+
+Pagination is opt-in per request: a list returns every row, as it did
+before pagination existed, until the client asks for pages with
+?page_size=, ?cursor= or ?envelope=. No list is ever cut short without
+telling the client how to get the rest.
+
+A paged request returns at most PAGE_SIZE rows (?page_size=, capped at
+MAX_PAGE_SIZE) in the order given by the view's `cursor_ordering`, e.g.
+
+    class MMFTopUpViewSet(viewsets.ModelViewSet):
+        cursor_ordering = ('-date', '-id')
+
+Views that don't set it page through their model's Meta.ordering plus the
+primary key. The first ordering field decides where a page starts, so it
+should be backed by an index (with the view's filters in front of it) to
+keep every page a single range scan, however deep the client goes.
+
+The body of a page is the same bare JSON array as the full list, and the
+neighbouring pages go in an RFC 8288 Link header:
+
+    Link: <https://.../api/finance/topups/?cursor=cD0y...>; rel="next"
+
+Clients that would rather read the links from the body pass ?envelope=1
+and get DRF's usual {"next": ..., "previous": ..., "results": [...]}.
+Actions with their own pagination_class (idea feed, milestone timelines,
+event archive) keep their envelope as before.
+"""
+from rest_framework import pagination
+from rest_framework.response import Response
+
+MAX_PAGE_SIZE = 200
+ENVELOPE_VALUES = ('1', 'true', 'yes')
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Cursor pagination with per-view ordering and a bare-array compatibility mode."""
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    envelope_query_param = 'envelope'
+
+    def _pages_requested(self, request):
+        params = (self.cursor_query_param, self.page_size_query_param, self.envelope_query_param)
+        return any(param in request.query_params for param in params)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            ordering = self._model_ordering(queryset.model)
+        return tuple(ordering)
+
+    def _model_ordering(self, model):
+        # Meta.ordering with the primary key as tie-breaker, in the same direction
+        ordering = [field for field in model._meta.ordering if isinstance(field, str) and '__' not in field]
+        if not ordering:
+            return ('-pk',)
+        if ordering[-1].lstrip('-') not in ('pk', 'id', model._meta.pk.name):
+            ordering.append('-pk' if ordering[0].startswith('-') else 'pk')
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.envelope = request.query_params.get(self.envelope_query_param, '').lower() in ENVELOPE_VALUES
+        if not self._pages_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.envelope:
+            return super().get_paginated_response(data)
+
+        links = [
+            f'<{url}>; rel="{rel}"'
+            for url, rel in ((self.get_next_link(), 'next'), (self.get_previous_link(), 'prev'))
+            if url
+        ]
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, status=200, headers=headers)
+
+    def get_paginated_response_schema(self, schema):
+        # Documents the default (compatibility) shape; ?envelope=1 wraps it
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.envelope_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to 1 to get {"next", "previous", "results"} instead of a bare array with a Link header.',
+            'schema': {'type': 'boolean'},
+        })
+        return parameters
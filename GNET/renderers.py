@@ -0,0 +1,101 @@
+"""
+Fast JSON rendering and parsing for DRF, backed by orjson when installed.
+
+orjson serializes dicts, lists, str, int, float, datetime, date, time and
+UUID natively in C; anything else (Decimal, lazy translation strings,
+querysets, timedelta, bytes) goes through DRF's own JSONEncoder.default,
+so the result matches rest_framework.renderers.JSONRenderer byte for byte:
+compact separators, raw UTF-8, "Z" for UTC datetimes and U+2028/U+2029
+escaped. Two exceptions: floats that need an exponent (|x| >= 1e16 or
+< 1e-4) come out as 1e16 rather than 1e+16, the same number to any JSON
+reader; and NaN/Infinity render as null where DRF's strict mode raises.
+
+Without orjson, or for anything orjson rejects (indented output, integers
+wider than 64 bits, non-UTF-8 request bodies), both classes fall back to
+DRF's stdlib implementation.
+
+Enabled project-wide in settings.REST_FRAMEWORK; per view use
+
+    renderer_classes = [FastJSONRenderer]
+    parser_classes = [FastJSONParser]
+
+GNET/tests.py checks compatibility; `python manage.py bench_json` measures throughput.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode('utf-8')
+PARAGRAPH_SEPARATOR = '\u2029'.encode('utf-8')
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Types orjson doesn't know, converted exactly as DRF's encoder would
+    return _encoder.default(obj)
+
+
+if orjson is not None:
+    # "Z" for UTC like DRF; int dict keys become strings like json.dumps
+    DUMPS_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it can."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.encoder_class is not JSONEncoder
+            or not self.compact
+            or self.ensure_ascii
+            or not self.strict
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=DUMPS_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits; the stdlib copes (or raises the usual error)
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same as DRF: these are valid JSON but end a line in JavaScript
+        if LINE_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028')
+        if PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it can."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        raw = stream.read() if stream is not None else b''
+        try:
+            # orjson rejects NaN/Infinity, like DRF does with STRICT_JSON
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+
+        # Let the stdlib parser have the final say (it accepts a few inputs
+        # orjson doesn't, e.g. integers wider than 64 bits) and word the error
+        return super().parse(io.BytesIO(raw), media_type, parser_context)
@@ -0,0 +1,239 @@
+"""
+Whole-response cache for public, read-mostly views.
+
+Cached entries are keyed on the host, path, (sorted) query string,
+the Accept header and the current version token of every dependency the
+view declares, e.g. 'organization.event'. Saving or deleting a model bumps
+its token (see organization/signals.py), which changes the key of every
+response built from it - nothing has to enumerate or delete old entries,
+they simply stop being looked up and age out.
+
+Views whose output changes with the clock (e.g. "next event") pass an
+`expires` callable returning the moment the response goes stale; the entry
+is dropped at that instant instead of waiting for a write.
+
+Every cacheable response carries an ETag and Cache-Control, and
+If-None-Match is answered with 304 straight from the cache, so browsers and
+CDNs can absorb most repeat traffic.
+
+Usage:
+
+    @cached_response(dependencies=['organization.announcement'])
+    @api_view(['GET'])
+    def recent_announcements(request): ...
+
+    class EventViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+        cache_dependencies = ['organization.event']
+
+Async views (see GNET/async_api.py) use @acached_response the same way.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+# How long the server keeps an entry (writes invalidate it sooner)
+CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60 * 60 * 24)
+# How long browsers/CDNs may reuse a response without revalidating;
+# they can't see our invalidations, so keep this short
+CLIENT_MAX_AGE = getattr(settings, 'RESPONSE_CACHE_MAX_AGE', 60)
+
+KEY_PREFIX = 'respcache'
+CACHEABLE_STATUSES = (200, 404)
+CACHEABLE_METHODS = ('GET', 'HEAD')
+
+
+# ==================== DEPENDENCY TOKENS ====================
+
+def _token_key(dependency):
+    return f'{KEY_PREFIX}:dep:{dependency}'
+
+
+def get_tokens(dependencies):
+    """Current version token for each dependency, creating missing ones."""
+    keys = {dependency: _token_key(dependency) for dependency in dependencies}
+    found = cache.get_many(keys.values())
+    tokens = []
+    for dependency in dependencies:
+        token = found.get(keys[dependency])
+        if token is None:
+            cache.add(keys[dependency], uuid.uuid4().hex, None)
+            token = cache.get(keys[dependency])
+        tokens.append(token)
+    return tokens
+
+
+async def aget_tokens(dependencies):
+    keys = {dependency: _token_key(dependency) for dependency in dependencies}
+    found = await cache.aget_many(keys.values())
+    tokens = []
+    for dependency in dependencies:
+        token = found.get(keys[dependency])
+        if token is None:
+            await cache.aadd(keys[dependency], uuid.uuid4().hex, None)
+            token = await cache.aget(keys[dependency])
+        tokens.append(token)
+    return tokens
+
+
+def bump(dependency):
+    """
+    Invalidate every cached response that depends on `dependency`.
+    Deferred until the current transaction commits, so a concurrent read
+    can't re-cache the old rows in between.
+    """
+    transaction.on_commit(lambda: cache.set(_token_key(dependency), uuid.uuid4().hex, None))
+
+
+# ==================== RESPONSE CACHING ====================
+
+def _cache_key(request, tokens):
+    query = '&'.join(sorted(request.META.get('QUERY_STRING', '').split('&')))
+    # Host is part of the key because serializers build absolute media URLs
+    raw = '|'.join([request.get_host(), request.path, query, request.headers.get('Accept', ''), *tokens])
+    return f'{KEY_PREFIX}:resp:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+
+def _seconds_until(deadline, now):
+    if deadline is None:
+        return None
+    return max(0, int((deadline - now).total_seconds()))
+
+
+def _finish(request, entry, now):
+    """Turn a cache entry into a response (304 if the client already has it)."""
+    max_age = CLIENT_MAX_AGE
+    remaining = _seconds_until(entry['expires_at'], now)
+    if remaining is not None:
+        max_age = min(max_age, remaining)
+
+    etag = entry['etag']
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (etag in parse_etags(if_none_match) or '*' in parse_etags(if_none_match)):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry['content'], status=entry['status'], content_type=entry['content_type'])
+        # Page links of paginated lists (GNET/pagination.py)
+        if entry.get('link'):
+            response['Link'] = entry['link']
+
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _store(request, key, response, expires, now):
+    if response.status_code not in CACHEABLE_STATUSES:
+        return None
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    content_type = response.get('Content-Type', '')
+    # The browsable API embeds the current user; never share HTML
+    if not content_type or content_type.startswith('text/html'):
+        return None
+
+    expires_at = expires() if expires is not None else None
+    timeout = CACHE_TIMEOUT
+    remaining = _seconds_until(expires_at, now)
+    if remaining is not None:
+        if remaining == 0:
+            return None
+        timeout = min(timeout, remaining)
+
+    entry = {
+        'status': response.status_code,
+        'content': response.content,
+        'content_type': content_type,
+        'link': response.get('Link'),
+        'etag': quote_etag(hashlib.sha256(response.content).hexdigest()[:32]),
+        'expires_at': expires_at,
+    }
+    cache.set(key, entry, timeout)
+    return entry
+
+
+def serve_cached(request, dependencies, expires, get_response):
+    """
+    Return the cached response for `request`, or call `get_response()` and
+    cache what it returns. `request` is the plain Django HttpRequest.
+    """
+    if request.method not in CACHEABLE_METHODS:
+        return get_response()
+
+    now = timezone.now()
+    key = _cache_key(request, get_tokens(dependencies))
+    entry = cache.get(key)
+    if entry is not None and (entry['expires_at'] is None or entry['expires_at'] > now):
+        return _finish(request, entry, now)
+
+    response = get_response()
+    entry = _store(request, key, response, expires, now)
+    if entry is None:
+        return response
+    return _finish(request, entry, now)
+
+
+def cached_response(dependencies, expires=None):
+    """Decorator for function views (apply it above @api_view)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return serve_cached(request, dependencies, expires, lambda: view(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+async def aserve_cached(request, dependencies, expires, get_response):
+    """serve_cached() for async views: `get_response` is a coroutine function."""
+    if request.method not in CACHEABLE_METHODS:
+        return await get_response()
+
+    now = timezone.now()
+    key = _cache_key(request, await aget_tokens(dependencies))
+    entry = await cache.aget(key)
+    if entry is not None and (entry['expires_at'] is None or entry['expires_at'] > now):
+        return _finish(request, entry, now)
+
+    response = await get_response()
+    # `expires` usually queries the database
+    entry = await sync_to_async(_store)(request, key, response, expires, now)
+    if entry is None:
+        return response
+    return _finish(request, entry, now)
+
+
+def acached_response(dependencies, expires=None):
+    """@cached_response for `async def` views."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            return await aserve_cached(request, dependencies, expires, lambda: view(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+class CachedResponseMixin:
+    """
+    ViewSet/APIView mixin. Set `cache_dependencies`, and optionally
+    `cache_expires = staticmethod(...)` for time-dependent views.
+    """
+    cache_dependencies = ()
+    cache_expires = None
+
+    def dispatch(self, request, *args, **kwargs):
+        return serve_cached(
+            request,
+            self.cache_dependencies,
+            self.cache_expires,
+            lambda: super(CachedResponseMixin, self).dispatch(request, *args, **kwargs),
+        )
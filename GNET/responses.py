@@ -0,0 +1,128 @@
+"""
+Streaming file responses with HTTP Range and conditional request support.
+
+Django's FileResponse always sends the whole file. serve_file() adds what
+PDF viewers, download managers and CDNs rely on:
+
+- ETag / If-None-Match -> 304 Not Modified
+- Range: bytes=... -> 206 Partial Content (a single range; multi-range
+  requests get the whole file, which the RFC allows)
+- If-Range -> only honour Range if the client's copy is still current
+- unsatisfiable ranges -> 416 with Content-Range: bytes */<size>
+
+The body is streamed in fixed-size chunks, never read into memory.
+"""
+import re
+
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_etags, quote_etag
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range `Range` header against a file of `size` bytes.
+
+    Returns (start, end) inclusive, None if the header should be ignored
+    (missing, malformed or multi-range), or False if it is unsatisfiable.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_file(fileobj, start, length, chunk_size=STREAM_CHUNK_SIZE):
+    try:
+        fileobj.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fileobj.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return '*' in tags or etag in tags
+
+
+def serve_file(request, fileobj, size, etag, content_type, filename=None,
+               last_modified=None, cache_control='private, max-age=0, must-revalidate',
+               as_attachment=False):
+    """
+    Stream an open binary file object as an HTTP response.
+
+    `etag` is a strong validator (e.g. a content hash) without quotes;
+    `last_modified` is an optional timestamp (seconds since the epoch).
+    The file object is closed once the response has been sent.
+    """
+    etag = quote_etag(etag)
+
+    def _headers(response):
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = cache_control
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    if request.method in ('GET', 'HEAD') and _etag_matches(request.headers.get('If-None-Match'), etag):
+        fileobj.close()
+        return _headers(HttpResponseNotModified())
+
+    byte_range = None
+    if request.method == 'GET':
+        byte_range = parse_range(request.headers.get('Range'), size)
+        if_range = request.headers.get('If-Range')
+        if byte_range and if_range and if_range.strip() != etag:
+            # The client's partial copy is stale; send the whole thing
+            byte_range = None
+
+    if byte_range is False:
+        fileobj.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return _headers(response)
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_iter_file(fileobj, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    elif request.method == 'HEAD':
+        fileobj.close()
+        length = size
+        response = HttpResponse(content_type=content_type)
+    else:
+        length = size
+        response = StreamingHttpResponse(_iter_file(fileobj, 0, size), content_type=content_type)
+
+    response['Content-Length'] = str(length)
+    if filename:
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return _headers(response)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 import environ
@@ -35,16 +36,22 @@ INSTALLED_APPS = [
     'finance',
     'projects',
     'organization',
+    'mediastore',
+    'GNET',  # project-wide management commands (benchmarks)
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, async-capable so ASGI requests don't start in a thread
+    'GNET.middleware.StaticFilesMiddleware',
     
     # CORS must come BEFORE CommonMiddleware
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     
+    # Read replica routing - must come BEFORE anything that reads the DB (sessions/auth)
+    'GNET.db_routers.ReplicaRoutingMiddleware',
+    
     # Session middleware must come BEFORE AuthenticationMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     
@@ -79,15 +86,60 @@ TEMPLATES = [
 WSGI_APPLICATION = 'GNET.wsgi.application'
 
 # Database (Neon)
+# SSL is required for hosted Postgres; SQLite (local development) has no SSL option
+DATABASE_URL = env("DATABASE_URL")
 DATABASES = {
     'default': dj_database_url.config(
-        default=env("DATABASE_URL"),
+        default=DATABASE_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+        ssl_require=not DATABASE_URL.startswith('sqlite')
+    )
+}
+
+# Optional read replica for reporting reads and safe GETs (see GNET/db_routers.py).
+# Local testing with two SQLite files:
+#   DATABASE_URL=sqlite:///db.sqlite3 REPLICA_DATABASE_URL=sqlite:///replica.sqlite3
+#   (python manage.py migrate, then copy db.sqlite3 over replica.sqlite3 to "replicate")
+REPLICA_DATABASE_URL = env('REPLICA_DATABASE_URL', default='')
+DATABASE_REPLICA_ALIAS = 'replica'
+if REPLICA_DATABASE_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
         conn_max_age=600,
         conn_health_checks=True,
-        ssl_require=True
+        ssl_require=not REPLICA_DATABASE_URL.startswith('sqlite')
     )
+    # Tests use the primary for both aliases
+    DATABASES[DATABASE_REPLICA_ALIAS]['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['GNET.db_routers.PrimaryReplicaRouter']
+
+# After a client writes, keep its reads on the primary for this long (replication lag)
+DATABASE_REPLICA_PIN_SECONDS = env.int('DATABASE_REPLICA_PIN_SECONDS', default=5)
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+# Local memory by default; point CACHE_URL at Redis/Memcached in production
+# (e.g. CACHE_URL=rediscache://host:6379/1) so every worker shares one cache.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
 }
 
+# Per-bucket cache lifetime for /api/finance/analytics/ (buckets are also
+# invalidated when a top-up or withdrawal changes status)
+FINANCE_ANALYTICS_CACHE_TIMEOUT = env.int('FINANCE_ANALYTICS_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# How long a stored Idempotency-Key response can be replayed
+IDEMPOTENCY_KEY_TTL_HOURS = env.int('IDEMPOTENCY_KEY_TTL_HOURS', default=24)
+
+# Public org endpoints: server-side entries live until a model write
+# invalidates them; browsers/CDNs revalidate with the ETag after max-age
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=60 * 60 * 24)
+RESPONSE_CACHE_MAX_AGE = env.int('RESPONSE_CACHE_MAX_AGE', default=60)
+
 # ============================================================================
 # EMAIL CONFIGURATION - SendGrid
 # ============================================================================
@@ -135,6 +187,44 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Token buckets for the public write endpoints (GNET/throttling.py), per IP
+# and per submitted email; rates are "<count>/<sec|min|hour|day>"
+PUBLIC_WRITE_THROTTLES = {
+    'registration': {'ip': '10/hour', 'email': '3/hour'},
+    'application': {'ip': '10/hour', 'email': '3/day'},
+    'password_reset': {'ip': '10/hour', 'email': '3/hour'},
+    'set_password': {'ip': '10/hour', 'email': '5/hour'},
+}
+
+# Membership application review queue: claims lapse back to the queue after this
+APPLICATION_REVIEW_LEASE_MINUTES = env.int('APPLICATION_REVIEW_LEASE_MINUTES', default=15)
+
+# Background jobs (GNET/background.py); set BACKGROUND_TASKS_SYNC=True to run them inline
+BACKGROUND_TASK_WORKERS = env.int('BACKGROUND_TASK_WORKERS', default=2)
+BACKGROUND_TASKS_SYNC = env.bool('BACKGROUND_TASKS_SYNC', default=False)
+
+# App loggers (background jobs, media variants, welcome emails) go to stderr
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'root': {'handlers': ['console'], 'level': env('LOG_LEVEL', default='INFO')},
+}
+
+# Route the hottest reads to their async views (GNET/async_api.py).
+# GNET/asgi.py turns this on; WSGI servers keep the sync views.
+ASYNC_READ_VIEWS = env.bool('ASYNC_READ_VIEWS', default=False)
+
+# Live updates stream (GNET/broadcast.py). With more than one worker process use
+# 'GNET.broadcast.UnixDatagramBackend' so publishes reach every worker's clients
+LIVE_EVENTS_BACKEND = env('LIVE_EVENTS_BACKEND', default='GNET.broadcast.InProcessBackend')
+LIVE_EVENTS_BUFFER = env.int('LIVE_EVENTS_BUFFER', default=500)
+LIVE_EVENTS_HEARTBEAT = env.int('LIVE_EVENTS_HEARTBEAT', default=15)
+LIVE_EVENTS_SOCKET_DIR = env('LIVE_EVENTS_SOCKET_DIR', default=os.path.join(tempfile.gettempdir(), 'gnet-live'))
+
+# Proposal document uploads (streamed to disk, stored by SHA-256)
+PROPOSAL_DOCUMENT_MAX_BYTES = env.int('PROPOSAL_DOCUMENT_MAX_BYTES', default=25 * 1024 * 1024)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ============================================================================
@@ -167,8 +257,29 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     
+    # orjson-backed JSON, byte-compatible with DRF's own (see GNET/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'GNET.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'GNET.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    
+    # Cursor pagination when a list is asked for pages (?page_size=, ?cursor=, ?envelope=1);
+    # otherwise the full list
+    'DEFAULT_PAGINATION_CLASS': 'GNET.pagination.CursorPagination',
+    'PAGE_SIZE': 50,
+    
     # API documentation schema
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    
+    # Client IP for throttling (GNET/throttling.py): the address NUM_PROXIES hops
+    # from the end of X-Forwarded-For, or REMOTE_ADDR when 0. Left unset, DRF
+    # trusts whatever X-Forwarded-For the client sends and IP limits do nothing.
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
 }
 
 # ============================================================================
@@ -214,6 +325,12 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',      # ✅ Required for CSRF protection
     'x-requested-with',
+    'idempotency-key',  # ✅ Safe retries of finance writes
+]
+
+# Let the frontend read the next/prev page links (see GNET/pagination.py)
+CORS_EXPOSE_HEADERS = [
+    'link',
 ]
 
 # ============================================================================
@@ -344,6 +461,9 @@ if os.environ.get('RENDER'):
     # Force DEBUG to False in production
     DEBUG = False
     
+    # Render's load balancer appends the real client address to X-Forwarded-For
+    REST_FRAMEWORK['NUM_PROXIES'] = env.int('NUM_PROXIES', default=1)
+    
     # Get Render's external hostname
     RENDER_EXTERNAL_HOSTNAME = os.environ.get('RENDER_EXTERNAL_HOSTNAME')
     if RENDER_EXTERNAL_HOSTNAME:
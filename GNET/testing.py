@@ -0,0 +1,177 @@
+"""
+Query budgets for the API test suites (each app's tests.py).
+
+Every route gets a fixed number of queries it may run per request, and
+list-like routes are measured twice - on a SMALL and on a LARGE data set -
+to show the count does not grow with the number of rows. A serializer that
+starts reading a relation per row (an N+1) fails the test, and the failure
+lists the SQL that ran.
+
+    class FinanceQueryBudgetTests(QueryBudgetMixin, TestCase):
+        routes_prefix = 'api/finance/'
+        budgets = {'topup-list': {'get': 3, 'post': 6}, 'topup-export': 3, ...}
+
+        def seed(self, count):
+            ...create `count` more rows of realistic data...
+
+        def test_topup_list(self):
+            self.assertConstantQueries('topup-list', 'get', '/api/finance/topups/', user=self.admin)
+
+A budget is a number of queries, or one per HTTP method where a route's
+reads and writes differ. Budgets include the session and user lookups of
+a logged-in request.
+Whole-response caches are cleared before each measured request, so
+cached endpoints are measured on a miss. `test_every_route_has_a_budget`
+fails when a route under `routes_prefix` is added without a budget.
+
+sync_and_async() runs a DRF view and its async twin (GNET/async_api.py)
+on the same GET, so tests can assert both read paths answer alike.
+"""
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from rest_framework.test import APIClient
+
+SMALL = 3
+LARGE = 15
+
+# DRF's browsable API root of each router; not an endpoint of its own
+IGNORED_ROUTES = {'api-root'}
+
+
+def api_routes(prefix):
+    """Names of the URL patterns whose path starts with `prefix`."""
+    def walk(patterns, path):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, path + str(pattern.pattern))
+            elif pattern.name:
+                yield path + str(pattern.pattern), pattern.name
+
+    return {
+        name for path, name in walk(get_resolver().url_patterns, '')
+        if path.startswith(prefix) and name not in IGNORED_ROUTES
+    }
+
+
+def format_queries(queries):
+    return '\n'.join(f"{number}. {query['sql']}" for number, query in enumerate(queries, 1))
+
+
+def make_user(email, role='member', **extra):
+    return get_user_model().objects.create_user(
+        email=email, username=email, full_name=email.split('@')[0].replace('.', ' ').title(),
+        password='pass12345', role=role, **extra
+    )
+
+
+def sync_and_async(sync_view, async_view, path, user=None):
+    """(status, body) of GET `path` from each view, both on a cold response cache."""
+    user = user or AnonymousUser()
+
+    async def auser():
+        return user
+
+    results = []
+    for view in (sync_view, async_to_sync(async_view)):
+        cache.clear()
+        request = RequestFactory().get(path)
+        request.user, request.auser = user, auser
+        response = view(request)
+        if hasattr(response, 'render'):
+            response.render()
+        results.append((response.status_code, response.content))
+    return results
+
+
+class QueryBudgetMixin:
+    """For django.test.TestCase subclasses; a mixin so the test runner doesn't collect it on its own."""
+    routes_prefix = None
+    budgets = {}
+
+    def setUp(self):
+        super().setUp()
+        # Fast hashing; password hashing is not what these tests measure
+        hashers = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+        hashers.enable()
+        self.addCleanup(hashers.disable)
+        cache.clear()
+        self.client = APIClient()
+        self.admin = make_user('admin@example.com', role='admin', is_staff=True)
+        self.member = make_user('member@example.com')
+        self.seed(SMALL)
+
+    def seed(self, count):
+        """Create `count` more rows of realistic data for the app's endpoints."""
+        raise NotImplementedError
+
+    def test_every_route_has_a_budget(self):
+        routes = api_routes(self.routes_prefix)
+        self.assertEqual(sorted(routes - set(self.budgets)), [], 'routes without a query budget')
+        self.assertEqual(sorted(set(self.budgets) - routes), [], 'budgets for routes that no longer exist')
+
+    def measure(self, method, url, data=None, user=None, status=None, stream=True, **extra):
+        """
+        Make one request; returns (response, captured queries). `data` may
+        be a callable, evaluated just before the request (e.g. ids of rows
+        seeded since the last request).
+        """
+        if callable(data):
+            data = data()
+        cache.clear()
+        if user is not None:
+            self.client.force_login(user)
+        else:
+            self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            if method in ('get', 'head'):
+                response = getattr(self.client, method)(url, data, **extra)
+            else:
+                response = getattr(self.client, method)(url, data, format='json', **extra)
+            if stream and response.streaming:
+                b''.join(response.streaming_content)
+        if status is not None:
+            self.assertEqual(
+                response.status_code, status,
+                f'{method.upper()} {url}: {getattr(response, "data", None) or response}'
+            )
+        return response, queries.captured_queries
+
+    def assertQueryBudget(self, name, method, url, data=None, **kwargs):
+        """Request `url` and fail, listing the SQL, if it takes more queries than budgets[name]."""
+        kwargs.setdefault('status', 200)
+        response, queries = self.measure(method, url, data, **kwargs)
+        self._check_budget(name, method, url, queries)
+        return response
+
+    def assertConstantQueries(self, name, method, url, data=None, **kwargs):
+        """
+        assertQueryBudget() on the SMALL data set, then again after seeding
+        up to LARGE rows; the number of queries must not change.
+        """
+        kwargs.setdefault('status', 200)
+        _, small = self.measure(method, url, data, **kwargs)
+        self.seed(LARGE - SMALL)
+        response, large = self.measure(method, url, data, **kwargs)
+        if len(large) != len(small):
+            self.fail(
+                f'{name}: {method.upper()} {url} ran {len(small)} queries with {SMALL} rows '
+                f'and {len(large)} with {LARGE}:\n{format_queries(large)}'
+            )
+        self._check_budget(name, method, url, large)
+        return response
+
+    def _check_budget(self, name, method, url, queries):
+        budget = self.budgets[name]
+        if isinstance(budget, dict):
+            budget = budget[method]
+        if len(queries) > budget:
+            self.fail(
+                f'{name}: {method.upper()} {url} ran {len(queries)} queries, '
+                f'budget is {budget}:\n{format_queries(queries)}'
+            )
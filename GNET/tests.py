@@ -0,0 +1,383 @@
+import datetime
+import decimal
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import uuid
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import CustomUser
+from finance.models import MMFTopUp
+from finance.serializers import MMFTopUpSerializer
+from GNET import background, broadcast, response_cache
+from GNET.db_routers import PIN_COOKIE, ReplicaRoutingMiddleware
+from GNET.renderers import FastJSONParser, FastJSONRenderer
+from GNET.testing import make_user
+from members.models import MemberProfile
+from organization.models import Announcement
+from organization.signals import ANNOUNCEMENTS
+from members.serializers import MemberProfileSerializer
+
+# Values DRF's encoder has opinions about; every one must render identically
+EDGE_CASES = {
+    'unicode': 'Karibu, ñ, 😀, \u2028 and \u2029, "quotes", back\\slash, \x00\x1f\x7f, </script>',
+    'int_keys': {1: 'one', 2: 'two'},
+    'utc_datetime': datetime.datetime(2024, 5, 1, 8, 30, tzinfo=datetime.timezone.utc),
+    'local_datetime': datetime.datetime(2024, 5, 1, 8, 30, 0, 123, tzinfo=datetime.timezone(datetime.timedelta(hours=3))),
+    'naive_datetime': datetime.datetime(2024, 5, 1, 8, 30),
+    'date': datetime.date(2024, 5, 1),
+    'time': datetime.time(8, 30, 15, 500),
+    'timedelta': datetime.timedelta(hours=1, seconds=30),
+    'decimal': decimal.Decimal('1234.50'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy_string': gettext_lazy('Member'),
+    'bytes': b'raw',
+    'floats': [0.1, 100.0, 1234.5, -2.75, 1e15],
+    'big_int': 2 ** 70,
+    'nested': [{'a': [None, True, False, {'b': []}]}],
+}
+
+
+def sample_payloads(rows):
+    """Serialized top-ups and member profiles built from unsaved instances; nothing is written."""
+    now = timezone.now()
+    users = [
+        CustomUser(id=i, email=f'member{i}@example.com', username=f'member{i}', full_name=f'Member Number {i}', role='member', date_joined=now)
+        for i in range(1, rows + 1)
+    ]
+    topups = [
+        MMFTopUp(
+            id=i, user=users[i % len(users)], amount=decimal.Decimal(f'{i * 37 % 100000}.{i % 100:02d}'),
+            month=datetime.date(2024, i % 12 + 1, 1), date=now - datetime.timedelta(minutes=i),
+            status='Success', transaction_id=f'MMF{i:08d}', notes='Monthly contribution',
+        )
+        for i in range(1, rows + 1)
+    ]
+    profiles = [
+        MemberProfile(
+            id=user.id, user=user, phone='+254700000000', county='Nairobi', skills='Design, Marketing',
+            profession='Entrepreneur', bio='Building things in Nairobi. ' * 4, created_at=now, updated_at=now,
+        )
+        for user in users
+    ]
+    return {
+        'topups': (MMFTopUpSerializer, topups),
+        'member_directory': (MemberProfileSerializer, profiles),
+    }
+
+
+class FastJSONCompatibilityTests(SimpleTestCase):
+    """GNET.renderers must produce the same bytes and data as DRF's JSONRenderer/JSONParser."""
+
+    def assertSameAsDRF(self, data):
+        expected = JSONRenderer().render(data)
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(expected)), JSONParser().parse(io.BytesIO(expected)))
+
+    def test_edge_cases(self):
+        for name, value in EDGE_CASES.items():
+            with self.subTest(name):
+                self.assertSameAsDRF({name: value})
+        self.assertSameAsDRF(EDGE_CASES)
+
+    def test_serializer_payloads(self):
+        for name, (serializer_class, instances) in sample_payloads(50).items():
+            with self.subTest(name):
+                self.assertSameAsDRF(serializer_class(instances, many=True).data)
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_indented_output_falls_back_to_drf(self):
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(EDGE_CASES, 'application/json', context),
+            JSONRenderer().render(EDGE_CASES, 'application/json', context),
+        )
+
+
+class BackgroundTests(SimpleTestCase):
+    def test_failed_job_is_logged(self):
+        def resize_banner(asset_id):
+            raise OSError('disk full')
+
+        with self.assertLogs('GNET.background', 'ERROR') as logs:
+            background._run(resize_banner, (7,), {})
+        self.assertIn(f'Background task {__name__}.resize_banner failed', logs.output[0])
+        self.assertIn('OSError: disk full', logs.output[0])
+
+
+class HubReplayTests(SimpleTestCase):
+    def hub_with(self, ids, buffer_size=10):
+        hub = broadcast.Hub(buffer_size=buffer_size)
+        for message_id in ids:
+            hub.dispatch(broadcast.Message(message_id, 'announcement.created', '{}'))
+        return hub
+
+    def test_missed_messages_are_replayed(self):
+        hub = self.hub_with([10, 11, 12])
+        self.assertEqual([message.id for message in hub.replay(10)], [11, 12])
+        self.assertEqual(hub.replay(12), [])
+
+    def test_full_buffer_that_moved_past_the_client_resets(self):
+        hub = self.hub_with(range(10, 20), buffer_size=5)
+        self.assertIsNone(hub.replay(12))
+        self.assertEqual([message.id for message in hub.replay(15)], [16, 17, 18, 19])
+
+    def test_partial_buffer_newer_than_the_client_resets(self):
+        # e.g. the worker restarted since the client's last message
+        hub = self.hub_with([50, 51])
+        self.assertIsNone(hub.replay(12))
+
+    def test_empty_buffer_resets_a_resuming_client(self):
+        hub = self.hub_with([])
+        self.assertIsNone(hub.replay(12))
+        self.assertEqual(hub.replay(0), [])
+
+
+class UnixDatagramFanOutTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(LIVE_EVENTS_SOCKET_DIR=directory):
+            self.backend = broadcast.UnixDatagramBackend(broadcast.Hub())
+        # Stands in for another worker process
+        self.worker = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.addCleanup(self.worker.close)
+        self.worker.bind(os.path.join(directory, 'other-worker.sock'))
+        self.worker.settimeout(5)
+
+    def received(self):
+        return json.loads(self.worker.recv(broadcast.MAX_DATAGRAM + 1))
+
+    def test_messages_reach_other_workers(self):
+        message = broadcast.Message(1, 'announcement.created', json.dumps({'title': 'Meetup'}))
+        self.backend.publish(message)
+        self.assertEqual(self.received(), {'id': 1, 'event': 'announcement.created', 'data': message.data})
+
+    def test_oversized_message_becomes_a_reset(self):
+        message = broadcast.Message(2, 'announcement.created', json.dumps({'message': 'x' * broadcast.MAX_DATAGRAM}))
+        with self.assertLogs('GNET.broadcast', 'WARNING') as logs:
+            self.backend.publish(message)
+        self.assertIn('over the 65536-byte fan-out limit', logs.output[0])
+        self.assertEqual(self.received(), {'id': 2, 'event': 'reset', 'data': '{"event": "announcement.created"}'})
+        # This worker's own clients still get the whole message
+        self.assertEqual(self.backend.hub._buffer[-1].data, message.data)
+
+
+
+class ResponseCacheTests(TestCase):
+    url = '/api/org/announcements/recent/'
+
+    def setUp(self):
+        cache.clear()
+        Announcement.objects.create(title='AGM on Saturday', message='Meetup moved.')
+
+    def test_repeat_requests_are_served_from_the_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'])
+        self.assertEqual(first['Cache-Control'], f'public, max-age={response_cache.CLIENT_MAX_AGE}')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual((second.content, second['ETag']), (first.content, first['ETag']))
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_write_bumps_the_token_and_changes_the_response(self):
+        tokens = response_cache.get_tokens([ANNOUNCEMENTS])
+        stale = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='Harambee next week', message='Bring a friend.')
+        self.assertNotEqual(response_cache.get_tokens([ANNOUNCEMENTS]), tokens)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=stale['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], stale['ETag'])
+        self.assertIn('Harambee next week', {item['title'] for item in response.json()})
+
+    def test_bump_waits_for_commit(self):
+        tokens = response_cache.get_tokens([ANNOUNCEMENTS])
+        with self.captureOnCommitCallbacks() as callbacks:
+            response_cache.bump(ANNOUNCEMENTS)
+            self.assertEqual(response_cache.get_tokens([ANNOUNCEMENTS]), tokens)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(response_cache.get_tokens([ANNOUNCEMENTS]), tokens)
+
+    def test_entries_are_keyed_per_token(self):
+        request = RequestFactory().get(self.url, {'b': '2', 'a': '1'})
+        reordered = RequestFactory().get(self.url, {'a': '1', 'b': '2'})
+        self.assertEqual(response_cache._cache_key(request, ['t1']), response_cache._cache_key(reordered, ['t1']))
+        self.assertNotEqual(response_cache._cache_key(request, ['t1']), response_cache._cache_key(request, ['t2']))
+
+        calls = []
+
+        @response_cache.cached_response(dependencies=['tests.widget'])
+        def view(request):
+            calls.append(request)
+            return HttpResponse(b'[]', content_type='application/json')
+
+        view(RequestFactory().get('/widgets/'))
+        view(RequestFactory().get('/widgets/'))
+        self.assertEqual(len(calls), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response_cache.bump('tests.widget')
+        view(RequestFactory().get('/widgets/'))
+        self.assertEqual(len(calls), 2)
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        self.count = page_size + 5
+        for number in range(self.count):
+            make_user(f'member{number}@example.com')
+            Announcement.objects.create(title=f'Notice #{number}', message='Meetup moved.')
+        self.client.force_login(CustomUser.objects.first())
+
+    def test_lists_are_never_silently_capped(self):
+        for url in ['/api/auth/users/', '/api/org/announcements/']:
+            response = self.client.get(url)
+            self.assertEqual(len(response.json()), self.count, url)
+            self.assertNotIn('Link', response)
+
+    def test_lists_page_only_on_request(self):
+        for url in ['/api/auth/users/', '/api/org/announcements/']:
+            response = self.client.get(f'{url}?page_size=20')
+            self.assertEqual(len(response.json()), 20)
+            self.assertIn('rel="next"', response['Link'])
+            response = self.client.get(f'{url}?envelope=1')
+            self.assertEqual(len(response.json()['results']), settings.REST_FRAMEWORK['PAGE_SIZE'])
+            self.assertTrue(response.json()['next'])
+
+    def test_following_the_link_header_reaches_every_row(self):
+        url, seen = '/api/auth/users/?page_size=20', []
+        while url:
+            response = self.client.get(url)
+            seen += [user['id'] for user in response.json()]
+            url = next((part.split(';')[0].strip('<> ') for part in response.get('Link', '').split(',') if 'rel="next"' in part), None)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), self.count)
+
+
+def routed(view, method='get', cookies=None):
+    """Run `view` behind ReplicaRoutingMiddleware; returns the response."""
+    request = getattr(RequestFactory(), method)('/')
+    request.COOKIES.update(cookies or {})
+    return ReplicaRoutingMiddleware(view)(request)
+
+
+@mock.patch('GNET.db_routers.replica_alias', return_value='replica')
+class PrimaryReplicaRouterTests(TransactionTestCase):
+    """Routing decisions, as if a 'replica' database were configured."""
+
+    def reads(self, view_body, **kwargs):
+        seen = []
+
+        def view(request):
+            view_body(seen)
+            return HttpResponse()
+
+        response = routed(view, **kwargs)
+        return seen, response
+
+    def test_safe_get_reads_from_replica(self, _):
+        seen, response = self.reads(lambda seen: seen.append(router.db_for_read(Announcement)))
+        self.assertEqual(seen, ['replica'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unsafe_methods_read_from_primary(self, _):
+        seen, _ = self.reads(lambda seen: seen.append(router.db_for_read(Announcement)), method='post')
+        self.assertEqual(seen, ['default'])
+
+    def test_reads_after_a_write_are_pinned_to_primary(self, _):
+        def body(seen):
+            seen.append(router.db_for_read(Announcement))
+            router.db_for_write(Announcement)
+            seen.append(router.db_for_read(Announcement))
+
+        seen, response = self.reads(body)
+        self.assertEqual(seen, ['replica', 'default'])
+        # ...and the client's next requests, for DATABASE_REPLICA_PIN_SECONDS
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.DATABASE_REPLICA_PIN_SECONDS)
+        seen, _ = self.reads(lambda seen: seen.append(router.db_for_read(Announcement)), cookies={PIN_COOKIE: '1'})
+        self.assertEqual(seen, ['default'])
+
+    def test_reads_inside_atomic_go_to_primary(self, _):
+        def body(seen):
+            with transaction.atomic():
+                seen.append(router.db_for_read(Announcement))
+            seen.append(router.db_for_read(Announcement))
+
+        seen, _ = self.reads(body)
+        self.assertEqual(seen, ['default', 'replica'])
+
+    def test_sessions_always_read_from_primary(self, _):
+        from django.contrib.sessions.models import Session
+        seen, _ = self.reads(lambda seen: seen.append(router.db_for_read(Session)))
+        self.assertEqual(seen, ['default'])
+
+    def test_outside_a_request_reads_from_primary(self, _):
+        self.assertEqual(router.db_for_read(Announcement), 'default')
+
+
+REPLICA_CONFIGURED = settings.DATABASE_REPLICA_ALIAS in settings.DATABASES
+
+
+@skipUnless(REPLICA_CONFIGURED, 'set REPLICA_DATABASE_URL, e.g. a second SQLite file')
+class ReplicaRoutingQueryTests(TransactionTestCase):
+    """The same cases against real connections: which database the queries ran on."""
+    # The runner sets up every listed database, even for skipped classes
+    databases = {'default', settings.DATABASE_REPLICA_ALIAS} if REPLICA_CONFIGURED else {'default'}
+
+    def queries(self, view_body, **kwargs):
+        def view(request):
+            view_body()
+            return HttpResponse()
+
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[settings.DATABASE_REPLICA_ALIAS]) as replica:
+            routed(view, **kwargs)
+        return len(primary), len(replica)
+
+    def test_safe_get_reads_from_replica(self):
+        self.assertEqual(self.queries(lambda: list(Announcement.objects.all())), (0, 1))
+
+    def test_reads_after_a_write_are_pinned_to_primary(self):
+        def body():
+            Announcement.objects.create(title='Meetup', message='Moved to Friday.')
+            list(Announcement.objects.all())
+
+        primary, replica = self.queries(body)
+        self.assertEqual(replica, 0)
+        self.assertGreaterEqual(primary, 2)
+
+    def test_reads_inside_atomic_go_to_primary(self):
+        def body():
+            with transaction.atomic():
+                list(Announcement.objects.all())
+
+        primary, replica = self.queries(body)
+        self.assertEqual(replica, 0)
+        self.assertGreaterEqual(primary, 1)
@@ -0,0 +1,162 @@
+"""
+Token-bucket throttling for the public (unauthenticated) write endpoints.
+
+Each protected endpoint has a scope with two buckets, configured in
+settings.PUBLIC_WRITE_THROTTLES:
+
+    'registration': {'ip': '10/hour', 'email': '3/hour'}
+
+A bucket holds up to N tokens and refills at N per period, so a client can
+burst up to N requests and then sustain N per period. The IP bucket is
+checked first, from the cache alone, so a flood from one address is
+rejected before the request body is even parsed; the email bucket (keyed
+by a hash of the submitted address) then stops one address being targeted
+from many IPs. Either way DRF answers 429 with Retry-After before the view
+runs, i.e. before any database or SendGrid work.
+
+Passed/blocked counts per scope are kept in the cache and exposed to
+admins through throttle_stats().
+
+A blocked request consumes nothing. Buckets are read and written with
+plain get/set, so two requests racing on the same key can both take the
+last token; for abuse control that slack is fine and keeps the check to a
+couple of cache round trips.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = 'throttle'
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+def parse_rate(rate):
+    """'10/hour' -> (capacity 10, refill of 10/3600 tokens per second)."""
+    count, period = rate.split('/')
+    count = int(count)
+    seconds = PERIODS[period.strip().lower()]
+    return count, count / seconds
+
+
+def scope_config(scope):
+    # Read per request, not at import, so override_settings in tests applies
+    return settings.PUBLIC_WRITE_THROTTLES.get(scope, {})
+
+
+def _bucket_key(scope, kind, ident):
+    return f'{KEY_PREFIX}:{scope}:{kind}:{ident}'
+
+
+def _stats_key(scope, outcome):
+    return f'{KEY_PREFIX}:stats:{scope}:{outcome}'
+
+
+def _count(scope, outcome):
+    key = _stats_key(scope, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def refill(state, rate, now):
+    """
+    Bucket state after refilling up to `now`.
+    Returns (tokens, seconds until one token is available, cache timeout once one is taken).
+    """
+    capacity, per_second = parse_rate(rate)
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * per_second)
+    wait = 0 if tokens >= 1 else (1 - tokens) / per_second
+    # Keep the bucket around only as long as it takes to refill completely
+    timeout = int((capacity - tokens + 1) / per_second) + 1
+    return tokens, wait, timeout
+
+
+class PublicWriteThrottle(BaseThrottle):
+    """
+    DRF throttle for one scope of PUBLIC_WRITE_THROTTLES. Subclass with a
+    `scope`, or pass the scope when instantiating from get_throttles().
+    """
+    scope = None
+    email_field = 'email'
+
+    def __init__(self, scope=None):
+        if scope is not None:
+            self.scope = scope
+        self.retry_after = None
+
+    def _email_ident(self, request):
+        try:
+            email = request.data.get(self.email_field)
+        except Exception:
+            return None
+        if not email or not isinstance(email, str):
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+    def allow_request(self, request, view):
+        config = scope_config(self.scope)
+        if not config:
+            return True
+
+        now = time.time()
+        taken = []
+        # IP first: a flood from one address is rejected before the body is parsed
+        for kind, get_ident in (('ip', self.get_ident), ('email', self._email_ident)):
+            if kind not in config:
+                continue
+            ident = get_ident(request)
+            if not ident:
+                continue
+            key = _bucket_key(self.scope, kind, ident)
+            tokens, wait, timeout = refill(cache.get(key), config[kind], now)
+            if wait:
+                # Nothing is consumed from buckets checked earlier
+                self.retry_after = wait
+                _count(self.scope, 'blocked')
+                return False
+            taken.append((key, tokens, timeout))
+
+        for key, tokens, timeout in taken:
+            cache.set(key, (tokens - 1, now), timeout)
+        _count(self.scope, 'passed')
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class RegistrationThrottle(PublicWriteThrottle):
+    scope = 'registration'
+
+
+class ApplicationThrottle(PublicWriteThrottle):
+    scope = 'application'
+
+
+class PasswordResetThrottle(PublicWriteThrottle):
+    scope = 'password_reset'
+
+
+class SetPasswordThrottle(PublicWriteThrottle):
+    scope = 'set_password'
+
+
+def throttle_stats():
+    """{scope: {"passed": n, "blocked": n, "limits": {...}}} for every configured scope."""
+    configured = settings.PUBLIC_WRITE_THROTTLES
+    keys = [_stats_key(scope, outcome) for scope in configured for outcome in ('passed', 'blocked')]
+    counts = cache.get_many(keys)
+    return {
+        scope: {
+            'passed': counts.get(_stats_key(scope, 'passed'), 0),
+            'blocked': counts.get(_stats_key(scope, 'blocked'), 0),
+            'limits': limits,
+        }
+        for scope, limits in configured.items()
+    }
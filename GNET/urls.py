@@ -34,4 +34,7 @@ urlpatterns = [
     # Organization app (if you have one)
     path('api/org/', include('organization.urls')),
 
+    # Content-addressed media (announcement/event images and their variants)
+    path('api/media/', include('mediastore.urls')),
+
 ]
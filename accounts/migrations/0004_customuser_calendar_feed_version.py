@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='calendar_feed_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
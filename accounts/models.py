@@ -12,6 +12,8 @@ class CustomUser(AbstractUser):
     full_name = models.CharField(max_length=255)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='member')
     profile_image = models.ImageField(upload_to='profiles/', null=True, blank=True)
+    # Part of the signed personal calendar feed URL; bumping it revokes old URLs (organization/ical.py)
+    calendar_feed_version = models.PositiveIntegerField(default=0)
     
     # Remove is_active - already in AbstractUser
     # Remove date_joined - already in AbstractUser
@@ -23,6 +25,11 @@ class CustomUser(AbstractUser):
         ordering = ['-date_joined']
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            # Cursor-paginated user list: everyone for admins, members for the rest
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_idx'),
+            models.Index(fields=['role', '-date_joined', '-id'], name='user_role_joined_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.role})"
\ No newline at end of file
@@ -118,15 +118,13 @@ class RegisterSerializer(serializers.ModelSerializer):
         password = validated_data.pop('password')
         
         # Create user with email as username (since USERNAME_FIELD = 'email')
+        # create_user hashes the password, so this is a single INSERT
         user = CustomUser.objects.create_user(
             username=validated_data['email'],  # Required by AbstractUser
+            password=password,
             **validated_data
         )
         
-        # Set password (this hashes it)
-        user.set_password(password)
-        user.save()
-        
         return user
 
 # ============================================================================
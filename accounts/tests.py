@@ -1,3 +1,48 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import CustomUser
+from GNET.testing import QueryBudgetMixin, make_user
+
+
+class AccountsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    routes_prefix = 'api/auth/'
+    budgets = {
+        'login': 9,
+        'logout': 4,
+        'register': 11,
+        'csrf': 0,
+        'profile': {'get': 2, 'put': 3},
+        'user-list': 3,
+        'user-detail': 3,
+    }
+
+    def seed(self, count):
+        start = CustomUser.objects.count()
+        for number in range(start, start + count):
+            make_user(f'user{number}@example.com', role='executive' if number % 5 == 0 else 'member')
+
+    def test_login(self):
+        self.assertQueryBudget('login', 'post', '/api/auth/login/', {'email': 'member@example.com', 'password': 'pass12345'})
+
+    def test_logout(self):
+        self.assertQueryBudget('logout', 'post', '/api/auth/logout/', user=self.member)
+
+    def test_register(self):
+        self.assertQueryBudget('register', 'post', '/api/auth/register/', {
+            'email': 'new.member@example.com', 'full_name': 'New Member',
+            'password': 'securepass123', 'password_confirm': 'securepass123',
+        }, status=201)
+
+    def test_csrf(self):
+        self.assertQueryBudget('csrf', 'get', '/api/auth/csrf/')
+
+    def test_profile(self):
+        self.assertQueryBudget('profile', 'get', '/api/auth/profile/', user=self.member)
+        self.assertQueryBudget('profile', 'put', '/api/auth/profile/', {'full_name': 'Renamed Member'}, user=self.member)
+
+    def test_user_list(self):
+        self.assertConstantQueries('user-list', 'get', '/api/auth/users/', user=self.admin)
+        self.assertConstantQueries('user-list', 'get', '/api/auth/users/', user=self.member)
+
+    def test_user_detail(self):
+        self.assertQueryBudget('user-detail', 'get', f'/api/auth/users/{self.member.pk}/', user=self.admin)
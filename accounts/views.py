@@ -268,6 +268,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-date_joined', '-id')
     
     def get_queryset(self):
         """
@@ -281,12 +282,6 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Non-admins only see members
         return CustomUser.objects.filter(role='member')
-    
-    def list(self, request, *args, **kwargs):
-        """Override to always return 200 even with empty queryset"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 # ============================================================================
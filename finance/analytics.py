@@ -0,0 +1,199 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateTimeField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from finance.models import MMFTopUp, WithdrawalRequest
+from GNET import response_cache
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+# metric -> (model, status field, status value that makes a row count)
+METRICS = {
+    'contributions': (MMFTopUp, 'status', 'Success'),
+    'withdrawals': (WithdrawalRequest, 'approval_status', 'Approved'),
+}
+
+# Upper bound on buckets per request so one call can't ask for 20 years of days
+MAX_BUCKETS = 400
+
+DEFAULT_BUCKETS = {'day': 30, 'week': 12, 'month': 12}
+
+CACHE_TIMEOUT = getattr(settings, 'FINANCE_ANALYTICS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+# ==================== BUCKET HELPERS ====================
+
+def bucket_start(day, granularity):
+    """Return the first day of the bucket containing `day` (weeks start on Monday, like TruncWeek)."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def iter_buckets(start, end, granularity):
+    current = bucket_start(start, granularity)
+    while current <= end:
+        yield current
+        current = next_bucket(current, granularity)
+
+
+def bucket_count(start, end, granularity):
+    """len(list(iter_buckets(start, end, granularity))), without walking the range."""
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    days = (last - first).days
+    return (days // 7 if granularity == 'week' else days) + 1
+
+
+def default_start(end, granularity):
+    start = bucket_start(end, granularity)
+    for _ in range(DEFAULT_BUCKETS[granularity] - 1):
+        start = bucket_start(start - timedelta(days=1), granularity)
+    return start
+
+
+def _local_day(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def _aware_midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _money(value):
+    return str(Decimal(value or 0).quantize(Decimal('0.01')))
+
+
+def _dependency(metric, scope, granularity, bucket):
+    return f'finance.series:{metric}:{scope}:{granularity}:{bucket.isoformat()}'
+
+
+def _cache_key(dependency, token):
+    return f'{dependency}:{token}'
+
+
+# ==================== SERIES ====================
+
+def _query_buckets(metric, granularity, start, end, user_id):
+    """
+    One grouped aggregate over [start, end] returning {bucket_date: (total, count)}.
+    """
+    model, status_field, counted_status = METRICS[metric]
+    trunc = GRANULARITIES[granularity]
+
+    queryset = model.objects.filter(
+        **{status_field: counted_status},
+        date__gte=_aware_midnight(start),
+        date__lt=_aware_midnight(next_bucket(end, granularity)),
+    )
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+
+    rows = (
+        queryset
+        .annotate(bucket=trunc('date', output_field=DateTimeField()))
+        .values('bucket')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    return {
+        bucket_start(_local_day(row['bucket']), granularity): (_money(row['total']), row['count'])
+        for row in rows
+    }
+
+
+def get_series(metric, granularity, start, end, user_id=None):
+    """
+    Return the bucketed series for one metric.
+
+    Every bucket is cached under its own key, so a status change on one
+    row only evicts the buckets that row falls into. On a partial hit only
+    the span of missing buckets is recomputed, in a single grouped query.
+
+    Keys carry the bucket's version token (GNET.response_cache), read
+    before computing: if a write invalidates a bucket while we compute it,
+    what we store lands under the old token and is never read.
+    """
+    scope = 'all' if user_id is None else str(user_id)
+    buckets = list(iter_buckets(start, end, granularity))
+    dependencies = [_dependency(metric, scope, granularity, bucket) for bucket in buckets]
+    tokens = response_cache.get_tokens(dependencies)
+    keys = {
+        bucket: _cache_key(dependency, token)
+        for bucket, dependency, token in zip(buckets, dependencies, tokens)
+    }
+
+    cached = cache.get_many(keys.values())
+    missing = [bucket for bucket in buckets if keys[bucket] not in cached]
+
+    if missing:
+        computed = _query_buckets(metric, granularity, missing[0], missing[-1], user_id)
+        fresh = {}
+        for bucket in missing:
+            total, count = computed.get(bucket, (_money(0), 0))
+            fresh[keys[bucket]] = {'total': total, 'count': count}
+        cache.set_many(fresh, CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return [
+        {
+            'bucket': bucket.isoformat(),
+            'total': cached[keys[bucket]]['total'],
+            'count': cached[keys[bucket]]['count'],
+        }
+        for bucket in buckets
+    ]
+
+
+# ==================== INVALIDATION ====================
+
+def invalidate(metric, user_id, when):
+    """
+    Drop the cached buckets (every granularity, member and organization
+    scope) that a row for `user_id` dated `when` contributes to, once the
+    current transaction commits.
+    """
+    if when is None:
+        return
+    day = _local_day(when)
+    for granularity in GRANULARITIES:
+        bucket = bucket_start(day, granularity)
+        response_cache.bump(_dependency(metric, 'all', granularity, bucket))
+        response_cache.bump(_dependency(metric, str(user_id), granularity, bucket))
+
+
+def invalidate_rows(metric, rows):
+    """Invalidate for an iterable of (user_id, date) pairs, e.g. after a queryset.update()."""
+    for user_id, when in set(rows):
+        invalidate(metric, user_id, when)
+
+
+def parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
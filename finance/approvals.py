@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Sum
+
+from finance import analytics
+from finance.models import MMFTopUp, WithdrawalRequest
+
+DECISIONS = {
+    'approve': 'Approved',
+    'reject': 'Rejected',
+}
+
+
+def available_balances(user_ids):
+    """
+    Available balance per user: successful top-ups minus approved withdrawals.
+    Two grouped queries regardless of how many users are in the batch.
+    """
+    contributed = dict(
+        MMFTopUp.objects.filter(user_id__in=user_ids, status='Success')
+        .values('user_id').annotate(total=Sum('amount')).values_list('user_id', 'total')
+        .order_by()
+    )
+    withdrawn = dict(
+        WithdrawalRequest.objects.filter(user_id__in=user_ids, approval_status='Approved')
+        .values('user_id').annotate(total=Sum('amount')).values_list('user_id', 'total')
+        .order_by()
+    )
+    return {
+        user_id: (contributed.get(user_id) or Decimal('0')) - (withdrawn.get(user_id) or Decimal('0'))
+        for user_id in user_ids
+    }
+
+
+def review_withdrawals(ids, decision, reviewer):
+    """
+    Approve or reject a batch of pending withdrawal requests.
+    
+    Rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so two admins
+    working the same queue never process the same request: whoever gets the
+    lock wins and the other sees it as 'locked'. Approvals are checked
+    against each member's available balance inside the same transaction
+    (oldest request first), with the members' rows locked so concurrent
+    batches can't both spend the same balance, and every accepted row is
+    written with a single UPDATE.
+    
+    Returns {id: {'status': ..., 'detail': ...}} for every requested id.
+    """
+    new_status = DECISIONS[decision]
+    ids = list(dict.fromkeys(ids))
+    outcomes = {}
+    
+    with transaction.atomic():
+        locked = list(
+            WithdrawalRequest.objects
+            .select_for_update(skip_locked=True)
+            .filter(id__in=ids, approval_status='Pending')
+            .order_by('date', 'id')
+            .values_list('id', 'user_id', 'amount', 'date')
+        )
+        
+        accepted = []
+        if decision == 'approve':
+            user_ids = {user_id for _, user_id, _, _ in locked}
+            # Serialize balance checks per member: a concurrent batch approving
+            # other requests of the same member waits here until we commit, then
+            # sees our approvals in its balance. Locked in id order, no deadlocks.
+            list(
+                get_user_model().objects.select_for_update()
+                .filter(id__in=user_ids).order_by('id').values_list('id', flat=True)
+            )
+            balances = available_balances(user_ids)
+            for pk, user_id, amount, _ in locked:
+                if amount > balances[user_id]:
+                    outcomes[pk] = {
+                        'status': 'insufficient_balance',
+                        'detail': f'Available balance is {balances[user_id]}',
+                    }
+                    continue
+                balances[user_id] -= amount
+                accepted.append(pk)
+        else:
+            accepted = [pk for pk, _, _, _ in locked]
+        
+        if accepted:
+            WithdrawalRequest.objects.filter(id__in=accepted).update(
+                approval_status=new_status,
+                approved_by=reviewer,
+            )
+        for pk in accepted:
+            outcomes[pk] = {'status': new_status.lower(), 'detail': ''}
+        
+        # Anything we didn't lock is either already processed, locked by
+        # another reviewer right now, or doesn't exist
+        remaining = [pk for pk in ids if pk not in outcomes]
+        if remaining:
+            current = dict(
+                WithdrawalRequest.objects.filter(id__in=remaining).values_list('id', 'approval_status')
+            )
+            for pk in remaining:
+                if pk not in current:
+                    outcomes[pk] = {'status': 'not_found', 'detail': ''}
+                elif current[pk] == 'Pending':
+                    outcomes[pk] = {'status': 'locked', 'detail': 'Being processed by another reviewer'}
+                else:
+                    outcomes[pk] = {'status': 'already_processed', 'detail': current[pk]}
+        
+        if decision == 'approve' and accepted:
+            accepted_ids = set(accepted)
+            approved_rows = [(user_id, when) for pk, user_id, _, when in locked if pk in accepted_ids]
+            # queryset.update() skips post_save, so evict the analytics buckets ourselves
+            analytics.invalidate_rows('withdrawals', approved_rows)
+    
+    return {pk: outcomes[pk] for pk in ids}
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from finance.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def _ttl():
+    return timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+
+def request_fingerprint(request):
+    """Hash of method, path and body so a key can't be reused for a different request."""
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    body = json.dumps(data, sort_keys=True, default=str)
+    raw = f"{request.method}\n{request.path}\n{body}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Adds Idempotency-Key support to a ViewSet's create().
+    
+    - First request with a key: runs create() and stores the response
+      (status + body) against (user, key) for IDEMPOTENCY_KEY_TTL_HOURS.
+    - Retry with the same key and body: returns the stored response without
+      touching the finance tables (header Idempotent-Replayed: true).
+    - Same key, different body: 422.
+    - Concurrent duplicates: the key row is inserted and locked in the same
+      transaction as the write, so a second request with the same key waits
+      on it and then replays the stored response.
+    
+    Requests without the header behave exactly as before.
+    """
+    
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return super().create(request, *args, **kwargs)
+        
+        if len(key) > 255:
+            return Response(
+                {'detail': f'{IDEMPOTENCY_HEADER} must be at most 255 characters.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fingerprint = request_fingerprint(request)
+        now = timezone.now()
+        
+        with transaction.atomic():
+            record, _ = IdempotencyKey.objects.get_or_create(
+                user=request.user,
+                key=key,
+                defaults={
+                    'method': request.method,
+                    'path': request.path,
+                    'request_fingerprint': fingerprint,
+                    'expires_at': now + _ttl(),
+                },
+            )
+            # Serializes concurrent requests that share this key
+            record = IdempotencyKey.objects.select_for_update().get(pk=record.pk)
+            
+            if record.expires_at <= now:
+                # Expired key: treat it as brand new
+                record.method = request.method
+                record.path = request.path
+                record.request_fingerprint = fingerprint
+                record.response_status = None
+                record.response_body = None
+                record.expires_at = now + _ttl()
+            
+            if record.response_status is not None:
+                if record.request_fingerprint != fingerprint:
+                    return Response(
+                        {'detail': f'This {IDEMPOTENCY_HEADER} was already used for a different request.'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                return Response(
+                    record.response_body,
+                    status=record.response_status,
+                    headers={'Idempotent-Replayed': 'true'}
+                )
+            
+            # Exceptions (e.g. validation errors) roll the key back with the
+            # write, so the client can retry with the same key.
+            response = super().create(request, *args, **kwargs)
+            
+            if response.status_code >= 500:
+                record.delete()
+                return response
+            
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save()
+        
+        return response
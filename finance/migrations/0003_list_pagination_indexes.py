@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0002_idempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditrecord',
+            index=models.Index(fields=['-month', '-id'], name='audit_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mmftopup',
+            index=models.Index(fields=['-date', '-id'], name='topup_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mmftopup',
+            index=models.Index(fields=['user', '-date', '-id'], name='topup_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawalrequest',
+            index=models.Index(fields=['-date', '-id'], name='withdrawal_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='withdrawalrequest',
+            index=models.Index(fields=['user', '-date', '-id'], name='withdrawal_user_date_idx'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.db import models
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
 
 class MMFTopUp(models.Model):
     STATUS_CHOICES = [
@@ -25,6 +26,11 @@ class MMFTopUp(models.Model):
         verbose_name = 'MMF Top Up'
         verbose_name_plural = 'MMF Top Ups'
         unique_together = ['user', 'month']
+        indexes = [
+            # Cursor-paginated list: everything for admins, own rows for members
+            models.Index(fields=['-date', '-id'], name='topup_date_idx'),
+            models.Index(fields=['user', '-date', '-id'], name='topup_user_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.amount} ({self.month})"
@@ -48,6 +54,11 @@ class WithdrawalRequest(models.Model):
         ordering = ['-date']
         verbose_name = 'Withdrawal Request'
         verbose_name_plural = 'Withdrawal Requests'
+        indexes = [
+            # Cursor-paginated list: everything for admins, own rows for members
+            models.Index(fields=['-date', '-id'], name='withdrawal_date_idx'),
+            models.Index(fields=['user', '-date', '-id'], name='withdrawal_user_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.amount} ({self.approval_status})"
@@ -64,6 +75,32 @@ class AuditRecord(models.Model):
     class Meta:
         ordering = ['-month']
         unique_together = ['auditor', 'month']
+        indexes = [
+            models.Index(fields=['-month', '-id'], name='audit_month_idx'),
+        ]
     
     def __str__(self):
-        return f"Audit - {self.month} by {self.auditor.full_name}"
\ No newline at end of file
+        return f"Audit - {self.month} by {self.auditor.full_name}"
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response for a write request sent with an Idempotency-Key header.
+    A retry with the same key gets this response back instead of re-running the write.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    class Meta:
+        unique_together = ['user', 'key']
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+    
+    def __str__(self):
+        return f"{self.key} ({self.method} {self.path})"
\ No newline at end of file
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from finance.models import MMFTopUp, WithdrawalRequest, AuditRecord
+from finance.approvals import DECISIONS
 from accounts.serializers import CustomUserSerializer
 
 class MMFTopUpSerializer(serializers.ModelSerializer):
@@ -29,4 +30,12 @@ class AuditRecordSerializer(serializers.ModelSerializer):
     class Meta:
         model = AuditRecord
         fields = ['id', 'auditor', 'month', 'total_topups', 'total_withdrawals', 'member_count', 'comments', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at']
+
+class WithdrawalBatchReviewSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000,
+    )
+    decision = serializers.ChoiceField(choices=list(DECISIONS))
\ No newline at end of file
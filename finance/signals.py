@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from finance import analytics
+from finance.models import MMFTopUp, WithdrawalRequest
+
+METRIC_FOR_MODEL = {
+    MMFTopUp: 'contributions',
+    WithdrawalRequest: 'withdrawals',
+}
+
+
+def _snapshot_fields(model):
+    _, status_field, _ = analytics.METRICS[METRIC_FOR_MODEL[model]]
+    return {status_field, 'user_id', 'date', 'amount'}
+
+
+def _snapshot(instance):
+    """The fields that decide which analytics buckets a row lands in, and with what value."""
+    _, status_field, counted_status = analytics.METRICS[METRIC_FOR_MODEL[type(instance)]]
+    counted = getattr(instance, status_field) == counted_status
+    return (counted, instance.user_id, instance.date, instance.amount if counted else None)
+
+
+@receiver(post_init, sender=MMFTopUp)
+@receiver(post_init, sender=WithdrawalRequest)
+def remember_analytics_state(sender, instance, **kwargs):
+    # Reading a deferred field here (e.g. after .only()) would trigger another
+    # fetch and another post_init, so only snapshot fully loaded rows
+    if instance.get_deferred_fields().intersection(_snapshot_fields(sender)):
+        instance._analytics_snapshot = None
+    else:
+        instance._analytics_snapshot = _snapshot(instance)
+
+
+@receiver(post_save, sender=MMFTopUp)
+@receiver(post_save, sender=WithdrawalRequest)
+def invalidate_analytics_on_save(sender, instance, created, **kwargs):
+    metric = METRIC_FOR_MODEL[sender]
+    before = None if created else getattr(instance, '_analytics_snapshot', None)
+    after = _snapshot(instance)
+    # Loaded with deferred fields: the old state is unknown, so evict where the row is now
+    unknown = not created and before is None
+
+    if before != after:
+        if before and before[0]:
+            analytics.invalidate(metric, before[1], before[2])
+        if after[0] or unknown:
+            analytics.invalidate(metric, after[1], after[2])
+
+    instance._analytics_snapshot = after
+
+
+@receiver(post_delete, sender=MMFTopUp)
+@receiver(post_delete, sender=WithdrawalRequest)
+def invalidate_analytics_on_delete(sender, instance, **kwargs):
+    counted, user_id, when, _ = _snapshot(instance)
+    if counted:
+        analytics.invalidate(METRIC_FOR_MODEL[sender], user_id, when)
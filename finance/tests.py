@@ -1,3 +1,377 @@
-from django.test import TestCase
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import StreamingHttpResponse
+from django.test import Client, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from finance import analytics, views
+from finance.exports import TOPUP_EXPORT_FIELDS, WITHDRAWAL_EXPORT_FIELDS
+from finance.approvals import review_withdrawals
+from finance.models import AuditRecord, IdempotencyKey, MMFTopUp, WithdrawalRequest
+from GNET.testing import QueryBudgetMixin, make_user, sync_and_async
+
+
+def month(number):
+    return date(2020 + number // 12, number % 12 + 1, 1)
+
+
+class FinanceQueryBudgetTests(QueryBudgetMixin, TestCase):
+    routes_prefix = 'api/finance/'
+    budgets = {
+        'finance_summary': 4,
+        'member_rankings': 3,
+        'contribution_analytics': 4,
+        'topup-list': {'get': 3, 'post': 6},
+        'topup-export': 3,
+        'topup-detail': {'get': 3, 'patch': 4},
+        'withdrawal-list': 3,
+        'withdrawal-batch-review': 9,
+        'withdrawal-export': 3,
+        'withdrawal-detail': {'get': 3, 'patch': 4},
+        'auditrecord-list': 3,
+        'auditrecord-detail': 3,
+    }
+
+    def seed(self, count):
+        # Every batch adds rows for the logged-in member too, so their own lists grow
+        start = MMFTopUp.objects.count()
+        for number in range(start, start + count):
+            other = make_user(f'saver{number}@example.com')
+            for user in (self.member, other):
+                MMFTopUp.objects.create(
+                    user=user, amount=Decimal('1500.00'), month=month(number),
+                    status='Success' if number % 4 else 'Pending', transaction_id=f'MMF{user.pk}-{number}',
+                )
+                WithdrawalRequest.objects.create(
+                    user=user, amount=Decimal('200.00'), reason='School fees',
+                    approval_status='Approved' if number % 3 == 0 else 'Pending',
+                    approved_by=self.admin if number % 3 == 0 else None,
+                )
+            AuditRecord.objects.create(
+                auditor=self.admin, month=month(number), total_topups=Decimal('3000.00'),
+                total_withdrawals=Decimal('400.00'), member_count=2, comments='Reconciled',
+            )
+
+    def pending_withdrawal_ids(self):
+        return {'ids': list(WithdrawalRequest.objects.filter(approval_status='Pending').values_list('id', flat=True)), 'decision': 'approve'}
+
+    def test_finance_summary(self):
+        self.assertConstantQueries('finance_summary', 'get', '/api/finance/summary/', user=self.member)
+
+    def test_member_rankings(self):
+        self.assertConstantQueries('member_rankings', 'get', '/api/finance/rankings/', user=self.member)
+
+    def test_contribution_analytics(self):
+        url = '/api/finance/analytics/?granularity=month&start=2020-01-01&end=2021-12-31'
+        self.assertConstantQueries('contribution_analytics', 'get', url, user=self.admin)
+        self.assertConstantQueries('contribution_analytics', 'get', url, user=self.member)
+
+    def test_topup_list(self):
+        self.assertConstantQueries('topup-list', 'get', '/api/finance/topups/', user=self.admin)
+        self.assertConstantQueries('topup-list', 'get', '/api/finance/topups/', user=self.member)
+        self.assertQueryBudget('topup-list', 'post', '/api/finance/topups/', {
+            'amount': '2500.00', 'month': '2030-01-01', 'transaction_id': 'MMF-NEW',
+        }, user=self.member, status=201)
+
+    def test_topup_export(self):
+        self.assertConstantQueries('topup-export', 'get', '/api/finance/topups/export/', user=self.admin)
+        self.assertConstantQueries('topup-export', 'get', '/api/finance/topups/export/?type=ndjson', user=self.member)
+
+    def test_topup_detail(self):
+        topup = MMFTopUp.objects.filter(user=self.member).first()
+        self.assertQueryBudget('topup-detail', 'get', f'/api/finance/topups/{topup.pk}/', user=self.member)
+        self.assertQueryBudget('topup-detail', 'patch', f'/api/finance/topups/{topup.pk}/', {'status': 'Success'}, user=self.admin)
+
+    def test_withdrawal_list(self):
+        self.assertConstantQueries('withdrawal-list', 'get', '/api/finance/withdrawals/', user=self.admin)
+        self.assertConstantQueries('withdrawal-list', 'get', '/api/finance/withdrawals/', user=self.member)
+        self.assertQueryBudget('withdrawal-list', 'post', '/api/finance/withdrawals/', {
+            'amount': '300.00', 'reason': 'Stock purchase',
+        }, user=self.member, status=201)
+
+    def test_withdrawal_batch_review(self):
+        self.assertConstantQueries('withdrawal-batch-review', 'post', '/api/finance/withdrawals/batch-review/', self.pending_withdrawal_ids, user=self.admin)
+
+    def test_withdrawal_export(self):
+        self.assertConstantQueries('withdrawal-export', 'get', '/api/finance/withdrawals/export/', user=self.admin)
+
+    def test_withdrawal_detail(self):
+        withdrawal = WithdrawalRequest.objects.filter(user=self.member, approved_by__isnull=False).first()
+        self.assertQueryBudget('withdrawal-detail', 'get', f'/api/finance/withdrawals/{withdrawal.pk}/', user=self.member)
+        self.assertQueryBudget('withdrawal-detail', 'patch', f'/api/finance/withdrawals/{withdrawal.pk}/', {'notes': 'Paid out'}, user=self.admin)
+
+    def test_auditrecord_list(self):
+        self.assertConstantQueries('auditrecord-list', 'get', '/api/finance/audits/', user=self.admin)
+
+    def test_auditrecord_detail(self):
+        audit = AuditRecord.objects.first()
+        self.assertQueryBudget('auditrecord-detail', 'get', f'/api/finance/audits/{audit.pk}/', user=self.admin)
+
+
+class WithdrawalReviewTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', role='admin', is_staff=True)
+        self.member = make_user('member@example.com')
+        MMFTopUp.objects.create(
+            user=self.member, amount=Decimal('1000.00'), month=month(0), status='Success', transaction_id='MMF-1',
+        )
+
+    def request_withdrawal(self, amount):
+        return WithdrawalRequest.objects.create(user=self.member, amount=Decimal(amount), reason='School fees').pk
+
+    def test_batch_that_would_overdraw_is_rejected(self):
+        first, second = self.request_withdrawal('600.00'), self.request_withdrawal('600.00')
+        outcomes = review_withdrawals([first, second], 'approve', self.admin)
+        self.assertEqual(outcomes[first]['status'], 'approved')
+        self.assertEqual(outcomes[second]['status'], 'insufficient_balance')
+        self.assertEqual(WithdrawalRequest.objects.get(pk=second).approval_status, 'Pending')
+
+    def test_later_batch_sees_earlier_approvals(self):
+        # What a second, concurrent batch sees once the first commits and releases the member lock
+        first, second = self.request_withdrawal('600.00'), self.request_withdrawal('600.00')
+        self.assertEqual(review_withdrawals([first], 'approve', self.admin)[first]['status'], 'approved')
+        outcome = review_withdrawals([second], 'approve', self.admin)[second]
+        self.assertEqual(outcome['status'], 'insufficient_balance')
+
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', role='admin')
+        self.member = make_user('akinyi.otieno@example.com')
+        self.other = make_user('other@example.com')
+        for number, (user, status) in enumerate([(self.member, 'Success'), (self.member, 'Pending'), (self.other, 'Success')]):
+            MMFTopUp.objects.create(
+                user=user, amount=Decimal('250.50'), month=month(number), status=status, transaction_id=f'MMF-{number}',
+            )
+        MMFTopUp.objects.filter(transaction_id='MMF-0').update(date=timezone.make_aware(datetime(2024, 1, 15, 12)))
+        WithdrawalRequest.objects.create(user=self.member, amount=Decimal('40.00'), reason='School fees, term 2')
+
+    def export(self, path, user=None):
+        self.client.force_login(user or self.admin)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        return b''.join(response.streaming_content).decode()
+
+    def csv_rows(self, path, user=None):
+        return list(csv.reader(self.export(path, user).splitlines()))
+
+    def test_csv_has_a_header_and_one_row_per_record(self):
+        rows = self.csv_rows('/api/finance/topups/export/')
+        self.assertEqual(rows[0], list(TOPUP_EXPORT_FIELDS))
+        self.assertEqual(sorted(row[-2] for row in rows[1:]), ['MMF-0', 'MMF-1', 'MMF-2'])
+        first = dict(zip(rows[0], rows[1]))
+        self.assertEqual(first['transaction_id'], 'MMF-0')
+        self.assertEqual((first['user_email'], first['user_full_name'], first['amount']), ('akinyi.otieno@example.com', 'Akinyi Otieno', '250.50'))
+        self.assertEqual(first['month'], '2020-01-01')
+
+    def test_csv_quotes_values_and_blanks_nulls(self):
+        rows = self.csv_rows('/api/finance/withdrawals/export/')
+        self.assertEqual(rows[0], list(WITHDRAWAL_EXPORT_FIELDS))
+        row = dict(zip(rows[0], rows[1]))
+        self.assertEqual(row['reason'], 'School fees, term 2')
+        self.assertEqual(row['approved_by_email'], '')
+
+    def test_ndjson_is_one_object_per_line(self):
+        lines = self.export('/api/finance/topups/export/?type=ndjson').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(list(records[0]), list(TOPUP_EXPORT_FIELDS))
+        self.assertEqual((records[0]['amount'], records[0]['notes']), ('250.50', ''))
+
+    def test_filters(self):
+        cases = {
+            '?status=Success': ['MMF-0', 'MMF-2'],
+            f'?user={self.other.pk}': ['MMF-2'],
+            '?start=2024-01-15&end=2024-01-15': ['MMF-0'],
+            '?end=2024-01-14': [],
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                rows = self.csv_rows(f'/api/finance/topups/export/{query}')
+                self.assertEqual(sorted(row[-2] for row in rows[1:]), expected)
+
+    def test_members_only_export_their_own(self):
+        rows = self.csv_rows('/api/finance/topups/export/', user=self.other)
+        self.assertEqual([row[-2] for row in rows[1:]], ['MMF-2'])
+
+    def test_bad_parameters_are_rejected(self):
+        self.client.force_login(self.admin)
+        for query in ['?type=xlsx', '?start=15-01-2024', '?user=me']:
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/finance/topups/export/{query}').status_code, 400)
+
+    def test_attachment_headers(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/api/finance/topups/export/?type=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="topups-\d{4}-\d{2}-\d{2}\.ndjson"$')
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+class AnalyticsSeriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.member = make_user('member@example.com')
+
+    def top_up(self, number):
+        return MMFTopUp.objects.create(
+            user=self.member, amount=Decimal('100.00'), month=month(number), status='Success', transaction_id=f'MMF-{number}',
+        )
+
+    def test_bucket_count_matches_iter_buckets(self):
+        for start, end in [(date(2024, 1, 31), date(2024, 3, 1)), (date(2023, 12, 31), date(2025, 1, 1)), (date(2024, 5, 6), date(2024, 5, 6))]:
+            for granularity in analytics.GRANULARITIES:
+                with self.subTest(start=start, end=end, granularity=granularity):
+                    expected = len(list(analytics.iter_buckets(start, end, granularity)))
+                    self.assertEqual(analytics.bucket_count(start, end, granularity), expected)
+
+    def test_huge_range_is_rejected(self):
+        self.client.force_login(self.member)
+        response = self.client.get('/api/finance/analytics/?granularity=day&start=0001-01-01&end=9999-12-31')
+        self.assertEqual(response.status_code, 400)
+
+    def series(self):
+        today = timezone.localdate()
+        series = analytics.get_series('contributions', 'month', today - timedelta(days=60), today, self.member.id)
+        return series[-1]['count']
+
+    def test_deferred_loads_run_one_query(self):
+        for number in range(3):
+            self.top_up(number)
+        with self.assertNumQueries(1):
+            topups = list(MMFTopUp.objects.only('pk'))
+        self.assertEqual(len(topups), 3)
+
+    def test_saving_a_deferred_row_still_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.top_up(1)
+        self.assertEqual(self.series(), 1)
+        topup = MMFTopUp.objects.only('pk', 'status').get()
+        topup.status = 'Failed'
+        with self.captureOnCommitCallbacks(execute=True):
+            topup.save()
+        self.assertEqual(self.series(), 0)
+
+    def test_write_during_compute_is_not_cached_over(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.top_up(1)
+        query_buckets = analytics._query_buckets
+
+        def racing_query(*args):
+            # Read the old rows, then a top-up commits before we store them
+            result = query_buckets(*args)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.top_up(2)
+            return result
+
+        with mock.patch('finance.analytics._query_buckets', side_effect=racing_query):
+            self.assertEqual(self.series(), 1)
+        self.assertEqual(self.series(), 2)
+
+
+class AsyncReadPathTests(TestCase):
+    def test_finance_summary_matches_sync(self):
+        member = make_user('member@example.com')
+        for number, status in enumerate(['Success', 'Success', 'Pending']):
+            MMFTopUp.objects.create(
+                user=member, amount=Decimal('250.00'), month=month(number), status=status, transaction_id=f'MMF-{number}',
+            )
+        MMFTopUp.objects.filter(transaction_id='MMF-0').update(date=timezone.now() - timedelta(days=400))
+        for amount, status in [('100.00', 'Pending'), ('40.00', 'Approved'), ('60.00', 'Rejected')]:
+            WithdrawalRequest.objects.create(user=member, amount=Decimal(amount), reason='School fees', approval_status=status)
+        sync, async_ = sync_and_async(views.finance_summary, views.finance_summary_async, '/api/finance/summary/', member)
+        self.assertEqual(sync, async_)
+        self.assertEqual(sync[0], 200)
+        sync, async_ = sync_and_async(views.finance_summary, views.finance_summary_async, '/api/finance/summary/')
+        self.assertEqual(sync, async_)
+        self.assertEqual(sync[0], 403)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.member = make_user('member@example.com')
+        self.client.force_login(self.member)
+
+    def withdraw(self, key, amount='100.00', **extra):
+        return self.client.post(
+            '/api/finance/withdrawals/', json.dumps({'amount': amount, 'reason': 'School fees'}),
+            content_type='application/json', HTTP_IDEMPOTENCY_KEY=key, **extra,
+        )
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.withdraw('key-1')
+        retry = self.withdraw('key-1')
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(WithdrawalRequest.objects.count(), 1)
+
+    def test_same_key_with_a_different_body_is_rejected(self):
+        self.withdraw('key-1')
+        response = self.withdraw('key-1', amount='250.00')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(WithdrawalRequest.objects.count(), 1)
+
+    def test_keys_are_per_member(self):
+        self.withdraw('key-1')
+        self.client.force_login(make_user('other@example.com'))
+        response = self.withdraw('key-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(WithdrawalRequest.objects.count(), 2)
+
+    def test_expired_key_runs_the_request_again(self):
+        self.withdraw('key-1')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.withdraw('key-1', amount='250.00')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(WithdrawalRequest.objects.count(), 2)
+        record = IdempotencyKey.objects.get()
+        self.assertGreater(record.expires_at, timezone.now())
+        self.assertEqual(self.withdraw('key-1', amount='250.00')['Idempotent-Replayed'], 'true')
+
+    def test_failed_validation_does_not_burn_the_key(self):
+        self.assertEqual(self.withdraw('key-1', amount='not a number').status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.withdraw('key-1').status_code, 201)
+
+    def test_multipart_retry_replays(self):
+        form = {'amount': '500.00', 'month': '2024-03-01', 'status': 'Pending', 'transaction_id': 'MMF-77'}
+        first = self.client.post('/api/finance/topups/', form, HTTP_IDEMPOTENCY_KEY='upload-1')
+        retry = self.client.post('/api/finance/topups/', form, HTTP_IDEMPOTENCY_KEY='upload-1')
+        self.assertEqual((first.status_code, retry.status_code), (201, 201))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(MMFTopUp.objects.count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs row locks (SELECT ... FOR UPDATE); SQLite serializes writes')
+class IdempotencyConcurrencyTests(TransactionTestCase):
+    def test_concurrent_requests_with_one_key_write_once(self):
+        member = make_user('member@example.com')
+
+        def post(_):
+            client = Client()
+            client.force_login(member)
+            try:
+                return client.post(
+                    '/api/finance/withdrawals/', json.dumps({'amount': '100.00', 'reason': 'School fees'}),
+                    content_type='application/json', HTTP_IDEMPOTENCY_KEY='race-1',
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = list(pool.map(post, range(8)))
+        self.assertEqual(statuses, [201] * 8)
+        self.assertEqual(WithdrawalRequest.objects.count(), 1)
@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from finance.views import MMFTopUpViewSet, WithdrawalRequestViewSet, AuditRecordViewSet, finance_summary, member_rankings
+from finance.views import MMFTopUpViewSet, WithdrawalRequestViewSet, AuditRecordViewSet, finance_summary, finance_summary_async, member_rankings, contribution_analytics
 
 router = DefaultRouter()
 router.register(r'topups', MMFTopUpViewSet, basename='topup')
@@ -8,7 +9,8 @@ router.register(r'withdrawals', WithdrawalRequestViewSet, basename='withdrawal')
 router.register(r'audits', AuditRecordViewSet)
 
 urlpatterns = [
-    path('summary/', finance_summary, name='finance_summary'),
+    path('summary/', finance_summary_async if settings.ASYNC_READ_VIEWS else finance_summary, name='finance_summary'),
     path('rankings/', member_rankings, name='member_rankings'),
+    path('analytics/', contribution_analytics, name='contribution_analytics'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
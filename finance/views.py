@@ -1,88 +1,178 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from finance.models import MMFTopUp, WithdrawalRequest, AuditRecord
-from finance.serializers import MMFTopUpSerializer, WithdrawalRequestSerializer, AuditRecordSerializer
-from django.db.models import Sum
+from finance.serializers import (
+    MMFTopUpSerializer,
+    WithdrawalRequestSerializer,
+    AuditRecordSerializer,
+    WithdrawalBatchReviewSerializer,
+)
+from finance.approvals import review_withdrawals
+from finance.idempotency import IdempotentCreateMixin
+from finance.exports import (
+    EXPORT_FORMATS,
+    TOPUP_EXPORT_FIELDS,
+    WITHDRAWAL_EXPORT_FIELDS,
+    ExportFilterError,
+    filter_export_queryset,
+    streaming_export_response,
+)
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+from django.views.decorators.http import require_safe
+from GNET.async_api import NOT_AUTHENTICATED, authenticated_user, json_response
+import asyncio
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
+from finance import analytics
 
-class MMFTopUpViewSet(viewsets.ModelViewSet):
+def _export_response(request, queryset, status_field, fields, filename):
+    """Validate export params and return the streaming CSV/NDJSON response."""
+    # 'format' is reserved by DRF for content negotiation, so the file type is passed as 'type'
+    export_format = request.query_params.get('type', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'detail': f'type must be one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        queryset = filter_export_queryset(queryset, request.query_params, status_field)
+    except ExportFilterError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return streaming_export_response(queryset, fields, export_format, filename)
+
+class MMFTopUpViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     serializer_class = MMFTopUpSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
+        # The serializer nests the member: join it instead of one query per row
+        queryset = MMFTopUp.objects.select_related('user')
         if self.request.user.role == 'admin':
-            return MMFTopUp.objects.all()
-        return MMFTopUp.objects.filter(user=self.request.user)
-    
-    def list(self, request, *args, **kwargs):
-        """Override to always return 200 even with empty queryset"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # One top-up per member per month: report a clash as 400 instead of a 500
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            raise ValidationError({'detail': 'A top-up for this month (or with this transaction ID) already exists.'})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream top-ups as CSV (default) or NDJSON.
+        
+        GET /api/finance/topups/export/?type=csv|ndjson&start=YYYY-MM-DD&end=YYYY-MM-DD&status=Success&user=<id>
+        """
+        return _export_response(request, self.get_queryset(), 'status', TOPUP_EXPORT_FIELDS, 'topups')
 
-class WithdrawalRequestViewSet(viewsets.ModelViewSet):
+class WithdrawalRequestViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     serializer_class = WithdrawalRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-date', '-id')
     
     def get_queryset(self):
+        queryset = WithdrawalRequest.objects.select_related('user', 'approved_by')
         if self.request.user.role == 'admin':
-            return WithdrawalRequest.objects.all()
-        return WithdrawalRequest.objects.filter(user=self.request.user)
-    
-    def list(self, request, *args, **kwargs):
-        """Override to always return 200 even with empty queryset"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream withdrawal requests as CSV (default) or NDJSON.
+        
+        GET /api/finance/withdrawals/export/?type=csv|ndjson&start=YYYY-MM-DD&end=YYYY-MM-DD&status=Approved&user=<id>
+        """
+        return _export_response(request, self.get_queryset(), 'approval_status', WITHDRAWAL_EXPORT_FIELDS, 'withdrawals')
+    
+    @action(detail=False, methods=['post'], url_path='batch-review')
+    def batch_review(self, request):
+        """
+        Approve or reject many pending withdrawals in one transaction (admins only).
+        
+        POST /api/finance/withdrawals/batch-review/
+        {"ids": [1, 2, 3], "decision": "approve" | "reject"}
+        
+        Response: {"results": {"1": {"status": "approved", "detail": ""}, ...}}
+        Possible statuses: approved, rejected, insufficient_balance, locked,
+        already_processed, not_found.
+        """
+        if request.user.role != 'admin':
+            return Response(
+                {'detail': 'Only admins can review withdrawals.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = WithdrawalBatchReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = review_withdrawals(
+            serializer.validated_data['ids'],
+            serializer.validated_data['decision'],
+            request.user,
+        )
+        return Response({'results': results}, status=200)
 
 class AuditRecordViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AuditRecord.objects.all()
+    queryset = AuditRecord.objects.select_related('auditor')
     serializer_class = AuditRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
-    
-    def list(self, request, *args, **kwargs):
-        """Override to always return 200 even with empty queryset"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+    cursor_ordering = ('-month', '-id')
+
+def summary_aggregates(user):
+    """
+    (queryset, aggregates) pairs behind the finance summary: one conditional
+    aggregate per table. finance_summary and finance_summary_async both run these.
+    """
+    today = timezone.now().date()
+    return [
+        (MMFTopUp.objects.filter(user=user, status='Success'), {
+            'total': Sum('amount'),
+            'this_month': Sum('amount', filter=Q(date__month=today.month, date__year=today.year)),
+        }),
+        (WithdrawalRequest.objects.filter(user=user, approval_status__in=['Pending', 'Approved']), {
+            'pending': Sum('amount', filter=Q(approval_status='Pending')),
+            'approved': Sum('amount', filter=Q(approval_status='Approved')),
+        }),
+    ]
+
+def summary_payload(topups, withdrawals):
+    return {
+        'total_contributions': topups['total'] or 0,
+        'this_month_total': topups['this_month'] or 0,
+        'pending_withdrawal': withdrawals['pending'] or 0,
+        'approved_withdrawal': withdrawals['approved'] or 0,
+    }
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def finance_summary(request):
     """Returns finance summary - always returns 200 even with no data"""
-    user = request.user
-    today = timezone.now().date()
-    
-    total_contributions = MMFTopUp.objects.filter(
-        user=user, status='Success'
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    this_month_total = MMFTopUp.objects.filter(
-        user=user, status='Success', 
-        date__month=today.month, date__year=today.year
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    pending_withdrawal = WithdrawalRequest.objects.filter(
-        user=user, approval_status='Pending'
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    approved_withdrawal = WithdrawalRequest.objects.filter(
-        user=user, approval_status='Approved'
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
+    topups, withdrawals = [
+        queryset.aggregate(**aggregates) for queryset, aggregates in summary_aggregates(request.user)
+    ]
+    return Response(summary_payload(topups, withdrawals), status=200)
+
+@require_safe
+async def finance_summary_async(request):
+    """Async variant of finance_summary (ASGI, see GNET/async_api.py); the two aggregates are awaited together."""
+    user = await authenticated_user(request)
+    if user is None:
+        return json_response({'detail': NOT_AUTHENTICATED}, status=403)
     
-    return Response({
-        'total_contributions': total_contributions,
-        'this_month_total': this_month_total,
-        'pending_withdrawal': pending_withdrawal,
-        'approved_withdrawal': approved_withdrawal,
-    }, status=200)
+    topups, withdrawals = await asyncio.gather(*(
+        queryset.aaggregate(**aggregates) for queryset, aggregates in summary_aggregates(user)
+    ))
+    return json_response(summary_payload(topups, withdrawals))
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -94,4 +184,69 @@ def member_rankings(request):
         total=Sum('amount')
     ).order_by('-total')[:20]
     
-    return Response(list(rankings), status=200)
\ No newline at end of file
+    return Response(list(rankings), status=200)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def contribution_analytics(request):
+    """
+    Pre-bucketed contribution/withdrawal series for dashboards.
+    
+    GET /api/finance/analytics/?granularity=day|week|month&start=YYYY-MM-DD&end=YYYY-MM-DD&metric=contributions|withdrawals&user=<id>|all
+    
+    Members only ever get their own series. Admins get the whole
+    organization by default, or one member with ?user=<id>.
+    """
+    granularity = request.query_params.get('granularity', 'month')
+    if granularity not in analytics.GRANULARITIES:
+        return Response(
+            {'detail': f'granularity must be one of: {", ".join(analytics.GRANULARITIES)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    metric = request.query_params.get('metric')
+    if metric and metric not in analytics.METRICS:
+        return Response(
+            {'detail': f'metric must be one of: {", ".join(analytics.METRICS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    metrics = [metric] if metric else list(analytics.METRICS)
+    
+    # Scope: members are pinned to themselves
+    user_param = request.query_params.get('user')
+    if request.user.role != 'admin':
+        user_id = request.user.id
+    elif user_param and user_param != 'all':
+        if not user_param.isdigit():
+            return Response({'detail': 'user must be a numeric user id or "all"'}, status=status.HTTP_400_BAD_REQUEST)
+        user_id = int(user_param)
+    else:
+        user_id = None
+    
+    end = timezone.localdate()
+    if request.query_params.get('end'):
+        end = analytics.parse_day(request.query_params['end'])
+    start = analytics.default_start(end, granularity) if end else None
+    if request.query_params.get('start'):
+        start = analytics.parse_day(request.query_params['start'])
+    if start is None or end is None:
+        return Response({'detail': 'start and end must be dates in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'detail': 'start must be on or before end'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if analytics.bucket_count(start, end, granularity) > analytics.MAX_BUCKETS:
+        return Response(
+            {'detail': f'Range too large: at most {analytics.MAX_BUCKETS} {granularity} buckets per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return Response({
+        'granularity': granularity,
+        'start': analytics.bucket_start(start, granularity).isoformat(),
+        'end': end.isoformat(),
+        'user': user_id,
+        'series': {
+            name: analytics.get_series(name, granularity, start, end, user_id=user_id)
+            for name in metrics
+        },
+    }, status=200)
\ No newline at end of file
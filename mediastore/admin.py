@@ -0,0 +1,9 @@
+from django.contrib import admin
+from mediastore.models import MediaAsset
+
+@admin.register(MediaAsset)
+class MediaAssetAdmin(admin.ModelAdmin):
+    list_display = ['sha256', 'content_type', 'size', 'width', 'height', 'variants_status', 'created_at']
+    list_filter = ['variants_status', 'content_type']
+    search_fields = ['sha256']
+    readonly_fields = ['sha256', 'file', 'content_type', 'size', 'width', 'height', 'variants', 'created_at']
@@ -0,0 +1,232 @@
+"""
+Content-addressed media storage and responsive image variants.
+
+ingest() stores a file under media/sha256/<ab>/<hash>/original.<ext> (once, however
+many times it is uploaded) and schedules generate_variants() in the
+background. That job writes WebP and JPEG copies at VARIANT_WIDTHS next to
+the original, so clients can pick a size instead of downloading the full
+upload. Every stored path includes the content hash, so URLs never change
+meaning and can be cached as immutable.
+"""
+import hashlib
+import io
+import logging
+import mimetypes
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.dispatch import Signal
+from django.urls import reverse
+
+from GNET import background
+from mediastore.models import MediaAsset
+
+MEDIA_PREFIX = 'media/sha256'
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+
+# format -> (file extension, Pillow format, save options)
+VARIANT_FORMATS = {
+    'webp': ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+# Sent with `asset` once its variants are written, so cached responses
+# that embed variant URLs can be refreshed
+variants_ready = Signal()
+
+
+def asset_dir(sha256):
+    return f'{MEDIA_PREFIX}/{sha256[:2]}/{sha256}'
+
+
+def _hash(fileobj):
+    hasher = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b''):
+        hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
+
+def _image_size(fileobj):
+    from PIL import Image
+
+    try:
+        with Image.open(fileobj) as image:
+            return image.size
+    except Exception:
+        return None
+    finally:
+        fileobj.seek(0)
+
+
+def ingest(fieldfile):
+    """
+    Return the MediaAsset for the contents of `fieldfile` (a FieldFile or
+    File), creating it and queueing its variants if the content is new.
+    """
+    fieldfile.open('rb')
+    try:
+        sha256 = _hash(fieldfile)
+        existing = MediaAsset.objects.filter(sha256=sha256).first()
+        if existing is not None:
+            return existing
+
+        name = os.path.basename(fieldfile.name or '')
+        extension = os.path.splitext(name)[1].lower()
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        dimensions = _image_size(fieldfile)
+
+        path = f'{asset_dir(sha256)}/original{extension}'
+        if not default_storage.exists(path):
+            path = default_storage.save(path, fieldfile)
+        size = default_storage.size(path)
+    finally:
+        fieldfile.close()
+
+    try:
+        with transaction.atomic():
+            asset = MediaAsset.objects.create(
+                sha256=sha256,
+                file=path,
+                content_type=content_type,
+                size=size,
+                width=dimensions[0] if dimensions else None,
+                height=dimensions[1] if dimensions else None,
+                variants_status='pending' if dimensions else 'none',
+            )
+    except IntegrityError:
+        # Same bytes ingested concurrently; use the row that won
+        return MediaAsset.objects.get(sha256=sha256)
+
+    if dimensions:
+        background.submit_on_commit(generate_variants, asset.pk)
+    return asset
+
+
+def attach(instance, field='image', asset_field='image_asset'):
+    """
+    Move `instance.<field>` into the media store and link `<asset_field>`.
+
+    The field is repointed at the content-addressed copy and the original
+    upload is deleted, so each distinct image is kept on disk once. Uses
+    queryset.update(), so no save signals fire again.
+    """
+    fieldfile = getattr(instance, field)
+    if not fieldfile:
+        return None
+    if getattr(instance, f'{asset_field}_id') and fieldfile.name.startswith(MEDIA_PREFIX):
+        return getattr(instance, asset_field)
+
+    asset = ingest(fieldfile)
+    old_name = fieldfile.name
+    model = type(instance)
+    model.objects.filter(pk=instance.pk).update(**{field: asset.file.name, asset_field: asset})
+    setattr(instance, asset_field, asset)
+    fieldfile.name = asset.file.name
+
+    if old_name != asset.file.name and not old_name.startswith(MEDIA_PREFIX):
+        if not model.objects.filter(**{field: old_name}).exists():
+            default_storage.delete(old_name)
+    return asset
+
+
+def _render_variant(image, width, pillow_format, options):
+    from PIL import Image
+
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    if pillow_format == 'JPEG' and resized.mode != 'RGB':
+        # JPEG has no alpha channel; flatten onto white
+        background_layer = Image.new('RGB', resized.size, (255, 255, 255))
+        if resized.mode in ('RGBA', 'LA'):
+            background_layer.paste(resized, mask=resized.getchannel('A'))
+        else:
+            background_layer.paste(resized.convert('RGB'))
+        resized = background_layer
+    buffer = io.BytesIO()
+    resized.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(asset_id):
+    """
+    Write the resized copies of one asset. Safe to re-run: existing files
+    are kept, and finished assets are skipped.
+    """
+    from PIL import Image, ImageOps
+
+    asset = MediaAsset.objects.filter(pk=asset_id).first()
+    if asset is None or asset.variants_status in ('ready', 'none'):
+        return
+
+    variants = {}
+    try:
+        with asset.file.open('rb') as original, Image.open(original) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+            # Never upscale: widths at or above the original are skipped
+            widths = [width for width in VARIANT_WIDTHS if width < image.width]
+            for variant_format, (extension, pillow_format, options) in VARIANT_FORMATS.items():
+                variants[variant_format] = {}
+                for width in widths:
+                    path = f'{asset_dir(asset.sha256)}/w{width}.{extension}'
+                    if not default_storage.exists(path):
+                        default_storage.save(path, ContentFile(_render_variant(image, width, pillow_format, options)))
+                    variants[variant_format][str(width)] = path
+    except Exception:
+        logger.exception("Variant generation failed for media asset %s", asset.pk)
+        MediaAsset.objects.filter(pk=asset.pk).update(variants_status='failed')
+        return
+
+    MediaAsset.objects.filter(pk=asset.pk).update(variants=variants, variants_status='ready')
+    asset.variants = variants
+    asset.variants_status = 'ready'
+    variants_ready.send(sender=MediaAsset, asset=asset)
+
+
+def media_url(asset, name='original', request=None):
+    path = reverse('media-file', kwargs={'sha256': asset.sha256, 'name': name})
+    return request.build_absolute_uri(path) if request else path
+
+
+def variant_map(asset, request=None):
+    """
+    URLs for the original and every generated variant:
+    {"original": url, "width": 2400, "height": 1600,
+     "webp": {"320": url, ...}, "jpeg": {"320": url, ...}}
+    Variant dicts are empty until the background job has run.
+    """
+    if asset is None:
+        return None
+    result = {
+        'original': media_url(asset, 'original', request),
+        'width': asset.width,
+        'height': asset.height,
+    }
+    for variant_format, (extension, _, _) in VARIANT_FORMATS.items():
+        widths = (asset.variants or {}).get(variant_format, {})
+        result[variant_format] = {
+            width: media_url(asset, f'w{width}.{extension}', request)
+            for width in widths
+        }
+    return result
+
+
+def resolve(asset, name):
+    """Storage path and content type for `name` ('original' or e.g. 'w640.webp'), or None."""
+    if name == 'original':
+        return asset.file.name, asset.content_type or 'application/octet-stream'
+    for variant_format, (extension, _, _) in VARIANT_FORMATS.items():
+        for width, path in (asset.variants or {}).get(variant_format, {}).items():
+            if name == f'w{width}.{extension}':
+                return path, f'image/{variant_format}'
+    return None
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from mediastore.assets import attach, generate_variants
+from mediastore.models import MediaAsset
+from organization.models import Announcement, Event
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate resized variants for media assets still pending (e.g. after a '
+        'restart dropped queued jobs). Use --ingest-existing once to move images '
+        'uploaded before the media store existed into it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry assets whose variants failed')
+        parser.add_argument('--ingest-existing', action='store_true', help='Ingest announcement/event images that have no asset yet')
+
+    def handle(self, *args, **options):
+        if options['ingest_existing']:
+            ingested = 0
+            for model in (Announcement, Event):
+                for obj in model.objects.filter(image_asset__isnull=True).exclude(image=''):
+                    try:
+                        attach(obj)
+                    except FileNotFoundError:
+                        self.stdout.write(self.style.WARNING(f'Missing file for {model.__name__} {obj.pk}: {obj.image.name}'))
+                        continue
+                    ingested += 1
+            self.stdout.write(f'Ingested {ingested} existing images')
+
+        statuses = ['pending', 'failed'] if options['retry_failed'] else ['pending']
+        if options['retry_failed']:
+            MediaAsset.objects.filter(variants_status='failed').update(variants_status='pending')
+
+        asset_ids = list(MediaAsset.objects.filter(variants_status__in=statuses).values_list('id', flat=True))
+        for asset_id in asset_ids:
+            generate_variants(asset_id)
+
+        ready = MediaAsset.objects.filter(id__in=asset_ids, variants_status='ready').count()
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {ready} of {len(asset_ids)} assets'))
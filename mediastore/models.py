@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class MediaAsset(models.Model):
+    """
+    One stored file, identified by the SHA-256 of its bytes. Uploading the
+    same image twice (or on two announcements) reuses the same asset.
+
+    `variants` maps format -> width -> storage path of the resized copies,
+    e.g. {"webp": {"320": "media/sha256/ab/abcd.../w320.webp"}, "jpeg": {...}}.
+    """
+    VARIANT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+        ('none', 'Not an image'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(default=dict, blank=True)
+    variants_status = models.CharField(max_length=10, choices=VARIANT_STATUS_CHOICES, default='pending', db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.content_type or 'unknown'})"
@@ -0,0 +1,111 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from mediastore import assets
+from mediastore.models import MediaAsset
+
+
+def png(width=800, height=400):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 80, 40)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class MediaStoreTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, BACKGROUND_TASKS_SYNC=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def ingest(self, content, name='banner.png'):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = assets.ingest(SimpleUploadedFile(name, content))
+        asset.refresh_from_db()
+        return asset
+
+
+class IngestTests(MediaStoreTestCase):
+    def test_image_is_stored_under_its_hash_with_variants(self):
+        asset = self.ingest(png())
+        self.assertEqual(asset.file.name, f'{assets.asset_dir(asset.sha256)}/original.png')
+        self.assertEqual((asset.content_type, asset.width, asset.height), ('image/png', 800, 400))
+        self.assertEqual(asset.variants_status, 'ready')
+        # Never upscaled: no 1280 variant of an 800px image
+        self.assertEqual(set(asset.variants['webp']), {'320', '640'})
+        for paths in asset.variants.values():
+            self.assertTrue(all(default_storage.exists(path) for path in paths.values()))
+
+    def test_same_content_is_stored_once(self):
+        content = png()
+        first = self.ingest(content, 'banner.png')
+        second = self.ingest(content, 'copy-of-banner.png')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(MediaAsset.objects.count(), 1)
+        self.assertEqual(default_storage.listdir(assets.asset_dir(first.sha256))[1].count('original.png'), 1)
+
+    def test_non_images_get_no_variants(self):
+        asset = self.ingest(b'%PDF-1.4 business plan', 'plan.pdf')
+        self.assertEqual((asset.content_type, asset.variants_status, asset.variants), ('application/pdf', 'none', {}))
+
+    def test_variant_failure_is_logged_and_recorded(self):
+        with mock.patch('mediastore.assets._render_variant', side_effect=OSError('disk full')), \
+                self.assertLogs('mediastore.assets', 'ERROR') as logs:
+            asset = self.ingest(png())
+        self.assertIn(f'Variant generation failed for media asset {asset.pk}', logs.output[0])
+        self.assertEqual(asset.variants_status, 'failed')
+
+    def test_resolve(self):
+        asset = self.ingest(png())
+        self.assertEqual(assets.resolve(asset, 'original'), (asset.file.name, 'image/png'))
+        self.assertEqual(assets.resolve(asset, 'w320.webp'), (asset.variants['webp']['320'], 'image/webp'))
+        self.assertEqual(assets.resolve(asset, 'w640.jpg'), (asset.variants['jpeg']['640'], 'image/jpeg'))
+        self.assertIsNone(assets.resolve(asset, 'w1280.webp'))
+        self.assertIsNone(assets.resolve(asset, '../original'))
+
+
+class MediaFileViewTests(MediaStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = png()
+        self.asset = self.ingest(self.content)
+        self.url = f'/api/media/{self.asset.sha256}/original'
+
+    def test_full_response_is_immutable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{self.asset.sha256}-original"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-7')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[:8])
+        self.assertEqual(response['Content-Range'], f'bytes 0-7/{len(self.content)}')
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-7', HTTP_IF_RANGE='"something-else"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.asset.sha256}-original"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_variant_and_unknown_names(self):
+        response = self.client.get(f'/api/media/{self.asset.sha256}/w320.webp')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'image/webp'))
+        response.close()
+        self.assertEqual(self.client.get(f'/api/media/{self.asset.sha256}/w1280.webp').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/media/{"0" * 64}/original').status_code, 404)
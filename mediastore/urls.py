@@ -0,0 +1,6 @@
+from django.urls import path
+from mediastore.views import media_file
+
+urlpatterns = [
+    path('<str:sha256>/<str:name>', media_file, name='media-file'),
+]
@@ -0,0 +1,42 @@
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.core.files.storage import default_storage
+from GNET.responses import serve_file
+from mediastore.assets import resolve
+from mediastore.models import MediaAsset
+
+# Paths contain the content hash, so a URL always means the same bytes
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+@api_view(['GET', 'HEAD'])
+@permission_classes([permissions.AllowAny])
+def media_file(request, sha256, name):
+    """
+    Serve an original upload or one of its resized variants.
+    
+    GET /api/media/{sha256}/original
+    GET /api/media/{sha256}/w640.webp
+    
+    Supports Range and If-None-Match; responses are cacheable forever.
+    """
+    asset = MediaAsset.objects.filter(sha256=sha256).first()
+    resolved = resolve(asset, name) if asset else None
+    if resolved is None:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    path, content_type = resolved
+    try:
+        fileobj = default_storage.open(path, 'rb')
+        size = default_storage.size(path)
+    except FileNotFoundError:
+        return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return serve_file(
+        request._request,
+        fileobj,
+        size=size,
+        etag=f'{sha256}-{name}',
+        content_type=content_type,
+        cache_control=IMMUTABLE,
+    )
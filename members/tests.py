@@ -1,3 +1,135 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import CustomUser
+from GNET.testing import QueryBudgetMixin, make_user, sync_and_async
+from members import views
+from members.models import MemberProfile
+
+COUNTIES = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru']
+
+
+class MembersQueryBudgetTests(QueryBudgetMixin, TestCase):
+    routes_prefix = 'api/members/'
+    budgets = {
+        'member_registration': 5,
+        'member_count': 1,
+        'member_directory': 1,
+        'activate_account': 2,
+        'set_password': 2,
+        'password_reset': 1,
+        'password_reset_confirm': 2,
+        'throttle_stats': 2,
+        'memberprofile-list': 1,
+        'memberprofile-detail': {'get': 2, 'patch': 4},
+    }
+
+    def setUp(self):
+        super().setUp()
+        # No real emails; SendGrid isn't what these tests measure
+        sendgrid = mock.patch('members.views.send_email_sendgrid', return_value=True)
+        sendgrid.start()
+        self.addCleanup(sendgrid.stop)
+
+    def seed(self, count):
+        start = CustomUser.objects.count()
+        for number in range(start, start + count):
+            user = make_user(f'member{number}@example.com')
+            MemberProfile.objects.create(
+                user=user, phone='+254700000000', county=COUNTIES[number % len(COUNTIES)],
+                profession='Entrepreneur', skills='Design, Marketing', bio='Building things in Kenya.',
+            )
+
+    def test_member_registration(self):
+        self.assertQueryBudget('member_registration', 'post', '/api/members/join/', {
+            'firstName': 'Wanjiru', 'lastName': 'Kamau', 'email': 'wanjiru@example.com',
+            'profession': 'Designer', 'county': 'Nairobi', 'motivation': 'To build with others.',
+        }, status=201)
+
+    def test_member_count(self):
+        self.assertConstantQueries('member_count', 'get', '/api/members/count/')
+
+    def test_member_directory(self):
+        self.assertConstantQueries('member_directory', 'get', '/api/members/directory/')
+        self.assertConstantQueries('member_directory', 'get', '/api/members/directory/?county=Nairobi&search=Member')
+
+    def test_activate_account(self):
+        self.assertQueryBudget('activate_account', 'post', '/api/members/activate/', {'token': 'token', 'email': 'member@example.com'})
+
+    def test_set_password(self):
+        self.assertQueryBudget('set_password', 'post', '/api/members/set-password/', {'email': 'member@example.com', 'password': 'newpass12345'})
+
+    def test_password_reset(self):
+        self.assertQueryBudget('password_reset', 'post', '/api/members/password-reset/', {'email': 'member@example.com'})
+
+    def test_password_reset_confirm(self):
+        self.assertQueryBudget('password_reset_confirm', 'post', '/api/members/password-reset/confirm/', {
+            'uid': urlsafe_base64_encode(force_bytes(self.member.pk)),
+            'token': default_token_generator.make_token(self.member),
+            'password': 'newpass12345',
+        })
+
+    def test_throttle_stats(self):
+        self.assertQueryBudget('throttle_stats', 'get', '/api/members/throttle-stats/', user=self.admin)
+
+    def test_memberprofile_list(self):
+        self.assertConstantQueries('memberprofile-list', 'get', '/api/members/profiles/')
+
+    def test_memberprofile_detail(self):
+        profile = MemberProfile.objects.first()
+        self.assertQueryBudget('memberprofile-detail', 'get', f'/api/members/profiles/{profile.pk}/')
+        self.assertQueryBudget('memberprofile-detail', 'patch', f'/api/members/profiles/{profile.pk}/', {'county': 'Kisumu'}, user=profile.user)
+
+
+@override_settings(PUBLIC_WRITE_THROTTLES={'password_reset': {'ip': '3/hour'}})
+class PublicWriteThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        sendgrid = mock.patch('members.views.send_email_sendgrid', return_value=True)
+        sendgrid.start()
+        self.addCleanup(sendgrid.stop)
+
+    def reset_statuses(self, forwarded_for, remote_addr='203.0.113.7'):
+        return [
+            self.client.post(
+                '/api/members/password-reset/', {'email': f'user{number}@example.com'},
+                content_type='application/json', REMOTE_ADDR=remote_addr, HTTP_X_FORWARDED_FOR=forwarded,
+            ).status_code
+            for number, forwarded in enumerate(forwarded_for)
+        ]
+
+    def test_spoofed_forwarded_for_does_not_reset_the_ip_bucket(self):
+        statuses = self.reset_statuses([f'198.51.100.{number}' for number in range(5)])
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+
+    def test_behind_a_proxy_the_trusted_hop_is_used(self):
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            # The client prepends whatever it likes; the proxy appends the real address
+            statuses = self.reset_statuses([f'198.51.100.{number}, 192.0.2.10' for number in range(5)], remote_addr='10.0.0.1')
+        self.assertEqual(statuses, [200, 200, 200, 429, 429])
+
+
+class AsyncReadPathTests(TestCase):
+    def test_responses_match_sync(self):
+        for number, county in enumerate(['Nairobi', 'Kisumu', 'Nairobi']):
+            MemberProfile.objects.create(
+                user=make_user(f'member{number}@example.com'), phone='+254700000000', county=county,
+                profession='Entrepreneur', skills='Design', bio='Building things in Kenya.',
+            )
+        cases = [
+            (views.member_count, views.member_count_async, '/api/members/count/'),
+            (views.member_directory, views.member_directory_async, '/api/members/directory/'),
+            (views.member_directory, views.member_directory_async, '/api/members/directory/?county=Nairobi&search=member1'),
+        ]
+        for sync_view, async_view, path in cases:
+            with self.subTest(path):
+                sync, async_ = sync_and_async(sync_view, async_view, path)
+                self.assertEqual(sync, async_)
+                self.assertEqual(sync[0], 200)
@@ -1,15 +1,19 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from members.views import (
     MemberProfileViewSet, 
     member_count, 
     member_directory,
+    member_count_async,
+    member_directory_async,
     member_registration,
     activate_account,
     # NEW: Password management views
     set_password,
     request_password_reset,
     reset_password_confirm,
+    throttle_stats,
 )
 
 router = DefaultRouter()
@@ -18,8 +22,8 @@ router.register(r'profiles', MemberProfileViewSet)
 urlpatterns = [
     # Existing member endpoints
     path('join/', member_registration, name='member_registration'),
-    path('count/', member_count, name='member_count'),
-    path('directory/', member_directory, name='member_directory'),
+    path('count/', member_count_async if settings.ASYNC_READ_VIEWS else member_count, name='member_count'),
+    path('directory/', member_directory_async if settings.ASYNC_READ_VIEWS else member_directory, name='member_directory'),
     path('activate/', activate_account, name='activate_account'),
     
     # NEW: Password management endpoints
@@ -27,6 +31,9 @@ urlpatterns = [
     path('password-reset/', request_password_reset, name='password_reset'),
     path('password-reset/confirm/', reset_password_confirm, name='password_reset_confirm'),
     
+    # Abuse protection for the public write endpoints
+    path('throttle-stats/', throttle_stats, name='throttle_stats'),
+    
     # Router URLs (profiles CRUD)
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, throttle_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
@@ -10,8 +10,12 @@ from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
 from django.conf import settings
+from django.views.decorators.http import require_safe
 from members.models import MemberProfile
 from members.serializers import MemberProfileSerializer
+from GNET import throttling
+from GNET.async_api import json_response
+from GNET.throttling import RegistrationThrottle, PasswordResetThrottle, SetPasswordThrottle
 
 User = get_user_model()
 
@@ -47,7 +51,7 @@ def send_email_sendgrid(subject, html_message, recipient_email):
 # ==================== EXISTING VIEWSETS ====================
 
 class MemberProfileViewSet(viewsets.ModelViewSet):
-    queryset = MemberProfile.objects.all()
+    queryset = MemberProfile.objects.select_related('user')
     serializer_class = MemberProfileSerializer
     permission_classes = [permissions.AllowAny]
     
@@ -66,26 +70,46 @@ def member_count(request):
     return Response({'total_members': count})
 
 
-@api_view(['GET'])
-@permission_classes([permissions.AllowAny])
-def member_directory(request):
-    search = request.query_params.get('search', '')
-    county = request.query_params.get('county', '')
+def member_directory_queryset(params):
+    """Profiles for the directory, filtered by ?search= and ?county= (shared by the sync and async views)."""
+    search = params.get('search', '')
+    county = params.get('county', '')
     
-    queryset = MemberProfile.objects.all()
+    # The serializer nests profile.user: join it instead of one query per
+    # profile (and lazy loads aren't allowed in async code)
+    queryset = MemberProfile.objects.select_related('user')
     
     if search:
         queryset = queryset.filter(user__full_name__icontains=search)
     if county:
         queryset = queryset.filter(county=county)
-    
-    serializer = MemberProfileSerializer(queryset, many=True)
+    return queryset
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def member_directory(request):
+    serializer = MemberProfileSerializer(member_directory_queryset(request.query_params), many=True)
     return Response(serializer.data)
 
 
+# ==================== ASYNC READ PATH (ASGI, see GNET/async_api.py) ====================
+
+@require_safe
+async def member_count_async(request):
+    return json_response({'total_members': await MemberProfile.objects.acount()})
+
+
+@require_safe
+async def member_directory_async(request):
+    profiles = [profile async for profile in member_directory_queryset(request.GET)]
+    return json_response(MemberProfileSerializer(profiles, many=True).data)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 @authentication_classes([])
+@throttle_classes([RegistrationThrottle])
 def member_registration(request):
     """
     Handle member registration from the join form.
@@ -212,6 +236,7 @@ def activate_account(request):
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 @authentication_classes([])
+@throttle_classes([SetPasswordThrottle])
 def set_password(request):
     """
     Allow new users to set their password for the first time.
@@ -264,6 +289,7 @@ def set_password(request):
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 @authentication_classes([])
+@throttle_classes([PasswordResetThrottle])
 def request_password_reset(request):
     """
     Generate and send password reset token to user's email.
@@ -401,11 +427,28 @@ def reset_password_confirm(request):
         )
 
 
+# ==================== THROTTLING ====================
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def throttle_stats(request):
+    """
+    Passed/blocked counts and configured limits for the public write endpoints (admins only).
+    """
+    if request.user.role != 'admin':
+        return Response(
+            {'detail': 'Only admins can view throttle statistics.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return Response(throttling.throttle_stats(), status=200)
+
+
 # ==================== EMAIL UTILITY FUNCTIONS ====================
 
 def send_welcome_email(user, temp_password):
     """
     Send welcome email to new member with password setup instructions.
+    Returns True once SendGrid accepted it; raises if it didn't.
     """
     frontend_url = getattr(settings, 'FRONTEND_URL', 'https://genentreprenuersnetwork.netlify.app')
     reset_link = f"{frontend_url}/set-password?email={user.email}"
@@ -446,6 +489,7 @@ def send_welcome_email(user, temp_password):
     success = send_email_sendgrid(subject, html_message, user.email)
     if not success:
         raise Exception("Failed to send welcome email via SendGrid")
+    return True
 
 
 def send_password_set_confirmation(user):
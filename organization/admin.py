@@ -1,5 +1,7 @@
-from django.contrib import admin
-from organization.models import Announcement, Event, MembershipApplication
+from collections import Counter
+from django.contrib import admin, messages
+from organization.models import Announcement, Event, EventRSVP, MembershipApplication
+from organization.onboarding import approve_applications
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
@@ -7,14 +9,42 @@ class AnnouncementAdmin(admin.ModelAdmin):
     list_filter = ['priority', 'created_at']
     search_fields = ['title', 'message']
 
+class EventRSVPInline(admin.TabularInline):
+    model = EventRSVP
+    fields = ['user', 'status', 'queued_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        # Seat counts are kept by organization/rsvp.py, not by editing rows here
+        return False
+
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ['title', 'date', 'venue']
-    list_filter = ['date']
+    list_display = ['title', 'date', 'venue', 'recurrence_frequency', 'capacity', 'seats_taken']
+    list_filter = ['date', 'recurrence_frequency']
     search_fields = ['title', 'venue']
+    readonly_fields = ['seats_taken', 'last_occurrence_at']
+    inlines = [EventRSVPInline]
 
 @admin.register(MembershipApplication)
 class MembershipApplicationAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'email', 'status', 'submitted_at']
+    list_display = ['full_name', 'email', 'status', 'submitted_at', 'claimed_by', 'lease_expires_at', 'reviewed_by']
     list_filter = ['status', 'submitted_at']
-    search_fields = ['full_name', 'email']
\ No newline at end of file
+    list_select_related = ['claimed_by', 'reviewed_by']
+    search_fields = ['full_name', 'email']
+    actions = ['approve_and_create_members']
+    
+    @admin.action(description='Approve selected applications and create member accounts')
+    def approve_and_create_members(self, request, queryset):
+        results = approve_applications(list(queryset.values_list('id', flat=True)), reviewer=request.user)
+        counts = Counter(result['status'] for result in results.values())
+        self.message_user(request, f"Approved {counts.pop('approved', 0)} application(s); welcome emails are being sent.")
+        problems = [
+            f"#{application_id}: {result['status'].replace('_', ' ')}" + (f" ({result['detail']})" if result['detail'] else '')
+            for application_id, result in results.items()
+            if result['status'] != 'approved'
+        ]
+        if problems:
+            self.message_user(request, 'Skipped: ' + '; '.join(problems), level=messages.WARNING)
\ No newline at end of file
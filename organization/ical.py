@@ -0,0 +1,301 @@
+"""
+iCalendar (RFC 5545) feeds for events and member milestones.
+
+Each event is rendered to a VEVENT fragment once and cached under its id
+and updated_at, so building a feed after one event changes re-renders just
+that event; the rest are a single cache.get_many(). Whole feeds are cached
+by the response cache on top of that (see organization/views.py), so a
+calendar client polling every few minutes mostly gets a 304.
+
+Recurring events are anchored to settings.TIME_ZONE (DTSTART;TZID=...), so
+feeds that contain one carry a VTIMEZONE for it (RFC 5545 section 3.6.5),
+built from the zoneinfo database.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from GNET import response_cache
+from organization import recurrence
+from organization.models import Event
+from organization.signals import CALENDAR_FEEDS
+
+PRODID = '-//G-NET//Events//EN'
+CALENDAR_NAME = 'G-NET Events'
+UID_DOMAIN = 'gnet'
+
+# Events have no end time; calendars get this default length
+DEFAULT_EVENT_DURATION = timedelta(hours=2)
+# Past events older than this are left out of the feed
+PAST_EVENTS_WINDOW = timedelta(days=90)
+# Offset changes listed in the VTIMEZONE, in years before/after today
+TIMEZONE_YEARS_BACK = 1
+TIMEZONE_YEARS_AHEAD = 10
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24 * 30
+
+FEED_TOKEN_SALT = 'organization.ical.member-feed'
+
+
+# ==================== RFC 5545 HELPERS ====================
+
+def escape_text(value):
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line at 75 octets, never splitting a UTF-8 character."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def format_local(value):
+    return timezone.localtime(value).strftime('%Y%m%dT%H%M%S')
+
+
+def _lines(*lines):
+    return ''.join(fold(line) + '\r\n' for line in lines if line)
+
+
+def format_offset(offset):
+    minutes = int(offset.total_seconds()) // 60
+    sign = '-' if minutes < 0 else '+'
+    return f'{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}'
+
+
+# ==================== COMPONENTS ====================
+
+def render_event(event):
+    extra = []
+    if event.link:
+        extra.append(f'URL:{event.link}')
+    rrule = recurrence.rrule(event)
+    if rrule:
+        # Recurring events repeat at the same local time, so anchor them to
+        # the site time zone rather than UTC
+        start = f'DTSTART;TZID={settings.TIME_ZONE}:{format_local(event.date)}'
+        end = f'DTEND;TZID={settings.TIME_ZONE}:{format_local(event.date + DEFAULT_EVENT_DURATION)}'
+        extra.append(f'RRULE:{rrule}')
+    else:
+        start = f'DTSTART:{format_datetime(event.date)}'
+        end = f'DTEND:{format_datetime(event.date + DEFAULT_EVENT_DURATION)}'
+    return _lines(
+        'BEGIN:VEVENT',
+        f'UID:event-{event.pk}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_datetime(event.updated_at)}',
+        f'LAST-MODIFIED:{format_datetime(event.updated_at)}',
+        start,
+        end,
+        f'SUMMARY:{escape_text(event.title)}',
+        f'LOCATION:{escape_text(event.venue)}',
+        f'DESCRIPTION:{escape_text(event.description)}',
+        *extra,
+        'END:VEVENT',
+    )
+
+
+def _offset_changes(zone, start, end):
+    """UTC instants in [start, end) where `zone` changes its UTC offset (found day by day, then to the second)."""
+    def offset(seconds):
+        return datetime.fromtimestamp(seconds, dt_timezone.utc).astimezone(zone).utcoffset()
+
+    changes = []
+    day, end = int(start.timestamp()), int(end.timestamp())
+    while day < end:
+        next_day = day + 86400
+        if offset(day) != offset(next_day):
+            low, high = day, next_day
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(middle) == offset(low):
+                    low = middle
+                else:
+                    high = middle
+            changes.append(datetime.fromtimestamp(high, dt_timezone.utc))
+        day = next_day
+    return changes
+
+
+@lru_cache(maxsize=8)
+def render_timezone(name, year):
+    """
+    VTIMEZONE for zone `name`: the offset in force at the start of the window
+    around `year`, then one observance per change in it. A zone without DST,
+    like Africa/Nairobi, is a single STANDARD block.
+    """
+    zone = ZoneInfo(name)
+    start = datetime(year - TIMEZONE_YEARS_BACK, 1, 1, tzinfo=dt_timezone.utc)
+    end = datetime(year + TIMEZONE_YEARS_AHEAD + 1, 1, 1, tzinfo=dt_timezone.utc)
+
+    def observance(at, offset_from):
+        local = at.astimezone(zone)
+        kind = 'DAYLIGHT' if local.dst() else 'STANDARD'
+        return (
+            f'BEGIN:{kind}',
+            # Local time of the change, on the clock it changes from
+            f'DTSTART:{(at + offset_from).strftime("%Y%m%dT%H%M%S")}',
+            f'TZOFFSETFROM:{format_offset(offset_from)}',
+            f'TZOFFSETTO:{format_offset(local.utcoffset())}',
+            f'TZNAME:{local.tzname()}',
+            f'END:{kind}',
+        )
+
+    initial = start.astimezone(zone).utcoffset()
+    lines = list(observance(start, initial))
+    offset = initial
+    for at in _offset_changes(zone, start, end):
+        lines += observance(at, offset)
+        offset = at.astimezone(zone).utcoffset()
+    return _lines('BEGIN:VTIMEZONE', f'TZID:{name}', *lines, 'END:VTIMEZONE')
+
+
+def render_milestone(milestone):
+    """All-day entry on the milestone's due date."""
+    return _lines(
+        'BEGIN:VEVENT',
+        f'UID:milestone-{milestone.pk}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_datetime(milestone.idea.updated_at)}',
+        f'DTSTART;VALUE=DATE:{milestone.due_date.strftime("%Y%m%d")}',
+        f'DTEND;VALUE=DATE:{(milestone.due_date + timedelta(days=1)).strftime("%Y%m%d")}',
+        f'SUMMARY:{escape_text(milestone.title)} ({escape_text(milestone.status)})',
+        f'DESCRIPTION:{escape_text("Milestone for " + milestone.idea.title)}',
+        'END:VEVENT',
+    )
+
+
+def _fragment_key(event):
+    return f'ical:vevent:{event.pk}:{event.updated_at.timestamp()}'
+
+
+def event_fragments(events):
+    """VEVENT text for each event, re-rendering only those whose cached copy is stale."""
+    events = list(events)
+    keys = [_fragment_key(event) for event in events]
+    cached = cache.get_many(keys)
+    fresh = {}
+    fragments = []
+    for event, key in zip(events, keys):
+        fragment = cached.get(key)
+        if fragment is None:
+            fragment = fresh[key] = render_event(event)
+        fragments.append(fragment)
+    if fresh:
+        cache.set_many(fresh, FRAGMENT_TIMEOUT)
+    return fragments
+
+
+def feed_events():
+    since = timezone.now() - PAST_EVENTS_WINDOW
+    # A recurring event stays in the feed (as one VEVENT with an RRULE) until its series ends
+    return Event.objects.filter(recurrence.upcoming_q(since)).order_by('date', 'id').only(
+        'id', 'title', 'date', 'venue', 'description', 'link', 'updated_at',
+        'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count',
+    )
+
+
+def render_calendar(fragments, name=CALENDAR_NAME):
+    header = _lines(
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+        'X-PUBLISHED-TTL:PT15M',
+    )
+    if any(f';TZID={settings.TIME_ZONE}:' in fragment for fragment in fragments):
+        header += render_timezone(settings.TIME_ZONE, timezone.now().year)
+    return header + ''.join(fragments) + 'END:VCALENDAR\r\n'
+
+
+def organization_calendar():
+    return render_calendar(event_fragments(feed_events()))
+
+
+def member_calendar(user):
+    """Organization events plus the milestones of the member's own ideas."""
+    from projects.models import Milestone
+
+    milestones = (
+        Milestone.objects.filter(idea__user=user)
+        .select_related('idea')
+        .only('id', 'title', 'status', 'due_date', 'idea__title', 'idea__updated_at')
+        .order_by('due_date', 'id')
+    )
+    fragments = event_fragments(feed_events())
+    fragments += [render_milestone(milestone) for milestone in milestones]
+    return render_calendar(fragments, name=f'{CALENDAR_NAME} - {user.full_name or user.email}')
+
+
+class ICalendarRenderer(BaseRenderer):
+    """Passes a pre-rendered calendar string through; error payloads render empty."""
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data.encode(self.charset) if isinstance(data, str) else b''
+
+
+# ==================== MEMBER FEED TOKENS ====================
+
+def member_feed_token(user):
+    """
+    Calendar apps can't log in, so the per-member URL carries a signed user
+    id and the member's calendar_feed_version; rotate_member_feed() bumps
+    the version, which revokes every URL handed out before.
+    """
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(f'{user.pk}:{user.calendar_feed_version}')
+
+
+def parse_member_feed_token(token):
+    """(user_id, feed_version) from a feed token, or None if it isn't one of ours."""
+    try:
+        value = signing.Signer(salt=FEED_TOKEN_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+    # Tokens issued before rotation existed sign just the user id: version 0
+    user_id, _, version = value.partition(':')
+    try:
+        return int(user_id), int(version or 0)
+    except ValueError:
+        return None
+
+
+def rotate_member_feed(user):
+    """Revoke the member's current feed URL; returns the new token."""
+    get_user_model().objects.filter(pk=user.pk).update(calendar_feed_version=F('calendar_feed_version') + 1)
+    user.refresh_from_db(fields=['calendar_feed_version'])
+    # Cached feeds are keyed on the URL; drop the ones behind revoked tokens
+    response_cache.bump(CALENDAR_FEEDS)
+    return member_feed_token(user)
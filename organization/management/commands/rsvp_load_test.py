@@ -0,0 +1,98 @@
+import random
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from organization import rsvp as rsvps
+from organization.models import Event, EventRSVP
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer RSVP, cancel and waitlist promotion for a throwaway event from '
+        'many threads at once, then check that the event was never overbooked '
+        'and its seat counter matches the confirmed RSVPs. Run it against '
+        'PostgreSQL; SQLite serializes writers and will mostly report lock errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=300, help='Members racing for seats')
+        parser.add_argument('--capacity', type=int, default=50, help='Seats at the event')
+        parser.add_argument('--workers', type=int, default=32, help='Concurrent threads (each uses its own DB connection)')
+        parser.add_argument('--churn', type=int, default=500, help='Random cancel/re-RSVP operations after the initial burst')
+        parser.add_argument('--keep', action='store_true', help="Don't delete the test event and users afterwards")
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('⚠️ SQLite has no row locks; expect "database is locked" errors.'))
+
+        run = uuid.uuid4().hex[:8]
+        event = Event.objects.create(
+            title=f'RSVP load test {run}',
+            date=timezone.now() + timedelta(days=30),
+            venue='Load test',
+            description='Created by the rsvp_load_test command.',
+            capacity=options['capacity'],
+        )
+        users = User.objects.bulk_create([
+            User(email=f'rsvp-load-{run}-{i}@example.invalid', username=f'rsvp-load-{run}-{i}', full_name=f'Load Test {i}', role='member')
+            for i in range(options['users'])
+        ])
+        try:
+            self.stdout.write(f"Burst: {len(users)} RSVPs (plus a duplicate submit each) for {options['capacity']} seats")
+            burst = [(rsvps.rsvp, user) for user in users] * 2
+            random.shuffle(burst)
+            self._run(event.pk, burst, options['workers'])
+            ok = self._check(event.pk)
+
+            self.stdout.write(f"Churn: {options['churn']} random cancels and re-RSVPs")
+            churn = [(random.choice([rsvps.rsvp, rsvps.cancel]), random.choice(users)) for _ in range(options['churn'])]
+            self._run(event.pk, churn, options['workers'])
+            ok = self._check(event.pk) and ok
+        finally:
+            if not options['keep']:
+                event.delete()
+                User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        if not ok:
+            raise CommandError('❌ Seat accounting is inconsistent, see above')
+        self.stdout.write(self.style.SUCCESS('✅ No overbooking; seat counter matches confirmed RSVPs'))
+
+    def _run(self, event_id, operations, workers):
+        def call(operation):
+            func, user = operation
+            try:
+                func(event_id, user)
+                return func.__name__
+            except Exception as e:
+                return f'{func.__name__} error: {type(e).__name__}: {e}'
+            finally:
+                connections.close_all()
+
+        started = timezone.now()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = Counter(pool.map(call, operations))
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(f'  {len(operations)} operations in {elapsed:.2f}s')
+        for outcome, count in outcomes.most_common():
+            self.stdout.write(f'  {count:>6}  {outcome}')
+
+    def _check(self, event_id):
+        event = Event.objects.get(pk=event_id)
+        statuses = Counter(EventRSVP.objects.filter(event_id=event_id).values_list('status', flat=True))
+        self.stdout.write(
+            f"  seats_taken={event.seats_taken}/{event.capacity}  confirmed={statuses['confirmed']}  "
+            f"waitlisted={statuses['waitlisted']}  cancelled={statuses['cancelled']}"
+        )
+        problems = rsvps.check_consistency(event_id)
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(f'  ❌ {problem}'))
+        return not problems
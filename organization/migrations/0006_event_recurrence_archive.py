@@ -0,0 +1,50 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+def backfill_last_occurrence(apps, schema_editor):
+    """Existing events are all one-off: their last occurrence is their date."""
+    Event = apps.get_model('organization', 'Event')
+    Event.objects.update(last_occurrence_at=models.F('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediastore', '0001_initial'),
+        ('organization', '0005_event_rsvp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='last_occurrence_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Stop after this many occurrences', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_frequency',
+            field=models.CharField(blank=True, choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], max_length=10),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Every N days/weeks/months/years'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_until',
+            field=models.DateTimeField(blank=True, help_text='No occurrences after this', null=True),
+        ),
+        migrations.RunPython(backfill_last_occurrence, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['last_occurrence_at', 'id'], name='event_last_occurrence_idx'),
+        ),
+    ]
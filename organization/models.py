@@ -1,10 +1,15 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
+from organization import recurrence
+
 class Announcement(models.Model):
     title = models.CharField(max_length=255)
     message = models.TextField()
     priority = models.CharField(max_length=20, choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], default='Medium')
     image = models.ImageField(upload_to='announcements/', blank=True)
+    image_asset = models.ForeignKey('mediastore.MediaAsset', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -20,14 +25,93 @@ class Event(models.Model):
     venue = models.CharField(max_length=255)
     description = models.TextField()
     image = models.ImageField(upload_to='events/', blank=True)
+    image_asset = models.ForeignKey('mediastore.MediaAsset', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
     link = models.URLField(blank=True)
+    # RSVPs (see organization/rsvp.py); no capacity means unlimited seats
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+    # Recurrence (see organization/recurrence.py); `date` is the first occurrence
+    recurrence_frequency = models.CharField(max_length=10, choices=recurrence.FREQUENCY_CHOICES, blank=True)
+    recurrence_interval = models.PositiveSmallIntegerField(default=1, help_text="Every N days/weeks/months/years")
+    recurrence_until = models.DateTimeField(null=True, blank=True, help_text="No occurrences after this")
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True, help_text="Stop after this many occurrences")
+    # Start of the final occurrence (NULL: recurs forever); kept up to date by save()
+    last_occurrence_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    RECURRENCE_FIELDS = {'date', 'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count'}
     
     class Meta:
         ordering = ['date']
+        indexes = [
+            # Upcoming filters and the cursor-paginated archive
+            models.Index(fields=['last_occurrence_at', 'id'], name='event_last_occurrence_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def clean(self):
+        if self.recurrence_frequency:
+            if self.recurrence_interval < 1:
+                raise ValidationError({'recurrence_interval': 'Must be at least 1.'})
+            if self.recurrence_until and self.recurrence_count:
+                raise ValidationError('Set either an end date or a number of occurrences, not both.')
+            if self.recurrence_count and self.recurrence_count > recurrence.MAX_COUNT:
+                raise ValidationError({'recurrence_count': f'At most {recurrence.MAX_COUNT} occurrences.'})
+            if self.recurrence_until and self.date and self.recurrence_until < self.date:
+                raise ValidationError({'recurrence_until': 'Must be after the first occurrence.'})
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.RECURRENCE_FIELDS.intersection(update_fields):
+            self.last_occurrence_at = recurrence.last_occurrence(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'last_occurrence_at'}
+        # seats_taken is only ever changed by atomic UPDATEs in rsvp.py; a full
+        # save from a stale instance (e.g. the admin form) must not overwrite it
+        if self.pk and not self._state.adding and update_fields is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'seats_taken'
+            ]
+        super().save(*args, **kwargs)
+    
+    def occurrences(self, start, end):
+        return recurrence.occurrences(self, start, end)
+    
+    @property
+    def seats_left(self):
+        if self.capacity is None:
+            return None
+        return max(self.capacity - self.seats_taken, 0)
+
+class EventRSVP(models.Model):
+    STATUS_CHOICES = [
+        ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
+        ('cancelled', 'Cancelled'),
+    ]
+    
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='rsvps')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='event_rsvps')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    # Waitlist order; reset when a cancelled RSVP is renewed
+    queued_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['queued_at']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'user'], name='unique_event_rsvp'),
+        ]
+        indexes = [
+            models.Index(fields=['event', 'status', 'queued_at'], name='rsvp_event_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user} - {self.event} ({self.status})"
 
 class MembershipApplication(models.Model):
     STATUS_CHOICES = [
@@ -43,8 +127,20 @@ class MembershipApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     submitted_at = models.DateTimeField(auto_now_add=True)
     
+    # Review queue (see organization/review_queue.py)
+    claimed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_applications')
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True, help_text="The claim lapses and the application returns to the queue after this")
+    reviewed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_applications')
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-submitted_at']
+        indexes = [
+            # Review queue: oldest pending applications first
+            models.Index(fields=['status', 'submitted_at'], name='application_status_sub_idx'),
+            models.Index(fields=['reviewed_by', 'reviewed_at'], name='application_reviewer_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} - {self.status}"
\ No newline at end of file
@@ -0,0 +1,159 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from GNET import background, response_cache
+from members.models import MemberProfile
+from organization.models import MembershipApplication
+from organization.signals import APPLICATIONS
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+
+def _send_welcome_emails(user_ids):
+    """Background job: one welcome email per new member; failures are logged, not retried."""
+    from members.views import send_welcome_email
+
+    for user in User.objects.filter(id__in=user_ids):
+        try:
+            sent = send_welcome_email(user, None)
+        except Exception:
+            logger.exception('Failed to send welcome email to %s', user.email)
+            continue
+        if sent:
+            logger.info('Welcome email sent to %s', user.email)
+        else:
+            logger.warning('Welcome email to %s was not sent', user.email)
+
+
+def _approve_batch(ids, reviewer):
+    results = {}
+
+    applications = list(
+        MembershipApplication.objects.select_for_update(skip_locked=True)
+        .filter(id__in=ids)
+        .order_by('id')
+    )
+    found = {application.id: application for application in applications}
+
+    # Rows we couldn't lock are being handled by someone else right now
+    missing = [application_id for application_id in ids if application_id not in found]
+    existing_ids = set(MembershipApplication.objects.filter(id__in=missing).values_list('id', flat=True))
+    for application_id in missing:
+        if application_id in existing_ids:
+            results[str(application_id)] = {'status': 'locked', 'detail': 'Another reviewer is processing this application.'}
+        else:
+            results[str(application_id)] = {'status': 'not_found', 'detail': ''}
+
+    now = timezone.now()
+    pending = []
+    for application in applications:
+        if application.status != 'Pending':
+            results[str(application.id)] = {'status': 'already_processed', 'detail': application.status}
+        elif (
+            application.claimed_by_id
+            and application.claimed_by_id != getattr(reviewer, 'pk', None)
+            and application.lease_expires_at
+            and application.lease_expires_at > now
+        ):
+            results[str(application.id)] = {'status': 'claimed', 'detail': 'Claimed by another reviewer in the review queue.'}
+        else:
+            pending.append(application)
+
+    emails = {application.email.strip().lower() for application in pending}
+    taken = set(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails)
+        .values_list('email_lower', flat=True)
+    )
+    # The username is the email as submitted and is unique too
+    taken_usernames = set(
+        User.objects.filter(username__in={application.email.strip() for application in pending})
+        .values_list('username', flat=True)
+    )
+
+    to_approve = []
+    seen = set()
+    for application in pending:
+        email = application.email.strip().lower()
+        if email in taken or application.email.strip() in taken_usernames:
+            results[str(application.id)] = {'status': 'email_exists', 'detail': f'A user with {email} already exists.'}
+        elif len(application.email.strip()) > USERNAME_MAX_LENGTH:
+            results[str(application.id)] = {'status': 'email_too_long', 'detail': f'Emails used as usernames are limited to {USERNAME_MAX_LENGTH} characters.'}
+        elif email in seen:
+            results[str(application.id)] = {'status': 'duplicate_in_batch', 'detail': f'{email} appears earlier in this batch.'}
+        else:
+            seen.add(email)
+            to_approve.append(application)
+
+    if not to_approve:
+        return results, []
+
+    users = []
+    for application in to_approve:
+        user = User(
+            email=application.email.strip(),
+            username=application.email.strip(),
+            full_name=application.full_name,
+            role='member',
+            is_active=True,
+        )
+        # No password hashing per row: members choose a password from the welcome email
+        user.set_unusable_password()
+        users.append(user)
+    users = User.objects.bulk_create(users)
+
+    MemberProfile.objects.bulk_create([
+        MemberProfile(user=user, county=application.county, bio=application.motivation)
+        for user, application in zip(users, to_approve)
+    ])
+
+    MembershipApplication.objects.filter(id__in=[application.id for application in to_approve]).update(
+        status='Approved',
+        reviewed_by=reviewer,
+        reviewed_at=now,
+        claimed_by=None,
+        lease_expires_at=None,
+    )
+
+    for user, application in zip(users, to_approve):
+        results[str(application.id)] = {'status': 'approved', 'detail': '', 'user_id': user.id}
+    return results, [user.id for user in users]
+
+
+def approve_applications(ids, reviewer=None):
+    """
+    Turn a batch of pending membership applications into members.
+
+    In one transaction: lock the applications (skipping rows another admin
+    holds), bulk_create the CustomUser and MemberProfile rows, and mark the
+    applications Approved (recording `reviewer`) with a single UPDATE.
+    Welcome emails are sent by a background job after the commit.
+
+    Returns {application_id: {"status": ..., "detail": ...}} where status is
+    approved, email_exists (as an email or a username), email_too_long,
+    duplicate_in_batch, already_processed, claimed (another reviewer holds
+    it in the review queue), locked or not_found.
+    """
+    ids = list(dict.fromkeys(ids))
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                results, user_ids = _approve_batch(ids, reviewer)
+                if user_ids:
+                    background.submit_on_commit(_send_welcome_emails, user_ids)
+                    # .update() sends no post_save, so invalidate the org stats cache here
+                    response_cache.bump(APPLICATIONS)
+            return results
+        except IntegrityError:
+            # Someone registered one of these emails between our check and
+            # the insert; the retry sees it and reports the row as email_exists
+            if attempt == 1:
+                raise
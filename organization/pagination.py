@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class EventArchivePagination(CursorPagination):
+    """Cursor pagination for past events, most recent first."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-last_occurrence_at', '-id')
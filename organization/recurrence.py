@@ -0,0 +1,178 @@
+"""
+Recurring events.
+
+A recurring event is one Event row with a rule (frequency, interval, and
+optionally an end date or a number of occurrences), the same model as an
+RFC 5545 RRULE. Occurrences are never stored: occurrences() computes the
+ones inside the window a request asks for, jumping straight to the window
+instead of walking from the first date, so an open-ended monthly meetup
+costs the same to list next month as in ten years.
+
+Occurrences keep the wall-clock time of the first one in settings.TIME_ZONE.
+Like RRULE, a monthly event on the 31st skips months without a 31st (and a
+yearly one on 29 February skips non-leap years) rather than moving the date.
+
+Event.last_occurrence_at is denormalized on save: the start of the final
+occurrence, or NULL for a series without an end. Upcoming/past filters and
+the archive ordering run on it, so they stay index-only.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+DAILY = 'daily'
+WEEKLY = 'weekly'
+MONTHLY = 'monthly'
+YEARLY = 'yearly'
+
+FREQUENCY_CHOICES = [
+    (DAILY, 'Daily'),
+    (WEEKLY, 'Weekly'),
+    (MONTHLY, 'Monthly'),
+    (YEARLY, 'Yearly'),
+]
+
+RRULE_FREQ = {DAILY: 'DAILY', WEEKLY: 'WEEKLY', MONTHLY: 'MONTHLY', YEARLY: 'YEARLY'}
+
+MAX_COUNT = 1000
+# Upper bound for "never ends" searches
+FAR_FUTURE = datetime(9000, 1, 1, tzinfo=dt_timezone.utc)
+# Hard stop for one series in one window (a daily event over a year is 366)
+MAX_OCCURRENCES_PER_WINDOW = 1000
+
+
+def _nth(first, frequency, interval, n):
+    """Wall-clock start of the n-th step of the rule, or None if that date doesn't exist."""
+    if frequency == DAILY:
+        return first + timedelta(days=interval * n)
+    if frequency == WEEKLY:
+        return first + timedelta(weeks=interval * n)
+    if frequency == MONTHLY:
+        years, month = divmod(first.month - 1 + interval * n, 12)
+        try:
+            return first.replace(year=first.year + years, month=month + 1)
+        except ValueError:
+            return None
+    try:
+        return first.replace(year=first.year + interval * n)
+    except ValueError:
+        return None
+
+
+def _steps_before(first, frequency, interval, moment):
+    """A step index whose occurrence is at or before `moment` (0 if none)."""
+    if moment <= first:
+        return 0
+    if frequency in (DAILY, WEEKLY):
+        step = timedelta(days=interval * (7 if frequency == WEEKLY else 1))
+        return (moment - first) // step
+    months = (moment.year - first.year) * 12 + moment.month - first.month
+    if frequency == YEARLY:
+        months //= 12
+    return max(months // interval - 1, 0)
+
+
+def _wall_clock(value):
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _aware(naive):
+    return timezone.make_aware(naive, timezone.get_current_timezone())
+
+
+def is_recurring(event):
+    return bool(event.recurrence_frequency)
+
+
+def occurrences(event, start, end):
+    """Start datetimes of the event's occurrences with start <= t < end, in order."""
+    if not is_recurring(event):
+        if start <= event.date < end:
+            yield event.date
+        return
+
+    first = _wall_clock(event.date)
+    interval = event.recurrence_interval or 1
+    count = event.recurrence_count
+    until = event.recurrence_until
+
+    # With COUNT, skipped dates (31st in a short month) don't count, so walk
+    # from the start; COUNT is capped, so that walk is short
+    n = 0 if count else _steps_before(first, event.recurrence_frequency, interval, _wall_clock(start))
+    produced = 0
+    yielded = 0
+    while yielded < MAX_OCCURRENCES_PER_WINDOW:
+        naive = _nth(first, event.recurrence_frequency, interval, n)
+        n += 1
+        if naive is None:
+            continue
+        if count and produced >= count:
+            return
+        produced += 1
+        at = _aware(naive)
+        if (until and at > until) or at >= end:
+            return
+        if at >= start:
+            yielded += 1
+            yield at
+
+
+def last_occurrence(event):
+    """Start of the final occurrence, or None if the series never ends."""
+    if not is_recurring(event):
+        return event.date
+    if not event.recurrence_count and not event.recurrence_until:
+        return None
+    end = event.recurrence_until + timedelta(microseconds=1) if event.recurrence_until else FAR_FUTURE
+    last = None
+    # The series is bounded, so this walk ends
+    window_start = event.date
+    while True:
+        batch = list(occurrences(event, window_start, end))
+        if not batch:
+            return last or event.date
+        last = batch[-1]
+        if len(batch) < MAX_OCCURRENCES_PER_WINDOW:
+            return last
+        window_start = last + timedelta(microseconds=1)
+
+
+def upcoming_q(now=None):
+    """Events with an occurrence at or after `now`."""
+    now = now or timezone.now()
+    return Q(last_occurrence_at__gte=now) | Q(last_occurrence_at__isnull=True)
+
+
+def next_occurrence(events, now=None):
+    """(event, start) of the earliest occurrence at or after `now` across `events`, or None."""
+    now = now or timezone.now()
+    upcoming = []
+    for event in events:
+        for at in occurrences(event, now, FAR_FUTURE):
+            upcoming.append((at, event.pk, event))
+            break
+    if not upcoming:
+        return None
+    at, _, event = min(upcoming, key=lambda item: item[:2])
+    return event, at
+
+
+def next_start(events, now=None):
+    """Earliest occurrence at or after `now` across `events` (an iterable of Event)."""
+    found = next_occurrence(events, now)
+    return found[1] if found else None
+
+
+def rrule(event):
+    """RFC 5545 RRULE value for a recurring event (None for one-off events)."""
+    if not is_recurring(event):
+        return None
+    parts = [f'FREQ={RRULE_FREQ[event.recurrence_frequency]}']
+    if event.recurrence_interval and event.recurrence_interval > 1:
+        parts.append(f'INTERVAL={event.recurrence_interval}')
+    if event.recurrence_count:
+        parts.append(f'COUNT={event.recurrence_count}')
+    elif event.recurrence_until:
+        parts.append(f"UNTIL={event.recurrence_until.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')}")
+    return ';'.join(parts)
@@ -0,0 +1,181 @@
+"""
+Work queue for reviewing membership applications.
+
+Each reviewer claims the next N pending applications, oldest first. Claims
+are taken with SELECT ... FOR UPDATE SKIP LOCKED, so reviewers claiming at
+the same moment get disjoint rows instead of waiting on (or double-taking)
+each other. A claim is a lease: if the reviewer walks away, it lapses after
+APPLICATION_REVIEW_LEASE_MINUTES and the application goes back to the queue.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Min, Max, Q
+from django.utils import timezone
+
+from GNET import response_cache
+from organization.models import MembershipApplication
+from organization.onboarding import approve_applications
+from organization.signals import APPLICATIONS
+
+LEASE_MINUTES = getattr(settings, 'APPLICATION_REVIEW_LEASE_MINUTES', 15)
+
+MAX_CLAIM = 50
+
+User = get_user_model()
+
+
+def _lease_until(now):
+    return now + timedelta(minutes=LEASE_MINUTES)
+
+
+def _claimable(now):
+    return MembershipApplication.objects.filter(status='Pending').filter(
+        Q(claimed_by__isnull=True) | Q(lease_expires_at__lte=now)
+    )
+
+
+def claim(reviewer, count):
+    """
+    Hand `reviewer` up to `count` applications to review.
+
+    Claims the reviewer already holds count towards `count` and have their
+    lease renewed, so calling this again (e.g. on page refresh) doesn't pile
+    up more work. Returns the claimed applications, oldest first.
+    """
+    count = max(1, min(count, MAX_CLAIM))
+    now = timezone.now()
+    lease = _lease_until(now)
+
+    with transaction.atomic():
+        held = list(
+            MembershipApplication.objects.select_for_update(skip_locked=True)
+            .filter(status='Pending', claimed_by=reviewer, lease_expires_at__gt=now)
+            .values_list('id', flat=True)
+        )
+        if held:
+            MembershipApplication.objects.filter(id__in=held).update(lease_expires_at=lease)
+
+        new = []
+        if len(held) < count:
+            new = list(
+                _claimable(now)
+                .select_for_update(skip_locked=True)
+                .order_by('submitted_at', 'id')
+                .values_list('id', flat=True)[:count - len(held)]
+            )
+            if new:
+                MembershipApplication.objects.filter(id__in=new).update(
+                    claimed_by=reviewer,
+                    claimed_at=now,
+                    lease_expires_at=lease,
+                )
+
+    return MembershipApplication.objects.filter(id__in=held + new).order_by('submitted_at', 'id')
+
+
+def release(reviewer, ids=None):
+    """Give claims back to the queue (all of the reviewer's claims if `ids` is None)."""
+    queryset = MembershipApplication.objects.filter(status='Pending', claimed_by=reviewer)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    return queryset.update(claimed_by=None, claimed_at=None, lease_expires_at=None)
+
+
+class ClaimError(Exception):
+    pass
+
+
+def decide(reviewer, application_id, decision):
+    """
+    Approve or reject one application the reviewer has claimed.
+
+    Approving creates the member account (see onboarding.approve_applications).
+    Raises MembershipApplication.DoesNotExist for an unknown id, and
+    ClaimError if the application isn't pending or the reviewer doesn't hold
+    its claim; an expired claim of the reviewer's own is still accepted
+    as long as nobody else has picked the application up.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        application = (
+            MembershipApplication.objects.select_for_update()
+            .filter(id=application_id)
+            .first()
+        )
+        if application is None:
+            raise MembershipApplication.DoesNotExist('Application not found.')
+        if application.status != 'Pending':
+            raise ClaimError(f'Application is already {application.status}.')
+        if application.claimed_by_id != reviewer.pk:
+            if application.claimed_by_id and application.lease_expires_at and application.lease_expires_at > now:
+                raise ClaimError('Application is claimed by another reviewer.')
+            raise ClaimError('Claim the application before deciding on it.')
+
+        if decision == 'approve':
+            result = approve_applications([application.id], reviewer=reviewer)[str(application.id)]
+            if result['status'] != 'approved':
+                raise ClaimError(result['detail'] or result['status'])
+            return result
+
+        MembershipApplication.objects.filter(id=application.id).update(
+            status='Rejected',
+            reviewed_by=reviewer,
+            reviewed_at=now,
+            claimed_by=None,
+            lease_expires_at=None,
+        )
+        # .update() sends no post_save
+        response_cache.bump(APPLICATIONS)
+        return {'status': 'rejected', 'detail': ''}
+
+
+def reviewer_metrics(since):
+    """
+    Per-reviewer throughput since `since`: decisions made, approvals,
+    rejections, decisions per hour of active reviewing, and current claims.
+    One grouped query for decisions and one for open claims.
+    """
+    now = timezone.now()
+    rows = (
+        MembershipApplication.objects.filter(reviewed_by__isnull=False, reviewed_at__gte=since)
+        .values('reviewed_by')
+        .annotate(
+            reviewed=Count('id'),
+            approved=Count('id', filter=Q(status='Approved')),
+            rejected=Count('id', filter=Q(status='Rejected')),
+            first_review=Min('reviewed_at'),
+            last_review=Max('reviewed_at'),
+        )
+        .order_by()
+    )
+    claims = dict(
+        MembershipApplication.objects.filter(status='Pending', claimed_by__isnull=False, lease_expires_at__gt=now)
+        .values('claimed_by')
+        .annotate(open_claims=Count('id'))
+        .values_list('claimed_by', 'open_claims')
+        .order_by()
+    )
+
+    metrics = {}
+    for row in rows:
+        active_hours = max((row['last_review'] - row['first_review']).total_seconds() / 3600, 1 / 60)
+        metrics[row['reviewed_by']] = {
+            'reviewed': row['reviewed'],
+            'approved': row['approved'],
+            'rejected': row['rejected'],
+            'per_hour': round(row['reviewed'] / active_hours, 2) if row['reviewed'] > 1 else None,
+            'open_claims': claims.get(row['reviewed_by'], 0),
+        }
+    for reviewer_id, open_claims in claims.items():
+        metrics.setdefault(reviewer_id, {
+            'reviewed': 0, 'approved': 0, 'rejected': 0, 'per_hour': None, 'open_claims': open_claims,
+        })
+
+    names = dict(User.objects.filter(id__in=metrics).values_list('id', 'full_name'))
+    return [
+        {'reviewer_id': reviewer_id, 'reviewer': names.get(reviewer_id, ''), **values}
+        for reviewer_id, values in sorted(metrics.items(), key=lambda item: -item[1]['reviewed'])
+    ]
@@ -0,0 +1,173 @@
+"""
+Event RSVPs with a capacity limit and a waitlist.
+
+Event.seats_taken is a denormalized seat counter. A seat is claimed with a
+single conditional UPDATE:
+
+    UPDATE event SET seats_taken = seats_taken + 1
+    WHERE id = %s AND (capacity IS NULL OR seats_taken < capacity)
+
+The database applies these one at a time per row, so however many requests
+race for the last seat exactly one UPDATE matches and the rest see 0 rows
+and go on the waitlist. Nothing counts RSVP rows and then inserts, which is
+what lets two requests both see "one seat left".
+
+Cancelling a confirmed RSVP frees the seat and promotes the oldest
+waitlisted RSVP in the same transaction. Promotion locks waitlist rows with
+SKIP LOCKED so concurrent cancels promote different people instead of
+queueing behind each other. Joining the waitlist takes the event row lock
+first, so a waitlist entry can't slip in unseen while a cancel promotes and
+leave a seat empty with someone waiting.
+
+RSVPs belong to the Event row, so for a recurring event they are per
+series, not per occurrence: one RSVP holds a seat at every occurrence and
+capacity caps the series as a whole. Per-occurrence attendance would need
+EventRSVP keyed on (event, occurrence_start) and a counter per occurrence.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from GNET import response_cache
+from organization.models import Event, EventRSVP
+from organization.signals import EVENTS
+
+CONFIRMED = 'confirmed'
+WAITLISTED = 'waitlisted'
+CANCELLED = 'cancelled'
+
+
+def _claim_seat(event_id):
+    """Take one seat if any is left. True if we got it."""
+    return bool(
+        Event.objects.filter(pk=event_id)
+        .filter(Q(capacity__isnull=True) | Q(seats_taken__lt=F('capacity')))
+        .update(seats_taken=F('seats_taken') + 1)
+    )
+
+
+def _free_seat(event_id):
+    Event.objects.filter(pk=event_id, seats_taken__gt=0).update(seats_taken=F('seats_taken') - 1)
+
+
+def _promote(event_id):
+    """Move waitlisted RSVPs into free seats, oldest first. Returns the promoted RSVP ids."""
+    promoted = []
+    while True:
+        candidate = (
+            EventRSVP.objects.select_for_update(skip_locked=True)
+            .filter(event_id=event_id, status=WAITLISTED)
+            .order_by('queued_at', 'id')
+            .only('id')
+            .first()
+        )
+        if candidate is None or not _claim_seat(event_id):
+            return promoted
+        EventRSVP.objects.filter(id=candidate.id).update(status=CONFIRMED, updated_at=timezone.now())
+        promoted.append(candidate.id)
+
+
+def _changed(event_id):
+    # Seat counts are part of the cached event list; .update() sends no post_save
+    response_cache.bump(EVENTS)
+
+
+def rsvp(event_id, user):
+    """
+    RSVP `user` to the event: a confirmed seat if one is left, otherwise a
+    place on the waitlist. Repeating an active RSVP changes nothing.
+
+    Returns the EventRSVP. Raises Event.DoesNotExist for an unknown event.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                existing = (
+                    EventRSVP.objects.select_for_update()
+                    .filter(event_id=event_id, user=user)
+                    .first()
+                )
+                if existing is not None and existing.status != CANCELLED:
+                    return existing
+
+                if _claim_seat(event_id):
+                    status = CONFIRMED
+                else:
+                    # Full: join the waitlist holding the event row, which a
+                    # cancel also locks when it frees its seat. Either the cancel
+                    # commits first and we take the seat it freed, or it waits for
+                    # us and its promotion sees our waitlist entry.
+                    locked = Event.objects.select_for_update().filter(pk=event_id).values_list('pk', flat=True).first()
+                    if locked is None:
+                        raise Event.DoesNotExist(f'Event {event_id} does not exist.')
+                    status = CONFIRMED if _claim_seat(event_id) else WAITLISTED
+
+                now = timezone.now()
+                if existing is not None:
+                    existing.status = status
+                    existing.queued_at = now
+                    existing.save(update_fields=['status', 'queued_at', 'updated_at'])
+                    record = existing
+                else:
+                    record = EventRSVP.objects.create(event_id=event_id, user=user, status=status, queued_at=now)
+                transaction.on_commit(lambda: _changed(event_id))
+                return record
+        except IntegrityError:
+            # A double submit from the same user created the row first; our
+            # seat claim was rolled back with the transaction, so just return theirs
+            if attempt == 1:
+                raise
+
+
+def cancel(event_id, user):
+    """
+    Cancel the user's RSVP. A freed seat goes to the head of the waitlist
+    in the same transaction. Returns (rsvp or None, promoted RSVP ids).
+    """
+    with transaction.atomic():
+        existing = (
+            EventRSVP.objects.select_for_update()
+            .filter(event_id=event_id, user=user)
+            .exclude(status=CANCELLED)
+            .first()
+        )
+        if existing is None:
+            return None, []
+
+        was_confirmed = existing.status == CONFIRMED
+        existing.status = CANCELLED
+        existing.save(update_fields=['status', 'updated_at'])
+
+        promoted = []
+        if was_confirmed:
+            _free_seat(event_id)
+            promoted = _promote(event_id)
+        transaction.on_commit(lambda: _changed(event_id))
+        return existing, promoted
+
+
+def fill_from_waitlist(event_id):
+    """Promote waitlisted RSVPs into any free seats, e.g. after capacity was raised."""
+    with transaction.atomic():
+        promoted = _promote(event_id)
+        if promoted:
+            transaction.on_commit(lambda: _changed(event_id))
+    return promoted
+
+
+def check_consistency(event_id):
+    """
+    Problems with the event's seat accounting, as a list of strings (empty
+    when consistent). Used by the rsvp_load_test command.
+    """
+    event = Event.objects.get(pk=event_id)
+    confirmed = EventRSVP.objects.filter(event_id=event_id, status=CONFIRMED).count()
+    waitlisted = EventRSVP.objects.filter(event_id=event_id, status=WAITLISTED).count()
+    problems = []
+    if event.seats_taken != confirmed:
+        problems.append(f'seats_taken is {event.seats_taken} but {confirmed} RSVPs are confirmed')
+    if event.capacity is not None and confirmed > event.capacity:
+        problems.append(f'{confirmed} confirmed RSVPs for {event.capacity} seats')
+    if event.capacity is not None and waitlisted and confirmed < event.capacity:
+        problems.append(f'{waitlisted} waitlisted while {event.capacity - confirmed} seats are free')
+    return problems
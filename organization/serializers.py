@@ -1,20 +1,66 @@
 from rest_framework import serializers
-from organization.models import Announcement, Event, MembershipApplication
+from mediastore.assets import variant_map
+from organization.models import Announcement, Event, EventRSVP, MembershipApplication
 
-class AnnouncementSerializer(serializers.ModelSerializer):
+class ImageVariantsMixin(serializers.Serializer):
+    """
+    Adds `image_variants`: original plus resized WebP/JPEG URLs by width,
+    so clients can use srcset instead of downloading the full upload.
+    Querysets should select_related('image_asset').
+    """
+    image_variants = serializers.SerializerMethodField()
+    
+    def get_image_variants(self, obj):
+        return variant_map(obj.image_asset, self.context.get('request'))
+
+class AnnouncementSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     class Meta:
         model = Announcement
-        fields = ['id', 'title', 'message', 'priority', 'image', 'created_at']
+        fields = ['id', 'title', 'message', 'priority', 'image', 'image_variants', 'created_at']
         read_only_fields = ['id', 'created_at']
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     class Meta:
         model = Event
-        fields = ['id', 'title', 'date', 'venue', 'description', 'image', 'link', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'title', 'date', 'venue', 'description', 'image', 'image_variants', 'link',
+                  'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count',
+                  'capacity', 'seats_taken', 'seats_left', 'created_at']
+        read_only_fields = ['id', 'seats_taken', 'seats_left', 'created_at']
+
+class EventRSVPSerializer(serializers.ModelSerializer):
+    event_title = serializers.CharField(source='event.title', read_only=True)
+    event_date = serializers.DateTimeField(source='event.date', read_only=True)
+    
+    class Meta:
+        model = EventRSVP
+        fields = ['id', 'event', 'event_title', 'event_date', 'status', 'queued_at', 'updated_at']
+        read_only_fields = fields
 
 class MembershipApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = MembershipApplication
         fields = ['id', 'full_name', 'email', 'county', 'motivation', 'status', 'submitted_at']
-        read_only_fields = ['id', 'submitted_at']
\ No newline at end of file
+        read_only_fields = ['id', 'submitted_at']
+
+class ApplicationBatchApproveSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000,
+    )
+
+class ReviewQueueApplicationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MembershipApplication
+        fields = ['id', 'full_name', 'email', 'county', 'motivation', 'status', 'submitted_at', 'claimed_at', 'lease_expires_at']
+        read_only_fields = fields
+
+class ApplicationClaimSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+class ApplicationReleaseSerializer(serializers.Serializer):
+    # Omit ids to release every claim you hold
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+
+class ApplicationDecisionSerializer(serializers.Serializer):
+    decision = serializers.ChoiceField(choices=['approve', 'reject'])
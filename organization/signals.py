@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from GNET import broadcast, response_cache
+from mediastore.assets import attach, variants_ready
+from organization.models import Announcement, Event, MembershipApplication
+
+# Response cache dependency names, see GNET/response_cache.py
+ANNOUNCEMENTS = 'organization.announcement'
+EVENTS = 'organization.event'
+APPLICATIONS = 'organization.application'
+# Bumped when a member rotates their personal calendar feed URL
+CALENDAR_FEEDS = 'organization.calendar-feed'
+
+DEPENDENCY_FOR_MODEL = {
+    Announcement: ANNOUNCEMENTS,
+    Event: EVENTS,
+    MembershipApplication: APPLICATIONS,
+}
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=MembershipApplication)
+@receiver(post_delete, sender=Announcement)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=MembershipApplication)
+def invalidate_cached_responses(sender, **kwargs):
+    response_cache.bump(DEPENDENCY_FOR_MODEL[sender])
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_save, sender=Event)
+def store_image_in_media_store(sender, instance, raw=False, **kwargs):
+    # Content-addressed copy + background variants; a no-op once attached
+    if not raw and instance.image:
+        attach(instance)
+
+
+@receiver(variants_ready)
+def refresh_responses_with_variants(sender, asset, **kwargs):
+    # Cached lists embed the variant map, which just gained URLs
+    response_cache.bump(ANNOUNCEMENTS)
+    response_cache.bump(EVENTS)
+
+
+def _publish_change(kind, instance, created):
+    from organization.serializers import AnnouncementSerializer, EventSerializer
+
+    serializer_class = AnnouncementSerializer if kind == 'announcement' else EventSerializer
+    action = 'created' if created else 'updated'
+    broadcast.publish(f'{kind}.{action}', serializer_class(instance).data)
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_save, sender=Event)
+def publish_live_change(sender, instance, created, raw=False, **kwargs):
+    # Pushed to /api/org/live/ clients once the row is committed
+    if raw:
+        return
+    kind = 'announcement' if sender is Announcement else 'event'
+    transaction.on_commit(lambda: _publish_change(kind, instance, created))
+
+
+@receiver(post_delete, sender=Announcement)
+@receiver(post_delete, sender=Event)
+def publish_live_delete(sender, instance, **kwargs):
+    kind = 'announcement' if sender is Announcement else 'event'
+    pk = instance.pk
+    transaction.on_commit(lambda: broadcast.publish(f'{kind}.deleted', {'id': pk}))
+
+
+# Capacity of an Event loaded with .only()/.defer() that left it out
+_UNKNOWN = object()
+
+
+@receiver(post_init, sender=Event)
+def remember_capacity(sender, instance, **kwargs):
+    # Reading a deferred field here would fetch it (one query per row), so
+    # leave it unknown and let a save re-check the waitlist
+    if 'capacity' in instance.get_deferred_fields():
+        instance._loaded_capacity = _UNKNOWN
+    else:
+        instance._loaded_capacity = instance.capacity
+
+
+@receiver(post_save, sender=Event)
+def fill_seats_after_capacity_change(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Raising the capacity frees seats for the waitlist. Event.save() always
+    # passes update_fields, so compare with the loaded value instead
+    if created or raw or (update_fields is not None and 'capacity' not in update_fields):
+        return
+    before = getattr(instance, '_loaded_capacity', _UNKNOWN)
+    instance._loaded_capacity = instance.capacity
+    if before is not _UNKNOWN and before == instance.capacity:
+        return
+    from organization.rsvp import fill_from_waitlist
+
+    transaction.on_commit(lambda: fill_from_waitlist(instance.pk))
@@ -1,3 +1,596 @@
-from django.test import TestCase
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from GNET.testing import LARGE, SMALL, QueryBudgetMixin, make_user, sync_and_async
+from organization import ical, onboarding, recurrence, review_queue, views
+from organization import rsvp as rsvps
+from organization.models import Announcement, Event, EventRSVP, MembershipApplication
+
+COUNTIES = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru']
+CLAIM_COUNT = 10
+
+
+class OrganizationQueryBudgetTests(QueryBudgetMixin, TestCase):
+    routes_prefix = 'api/org/'
+    budgets = {
+        'recent_announcements': 1,
+        'next_event': 4,
+        'org_stats': 5,
+        'events_calendar': 1,
+        'member_calendar': 3,
+        'calendar_link': {'get': 2, 'post': 4},
+        'my_rsvps': 3,
+        'live_stream': 0,
+        'announcement-list': 1,
+        'announcement-detail': 1,
+        'event-list': 3,
+        'event-archive': 3,
+        'event-occurrences': 3,
+        'event-detail': 3,
+        'event-rsvp': {'post': 9, 'delete': 10},
+        'application-list': {'get': 3, 'post': 1},
+        'application-batch-approve': 10,
+        'application-claim': 9,
+        'application-release': 3,
+        'application-review-metrics': 5,
+        'application-detail': 3,
+        'application-decide': 13,
+    }
+
+    def seed(self, count):
+        # Per batch: announcements, a past, an upcoming and a weekly event (the
+        # member RSVPs to the upcoming one) and pending applications
+        start = Announcement.objects.count()
+        now = timezone.now()
+        for number in range(start, start + count):
+            Announcement.objects.create(
+                title=f'Notice #{number}', message='The monthly meetup moves to the new hub.',
+                priority=['Low', 'Medium', 'High'][number % 3],
+            )
+            Event.objects.create(
+                title=f'Pitch night #{number}', date=now - timedelta(days=number + 1),
+                venue='Nairobi Garage', description='Founders pitch to members.',
+            )
+            upcoming = Event.objects.create(
+                title=f'Workshop #{number}', date=now + timedelta(days=number + 1),
+                venue='iHub', description='Hands-on bookkeeping.', capacity=20,
+            )
+            Event.objects.create(
+                title=f'Weekly standup #{number}', date=now + timedelta(hours=number + 1),
+                venue='Online', description='Progress updates.', link='https://example.com/meet',
+                recurrence_frequency='weekly', recurrence_count=8,
+            )
+            rsvps.rsvp(upcoming.pk, self.member)
+            MembershipApplication.objects.create(
+                full_name=f'Applicant {number}', email=f'applicant{number}@example.com',
+                county=COUNTIES[number % len(COUNTIES)], motivation='To grow my business with others.',
+            )
+
+    def upcoming_event(self):
+        return Event.objects.filter(capacity__isnull=False, date__gte=timezone.now()).first()
+
+    def pending_application_ids(self):
+        return {'ids': list(MembershipApplication.objects.filter(status='Pending').values_list('id', flat=True))}
+
+    def test_recent_announcements(self):
+        self.assertConstantQueries('recent_announcements', 'get', '/api/org/announcements/recent/')
+
+    def test_next_event(self):
+        self.assertConstantQueries('next_event', 'get', '/api/org/events/next/')
+
+    def test_org_stats(self):
+        self.assertConstantQueries('org_stats', 'get', '/api/org/stats/')
+
+    def test_events_calendar(self):
+        self.assertConstantQueries('events_calendar', 'get', '/api/org/events/calendar.ics')
+
+    def test_member_calendar(self):
+        url = f'/api/org/events/calendar/{ical.member_feed_token(self.member)}.ics'
+        self.assertConstantQueries('member_calendar', 'get', url)
+
+    def test_calendar_link(self):
+        self.assertQueryBudget('calendar_link', 'get', '/api/org/events/calendar-link/', user=self.member)
+        self.assertQueryBudget('calendar_link', 'post', '/api/org/events/calendar-link/', user=self.member)
+
+    def test_my_rsvps(self):
+        self.assertConstantQueries('my_rsvps', 'get', '/api/org/events/rsvps/', user=self.member)
+
+    def test_live_stream(self):
+        # The stream never ends on its own; only opening it is measured
+        self.assertQueryBudget('live_stream', 'get', '/api/org/live/', stream=False)
+
+    def test_announcement_list(self):
+        self.assertConstantQueries('announcement-list', 'get', '/api/org/announcements/')
+
+    def test_announcement_detail(self):
+        announcement = Announcement.objects.first()
+        self.assertQueryBudget('announcement-detail', 'get', f'/api/org/announcements/{announcement.pk}/')
+
+    def test_event_list(self):
+        self.assertConstantQueries('event-list', 'get', '/api/org/events/')
+
+    def test_event_archive(self):
+        self.assertConstantQueries('event-archive', 'get', '/api/org/events/archive/')
+
+    def test_event_occurrences(self):
+        self.assertConstantQueries('event-occurrences', 'get', '/api/org/events/occurrences/')
+
+    def test_event_detail(self):
+        event = self.upcoming_event()
+        self.assertQueryBudget('event-detail', 'get', f'/api/org/events/{event.pk}/')
+
+    def test_event_rsvp(self):
+        event = self.upcoming_event()
+        self.assertQueryBudget('event-rsvp', 'post', f'/api/org/events/{event.pk}/rsvp/', user=self.admin)
+        self.assertQueryBudget('event-rsvp', 'delete', f'/api/org/events/{event.pk}/rsvp/', user=self.admin)
+
+    def test_application_list(self):
+        self.assertConstantQueries('application-list', 'get', '/api/org/applications/', user=self.admin)
+        self.assertQueryBudget('application-list', 'post', '/api/org/applications/', {
+            'full_name': 'Akinyi Otieno', 'email': 'akinyi@example.com',
+            'county': 'Kisumu', 'motivation': 'To find co-founders.',
+        }, status=201)
+
+    def test_application_batch_approve(self):
+        self.assertConstantQueries('application-batch-approve', 'post', '/api/org/applications/batch-approve/', self.pending_application_ids, user=self.admin)
+
+    def test_application_claim(self):
+        # A first claim, then a refresh that renews the claims held and tops them up
+        self.assertQueryBudget('application-claim', 'post', '/api/org/applications/claim/', {'count': CLAIM_COUNT}, user=self.admin)
+        self.seed(LARGE - SMALL)
+        self.assertQueryBudget('application-claim', 'post', '/api/org/applications/claim/', {'count': CLAIM_COUNT}, user=self.admin)
+
+    def test_application_release(self):
+        review_queue.claim(self.admin, CLAIM_COUNT)
+        self.assertQueryBudget('application-release', 'post', '/api/org/applications/release/', {}, user=self.admin)
+
+    def test_application_review_metrics(self):
+        self.assertConstantQueries('application-review-metrics', 'get', '/api/org/applications/review-metrics/', user=self.admin)
+
+    def test_application_detail(self):
+        application = MembershipApplication.objects.first()
+        self.assertQueryBudget('application-detail', 'get', f'/api/org/applications/{application.pk}/', user=self.admin)
+
+    def test_application_decide(self):
+        application = review_queue.claim(self.admin, 1)[0]
+        self.assertQueryBudget('application-decide', 'post', f'/api/org/applications/{application.pk}/decide/', {'decision': 'approve'}, user=self.admin)
+
+
+
+
+def nairobi(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class RecurrenceTests(SimpleTestCase):
+    def event(self, first, frequency, interval=1, count=None, until=None):
+        return Event(
+            title='Chama meetup', date=first, venue='iHub', description='Monthly.',
+            recurrence_frequency=frequency, recurrence_interval=interval,
+            recurrence_count=count, recurrence_until=until,
+        )
+
+    def starts(self, event, start, end):
+        return [timezone.localtime(at).replace(tzinfo=None) for at in recurrence.occurrences(event, start, end)]
+
+    def test_count_limits_the_series(self):
+        event = self.event(nairobi(2025, 1, 6, 18), recurrence.WEEKLY, count=3)
+        self.assertEqual(self.starts(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1)), [
+            datetime(2025, 1, 6, 18), datetime(2025, 1, 13, 18), datetime(2025, 1, 20, 18),
+        ])
+        self.assertEqual(self.starts(event, nairobi(2025, 1, 21), nairobi(2026, 1, 1)), [])
+        self.assertEqual(recurrence.last_occurrence(event), nairobi(2025, 1, 20, 18))
+
+    def test_count_skips_dates_that_do_not_exist(self):
+        event = self.event(nairobi(2025, 1, 31, 18), recurrence.MONTHLY, count=3)
+        self.assertEqual(self.starts(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1)), [
+            datetime(2025, 1, 31, 18), datetime(2025, 3, 31, 18), datetime(2025, 5, 31, 18),
+        ])
+        # Windows after the start still count from the first occurrence
+        self.assertEqual(self.starts(event, nairobi(2025, 4, 1), nairobi(2026, 1, 1)), [datetime(2025, 5, 31, 18)])
+
+    def test_until_is_inclusive(self):
+        event = self.event(nairobi(2025, 3, 1, 9), recurrence.DAILY, until=nairobi(2025, 3, 3, 9))
+        self.assertEqual(len(self.starts(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1))), 3)
+        self.assertEqual(recurrence.last_occurrence(event), nairobi(2025, 3, 3, 9))
+
+    def test_open_ended_series_has_no_last_occurrence(self):
+        self.assertIsNone(recurrence.last_occurrence(self.event(nairobi(2025, 1, 1, 9), recurrence.MONTHLY)))
+
+    def test_monthly_on_the_31st_skips_short_months(self):
+        event = self.event(nairobi(2025, 1, 31, 18), recurrence.MONTHLY)
+        self.assertEqual(
+            [at.month for at in self.starts(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1))],
+            [1, 3, 5, 7, 8, 10, 12],
+        )
+
+    def test_monthly_on_the_30th_skips_february_only(self):
+        event = self.event(nairobi(2024, 1, 30, 18), recurrence.MONTHLY, interval=1)
+        months = [at.month for at in self.starts(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1))]
+        self.assertEqual(months, [1, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12])
+
+    def test_weekly_steps_across_month_and_year_ends(self):
+        event = self.event(nairobi(2024, 12, 18, 18), recurrence.WEEKLY, interval=2)
+        self.assertEqual(self.starts(event, nairobi(2024, 12, 1), nairobi(2025, 2, 1)), [
+            datetime(2024, 12, 18, 18), datetime(2025, 1, 1, 18), datetime(2025, 1, 15, 18), datetime(2025, 1, 29, 18),
+        ])
+
+    def test_yearly_on_29_february_skips_non_leap_years(self):
+        event = self.event(nairobi(2024, 2, 29, 10), recurrence.YEARLY)
+        self.assertEqual(
+            self.starts(event, nairobi(2024, 3, 1), nairobi(2033, 1, 1)),
+            [datetime(2028, 2, 29, 10), datetime(2032, 2, 29, 10)],
+        )
+
+    def test_distant_windows_match_walking_from_the_start(self):
+        event = self.event(nairobi(2025, 1, 31, 18), recurrence.MONTHLY, interval=5)
+        walked = [at for at in recurrence.occurrences(event, event.date, nairobi(2040, 1, 1)) if at >= nairobi(2035, 1, 1)]
+        self.assertEqual(list(recurrence.occurrences(event, nairobi(2035, 1, 1), nairobi(2040, 1, 1))), walked)
+        self.assertTrue(walked)
+
+    def test_nairobi_occurrences_keep_a_fixed_utc_offset(self):
+        # East Africa Time has no daylight saving: every occurrence is 15:00 UTC
+        event = self.event(nairobi(2025, 1, 6, 18), recurrence.WEEKLY)
+        starts = list(recurrence.occurrences(event, nairobi(2025, 1, 1), nairobi(2026, 1, 1)))
+        self.assertEqual(len(starts), 52)
+        self.assertEqual({at.utcoffset() for at in starts}, {timedelta(hours=3)})
+        self.assertEqual({at.astimezone(dt_timezone.utc).hour for at in starts}, {15})
+        self.assertEqual({later - earlier for earlier, later in zip(starts, starts[1:])}, {timedelta(weeks=1)})
+
+    def test_rrule(self):
+        self.assertEqual(recurrence.rrule(self.event(nairobi(2025, 1, 6, 18), recurrence.WEEKLY, interval=2, count=5)), 'FREQ=WEEKLY;INTERVAL=2;COUNT=5')
+        self.assertEqual(
+            recurrence.rrule(self.event(nairobi(2025, 1, 6, 18), recurrence.DAILY, until=nairobi(2025, 2, 1, 18))),
+            'FREQ=DAILY;UNTIL=20250201T150000Z',
+        )
+
+class RSVPTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Bookkeeping workshop', date=timezone.now() + timedelta(days=7),
+            venue='iHub', description='Hands-on.', capacity=2,
+        )
+        self.users = [make_user(f'guest{number}@example.com') for number in range(4)]
+
+    def rsvp_all(self):
+        return [rsvps.rsvp(self.event.pk, user).status for user in self.users]
+
+    def test_seats_up_to_capacity_then_waitlist(self):
+        self.assertEqual(self.rsvp_all(), [rsvps.CONFIRMED, rsvps.CONFIRMED, rsvps.WAITLISTED, rsvps.WAITLISTED])
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.seats_taken, self.event.seats_left), (2, 0))
+        self.assertEqual(rsvps.check_consistency(self.event.pk), [])
+
+    def test_repeating_an_rsvp_changes_nothing(self):
+        first = rsvps.rsvp(self.event.pk, self.users[0])
+        self.assertEqual(rsvps.rsvp(self.event.pk, self.users[0]).pk, first.pk)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_cancel_promotes_the_oldest_waitlisted(self):
+        self.rsvp_all()
+        record, promoted = rsvps.cancel(self.event.pk, self.users[0])
+        self.assertEqual(record.status, rsvps.CANCELLED)
+        third = EventRSVP.objects.get(event=self.event, user=self.users[2])
+        self.assertEqual((promoted, third.status), ([third.pk], rsvps.CONFIRMED))
+        self.assertEqual(EventRSVP.objects.get(event=self.event, user=self.users[3]).status, rsvps.WAITLISTED)
+        self.assertEqual(rsvps.check_consistency(self.event.pk), [])
+
+    def test_cancelling_a_waitlisted_rsvp_frees_no_seat(self):
+        self.rsvp_all()
+        _, promoted = rsvps.cancel(self.event.pk, self.users[3])
+        self.assertEqual(promoted, [])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 2)
+
+    def test_rsvp_to_a_non_numeric_id_is_not_found(self):
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.client.post('/api/org/events/abc/rsvp/').status_code, 404)
+        self.assertEqual(self.client.post(f'/api/org/events/{self.event.pk + 1}/rsvp/').status_code, 404)
+
+    def test_raising_capacity_fills_from_waitlist(self):
+        self.rsvp_all()
+        Event.objects.filter(pk=self.event.pk).update(capacity=3)
+        self.assertEqual(len(rsvps.fill_from_waitlist(self.event.pk)), 1)
+        self.assertEqual(rsvps.check_consistency(self.event.pk), [])
+
+    def test_saving_a_raised_capacity_promotes_the_waitlist(self):
+        self.rsvp_all()
+        event = Event.objects.get(pk=self.event.pk)
+        event.capacity = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        self.assertEqual(EventRSVP.objects.get(event=event, user=self.users[2]).status, rsvps.CONFIRMED)
+        self.assertEqual(rsvps.check_consistency(event.pk), [])
+
+    def test_saves_that_keep_the_capacity_leave_the_waitlist_alone(self):
+        event = Event.objects.get(pk=self.event.pk)
+        event.title = 'Bookkeeping workshop II'
+        with mock.patch('organization.rsvp.fill_from_waitlist') as fill, self.captureOnCommitCallbacks(execute=True):
+            event.save()
+            event.save(update_fields=['title'])
+        fill.assert_not_called()
+        event.capacity = 5
+        with mock.patch('organization.rsvp.fill_from_waitlist') as fill, self.captureOnCommitCallbacks(execute=True):
+            event.save()
+            event.save()
+        fill.assert_called_once_with(event.pk)
+
+    def test_deferred_capacity_is_not_fetched_and_rechecks_on_save(self):
+        with self.assertNumQueries(1):
+            event = Event.objects.only('pk', 'title').get(pk=self.event.pk)
+        with mock.patch('organization.rsvp.fill_from_waitlist') as fill, self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        fill.assert_called_once_with(event.pk)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs row locks; SQLite serializes writers')
+class RSVPConcurrencyTests(TransactionTestCase):
+    """The rsvp_load_test scenario in small: racing RSVPs and cancels never overbook."""
+    CAPACITY = 10
+    USERS = 40
+    WORKERS = 16
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Launch party', date=timezone.now() + timedelta(days=7),
+            venue='iHub', description='Everyone is invited.', capacity=self.CAPACITY,
+        )
+        self.users = [make_user(f'racer{number}@example.com') for number in range(self.USERS)]
+
+    def race(self, operations):
+        def call(operation):
+            func, user = operation
+            try:
+                func(self.event.pk, user)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            list(pool.map(call, operations))
+
+    def test_no_overbooking_under_contention(self):
+        burst = [(rsvps.rsvp, user) for user in self.users] * 2
+        random.shuffle(burst)
+        self.race(burst)
+        self.assertEqual(rsvps.check_consistency(self.event.pk), [])
+        self.assertEqual(EventRSVP.objects.filter(event=self.event, status=rsvps.CONFIRMED).count(), self.CAPACITY)
+
+        churn = [(random.choice([rsvps.rsvp, rsvps.cancel]), random.choice(self.users)) for _ in range(200)]
+        self.race(churn)
+        self.assertEqual(rsvps.check_consistency(self.event.pk), [])
+
+
+class OnboardingTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', role='admin')
+
+    def apply(self, email):
+        return MembershipApplication.objects.create(full_name='Akinyi Otieno', email=email, county='Kisumu', motivation='Co-founders.')
+
+    def test_username_clash_is_reported_per_row(self):
+        # Someone whose username is this address but whose email is another one
+        get_user_model().objects.create_user(email='akinyi.old@example.com', username='akinyi@example.com', password='pass12345')
+        clash, fresh = self.apply('akinyi@example.com'), self.apply('wanjiru@example.com')
+        results = onboarding.approve_applications([clash.pk, fresh.pk], reviewer=self.admin)
+        self.assertEqual(results[str(clash.pk)]['status'], 'email_exists')
+        self.assertEqual(results[str(fresh.pk)]['status'], 'approved')
+
+    def test_email_too_long_for_a_username(self):
+        application = self.apply(f"{'a' * 150}@example.com")
+        results = onboarding.approve_applications([application.pk], reviewer=self.admin)
+        self.assertEqual(results[str(application.pk)]['status'], 'email_too_long')
+
+    def test_welcome_email_outcomes_are_logged(self):
+        user = make_user('new.member@example.com')
+        with mock.patch('members.views.send_email_sendgrid', return_value=True), \
+                self.assertLogs('organization.onboarding', 'INFO') as logs:
+            onboarding._send_welcome_emails([user.pk])
+        self.assertIn('Welcome email sent to new.member@example.com', logs.output[0])
+        with mock.patch('members.views.send_email_sendgrid', return_value=False), \
+                self.assertLogs('organization.onboarding', 'INFO') as logs:
+            onboarding._send_welcome_emails([user.pk])
+        self.assertTrue(logs.output[0].startswith('ERROR:organization.onboarding:Failed to send welcome email'))
+
+
+
+class ReviewQueueTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', role='admin')
+        self.other = make_user('reviewer@example.com', role='admin')
+        self.first, self.second = (
+            MembershipApplication.objects.create(full_name='Akinyi Otieno', email=email, county='Kisumu', motivation='Co-founders.')
+            for email in ('akinyi@example.com', 'wanjiru@example.com')
+        )
+
+    def decide(self, pk, decision='reject'):
+        self.client.force_login(self.admin)
+        return self.client.post(f'/api/org/applications/{pk}/decide/', {'decision': decision}, content_type='application/json')
+
+    def test_claimed_rows_are_skipped(self):
+        self.assertEqual([a.pk for a in review_queue.claim(self.other, 1)], [self.first.pk])
+        self.assertEqual([a.pk for a in review_queue.claim(self.admin, 2)], [self.second.pk])
+
+    def test_claiming_again_renews_rather_than_adds(self):
+        review_queue.claim(self.admin, 1)
+        self.assertEqual([a.pk for a in review_queue.claim(self.admin, 1)], [self.first.pk])
+
+    def test_expired_lease_is_reclaimed(self):
+        review_queue.claim(self.other, 1)
+        MembershipApplication.objects.filter(pk=self.first.pk).update(lease_expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual([a.pk for a in review_queue.claim(self.admin, 1)], [self.first.pk])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.claimed_by, self.admin)
+        self.assertGreater(self.first.lease_expires_at, timezone.now())
+
+    def test_decide_without_a_claim_is_a_conflict(self):
+        self.assertEqual(self.decide(self.first.pk).status_code, 409)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, 'Pending')
+
+    def test_decide_on_own_expired_claim_is_accepted(self):
+        review_queue.claim(self.admin, 1)
+        MembershipApplication.objects.filter(pk=self.first.pk).update(lease_expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.decide(self.first.pk).status_code, 200)
+
+    def test_decide_on_someone_elses_claim_is_a_conflict(self):
+        review_queue.claim(self.other, 1)
+        self.assertEqual(self.decide(self.first.pk).status_code, 409)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.status, 'Pending')
+
+    def test_decide_on_a_decided_application_is_a_conflict(self):
+        review_queue.claim(self.admin, 1)
+        self.assertEqual(self.decide(self.first.pk).status_code, 200)
+        self.assertEqual(self.decide(self.first.pk).status_code, 409)
+
+    def test_decide_on_an_unknown_id_is_not_found(self):
+        self.assertEqual(self.decide(self.second.pk + 1).status_code, 404)
+        self.assertEqual(self.decide('abc').status_code, 404)
+
+    def test_review_metrics(self):
+        review_queue.claim(self.admin, 2)
+        self.decide(self.first.pk)
+        self.client.force_login(self.admin)
+        response = self.client.get('/api/org/applications/review-metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pending'], 1)
+        [row] = response.data['reviewers']
+        self.assertEqual(row['reviewer_id'], self.admin.pk)
+        self.assertEqual((row['reviewed'], row['approved'], row['rejected'], row['open_claims']), (1, 0, 1, 1))
+
+class NextEventTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+
+    def event(self, title, date, **recurrence):
+        return Event.objects.create(title=title, date=date, venue='iHub', description='Members only.', **recurrence)
+
+    def next_event(self):
+        response = self.client.get('/api/org/events/next/')
+        return response.status_code, response.json()
+
+    def test_series_that_started_long_ago_can_be_next(self):
+        standup = self.event('Weekly standup', self.now - timedelta(days=30, hours=-1), recurrence_frequency='weekly')
+        self.event('Pitch night', self.now + timedelta(days=10))
+        status, body = self.next_event()
+        self.assertEqual((status, body['id']), (200, standup.pk))
+        self.assertEqual(parse_datetime(body['occurrence_start']), standup.date + timedelta(weeks=5))
+
+    def test_sooner_one_off_event_wins(self):
+        self.event('Weekly standup', self.now - timedelta(days=30, hours=-1), recurrence_frequency='weekly')
+        pitch = self.event('Pitch night', self.now + timedelta(hours=2))
+        status, body = self.next_event()
+        self.assertEqual((status, body['id']), (200, pitch.pk))
+        self.assertEqual(parse_datetime(body['occurrence_start']), pitch.date)
+
+    def test_finished_series_is_not_next(self):
+        self.event('Old standup', self.now - timedelta(days=30), recurrence_frequency='weekly', recurrence_count=3)
+        self.assertEqual(self.next_event()[0], 404)
+
+
+class AsyncReadPathTests(TestCase):
+    cases = [
+        (views.recent_announcements, views.recent_announcements_async, '/api/org/announcements/recent/'),
+        (views.next_event, views.next_event_async, '/api/org/events/next/'),
+        (views.organization_stats, views.organization_stats_async, '/api/org/stats/'),
+    ]
+
+    def assertSameResponses(self):
+        for sync_view, async_view, path in self.cases:
+            with self.subTest(path):
+                sync, async_ = sync_and_async(sync_view, async_view, path)
+                self.assertEqual(sync, async_)
+
+    def test_empty(self):
+        self.assertSameResponses()
+
+    def test_with_data(self):
+        now = timezone.now()
+        Announcement.objects.create(title='Meetup', message='Moved to Friday.', priority='High')
+        Event.objects.create(title='Pitch night', date=now + timedelta(days=3), venue='iHub', description='Pitches.')
+        Event.objects.create(
+            title='Weekly standup', date=now - timedelta(days=20), venue='Online', description='Updates.',
+            recurrence_frequency='weekly',
+        )
+        MembershipApplication.objects.create(full_name='Akinyi Otieno', email='akinyi@example.com', county='Kisumu', motivation='Co-founders.')
+        self.assertSameResponses()
+
+
+class MemberCalendarFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.member = make_user('member@example.com')
+
+    def feed_status(self, url):
+        return self.client.get(url).status_code
+
+    def test_rotating_revokes_the_old_url(self):
+        self.client.force_login(self.member)
+        old_url = self.client.get('/api/org/events/calendar-link/').json()['url']
+        self.assertEqual(self.feed_status(old_url), 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            new_url = self.client.post('/api/org/events/calendar-link/').json()['url']
+        self.assertNotEqual(new_url, old_url)
+        self.assertEqual(self.feed_status(old_url), 404)
+        self.assertEqual(self.feed_status(new_url), 200)
+        self.assertEqual(self.client.get('/api/org/events/calendar-link/').json()['url'], new_url)
+
+    def test_tokens_from_before_rotation_existed_still_work(self):
+        token = signing.Signer(salt=ical.FEED_TOKEN_SALT).sign(str(self.member.pk))
+        self.assertEqual(self.feed_status(f'/api/org/events/calendar/{token}.ics'), 200)
+        ical.rotate_member_feed(self.member)
+        cache.clear()
+        self.assertEqual(self.feed_status(f'/api/org/events/calendar/{token}.ics'), 404)
+
+    def test_tampered_token(self):
+        token = ical.member_feed_token(self.member).replace(f'{self.member.pk}:', f'{self.member.pk + 1}:')
+        self.assertEqual(self.feed_status(f'/api/org/events/calendar/{token}.ics'), 404)
+
+
+class ICalTimezoneTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def feed(self):
+        return self.client.get('/api/org/events/calendar.ics').content.decode()
+
+    def test_recurring_events_come_with_their_vtimezone(self):
+        Event.objects.create(
+            title='Weekly standup', date=timezone.now() + timedelta(days=1), venue='Online',
+            description='Updates.', recurrence_frequency='weekly',
+        )
+        feed = self.feed()
+        self.assertIn(f'DTSTART;TZID={settings.TIME_ZONE}:', feed)
+        self.assertEqual(feed.count('BEGIN:VTIMEZONE'), 1)
+        self.assertLess(feed.index('BEGIN:VTIMEZONE'), feed.index('BEGIN:VEVENT'))
+        self.assertIn(f'TZID:{settings.TIME_ZONE}\r\n', feed)
+
+    def test_one_off_events_are_utc_without_vtimezone(self):
+        Event.objects.create(title='Pitch night', date=timezone.now() + timedelta(days=1), venue='iHub', description='Pitches.')
+        feed = self.feed()
+        self.assertRegex(feed, r'DTSTART:\d{8}T\d{6}Z')
+        self.assertNotIn('VTIMEZONE', feed)
+
+    def test_nairobi_has_one_fixed_offset(self):
+        vtimezone = ical.render_timezone('Africa/Nairobi', 2026)
+        self.assertEqual(vtimezone.count('BEGIN:STANDARD'), 1)
+        self.assertNotIn('DAYLIGHT', vtimezone)
+        self.assertIn('TZOFFSETFROM:+0300\r\nTZOFFSETTO:+0300\r\nTZNAME:EAT', vtimezone)
+
+    def test_dst_zones_list_their_changes(self):
+        vtimezone = ical.render_timezone('Europe/London', 2026)
+        self.assertIn('BEGIN:DAYLIGHT\r\nDTSTART:20260329T010000\r\nTZOFFSETFROM:+0000\r\nTZOFFSETTO:+0100', vtimezone)
+        self.assertIn('BEGIN:STANDARD\r\nDTSTART:20261025T020000\r\nTZOFFSETFROM:+0100\r\nTZOFFSETTO:+0000', vtimezone)
@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from organization.views import (
     AnnouncementViewSet, EventViewSet, MembershipApplicationViewSet, 
-    recent_announcements, next_event, organization_stats
+    recent_announcements, next_event, organization_stats,
+    recent_announcements_async, next_event_async, organization_stats_async,
+    events_calendar, member_calendar, calendar_link, live_stream, my_rsvps
 )
 
 router = DefaultRouter()
@@ -12,9 +15,14 @@ router.register(r'applications', MembershipApplicationViewSet, basename='applica
 
 urlpatterns = [
     # ✅ CUSTOM ROUTES FIRST - these need to match before the router patterns
-    path('announcements/recent/', recent_announcements, name='recent_announcements'),
-    path('events/next/', next_event, name='next_event'),
-    path('stats/', organization_stats, name='org_stats'),
+    path('announcements/recent/', recent_announcements_async if settings.ASYNC_READ_VIEWS else recent_announcements, name='recent_announcements'),
+    path('events/next/', next_event_async if settings.ASYNC_READ_VIEWS else next_event, name='next_event'),
+    path('stats/', organization_stats_async if settings.ASYNC_READ_VIEWS else organization_stats, name='org_stats'),
+    path('events/calendar.ics', events_calendar, name='events_calendar'),
+    path('events/calendar/<str:token>.ics', member_calendar, name='member_calendar'),
+    path('events/calendar-link/', calendar_link, name='calendar_link'),
+    path('events/rsvps/', my_rsvps, name='my_rsvps'),
+    path('live/', live_stream, name='live_stream'),
     
     # ✅ ROUTER LAST - catch-all patterns
     path('', include(router.urls)),
@@ -1,52 +1,514 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
-from organization.models import Announcement, Event, MembershipApplication
-from organization.serializers import AnnouncementSerializer, EventSerializer, MembershipApplicationSerializer
+from organization.models import Announcement, Event, EventRSVP, MembershipApplication
+from organization.serializers import (
+    AnnouncementSerializer, EventSerializer, EventRSVPSerializer, MembershipApplicationSerializer, ApplicationBatchApproveSerializer,
+    ReviewQueueApplicationSerializer, ApplicationClaimSerializer, ApplicationReleaseSerializer, ApplicationDecisionSerializer,
+)
+from organization import review_queue
+from organization import rsvp as rsvps
+from organization import recurrence
+from organization.pagination import EventArchivePagination
+from organization.onboarding import approve_applications
+from organization import ical
+from organization.signals import ANNOUNCEMENTS, APPLICATIONS, CALENDAR_FEEDS, EVENTS
+from projects.signals import MILESTONES
+from accounts.models import CustomUser
+from django.urls import reverse
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+from GNET import broadcast
+from GNET.async_api import json_response
+from GNET.response_cache import CachedResponseMixin, acached_response, cached_response
+from django.views.decorators.http import require_safe
+from GNET.throttling import ApplicationThrottle
+from django.db.models import Q
 from django.utils import timezone
+from datetime import datetime, time, timedelta
+import asyncio
 
-class AnnouncementViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Announcement.objects.all()
+
+def next_event_start():
+    """When the next upcoming event (or occurrence of a recurring one) starts; responses listing upcoming events go stale then."""
+    now = timezone.now()
+    upcoming = Event.objects.filter(recurrence.upcoming_q(now))
+    next_one_off = (
+        upcoming.filter(recurrence_frequency='', date__gte=now)
+        .order_by('date').values_list('date', flat=True).first()
+    )
+    series = upcoming.exclude(recurrence_frequency='').only(
+        'date', 'recurrence_frequency', 'recurrence_interval', 'recurrence_until', 'recurrence_count'
+    )
+    return min(filter(None, [next_one_off, recurrence.next_start(series, now)]), default=None)
+
+def next_event_candidates(now):
+    """
+    The events that can hold the next occurrence: the soonest upcoming
+    one-off event and every series still running. recurrence.next_occurrence()
+    picks the winner; a series that started long ago can still be next.
+    """
+    upcoming = Event.objects.select_related('image_asset').filter(recurrence.upcoming_q(now))
+    return (
+        upcoming.filter(recurrence_frequency='', date__gte=now).order_by('date')[:1],
+        upcoming.exclude(recurrence_frequency=''),
+    )
+
+def next_event_payload(found, request):
+    """Body of the next-event endpoints: the event plus `occurrence_start`, as in /events/occurrences/."""
+    event, at = found
+    return {**EventSerializer(event, context={'request': request}).data, 'occurrence_start': at}
+
+def recent_announcements_queryset():
+    return Announcement.objects.select_related('image_asset')[:5]
+
+def organization_stats_querysets():
+    """What organization_stats counts, by response key; the async view counts the same querysets."""
+    return {
+        'pending_applications': MembershipApplication.objects.filter(status='Pending'),
+        'upcoming_events': Event.objects.filter(recurrence.upcoming_q()),
+        'total_announcements': Announcement.objects.all(),
+    }
+
+OCCURRENCE_WINDOW_DAYS = 90
+MAX_OCCURRENCE_WINDOW_DAYS = 366
+
+
+def _parse_moment(value):
+    """ISO date or datetime from a query param; dates mean midnight local time."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+class AnnouncementViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    cache_dependencies = [ANNOUNCEMENTS]
+    queryset = Announcement.objects.select_related('image_asset')
     serializer_class = AnnouncementSerializer
     permission_classes = [permissions.AllowAny]
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    cache_dependencies = [EVENTS]
+    cache_expires = staticmethod(next_event_start)
     serializer_class = EventSerializer
     permission_classes = [permissions.AllowAny]
+    # Ids only, so /events/abc/rsvp/ is a 404 rather than a ValueError in the rsvp action
+    lookup_value_regex = r'\d+'
     
     def get_queryset(self):
-        return Event.objects.filter(date__gte=timezone.now())
+        # Recurring events stay listed until their last occurrence has passed
+        return Event.objects.select_related('image_asset').filter(recurrence.upcoming_q())
+    
+    @action(detail=False, methods=['get'], pagination_class=EventArchivePagination)
+    def archive(self, request):
+        """
+        Past events, most recent first (recurring ones once their series has ended).
+        
+        GET /api/org/events/archive/?page_size=20
+        Follow `next` for older events. Each page is one range scan on the
+        last_occurrence_at index, however far back the client pages.
+        """
+        queryset = Event.objects.select_related('image_asset').filter(last_occurrence_at__lt=timezone.now())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def occurrences(self, request):
+        """
+        Every occurrence in a window, recurring events expanded, soonest first.
+        
+        GET /api/org/events/occurrences/?start=2026-11-01&end=2026-12-01
+        Defaults to the next 90 days; windows are capped at a year. Each
+        item is the event plus `occurrence_start`.
+        """
+        try:
+            start = _parse_moment(request.query_params.get('start')) or timezone.now()
+            end = _parse_moment(request.query_params.get('end')) or start + timedelta(days=OCCURRENCE_WINDOW_DAYS)
+        except ValueError:
+            return Response({'detail': 'start and end must be ISO dates or datetimes.'}, status=status.HTTP_400_BAD_REQUEST)
+        if end <= start:
+            return Response({'detail': 'end must be after start.'}, status=status.HTTP_400_BAD_REQUEST)
+        end = min(end, start + timedelta(days=MAX_OCCURRENCE_WINDOW_DAYS))
+        
+        events = list(
+            Event.objects.select_related('image_asset')
+            .filter(recurrence.upcoming_q(start), date__lt=end)
+        )
+        serialized = dict(zip((event.pk for event in events), self.get_serializer(events, many=True).data))
+        items = sorted(
+            ((at, event.pk) for event in events for at in event.occurrences(start, end)),
+            key=lambda item: item
+        )
+        return Response([
+            {**serialized[event_id], 'occurrence_start': at}
+            for at, event_id in items
+        ], status=200)
+    
+    @action(detail=True, methods=['post', 'delete'], permission_classes=[permissions.IsAuthenticated])
+    def rsvp(self, request, pk=None):
+        """
+        RSVP to an upcoming event (POST) or cancel (DELETE).
+        
+        POST /api/org/events/{id}/rsvp/
+        Response: {"status": "confirmed" | "waitlisted", "waitlist_position": null | n,
+                   "seats_taken": n, "seats_left": n | null}
+        Cancelling a confirmed seat gives it to the first person on the waitlist.
+        For a recurring event the RSVP covers the whole series, not one
+        occurrence (see organization/rsvp.py).
+        """
+        if not Event.objects.filter(recurrence.upcoming_q(), pk=pk).exists():
+            return Response({'detail': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            if request.method == 'DELETE':
+                record, promoted = rsvps.cancel(pk, request.user)
+                if record is None:
+                    return Response({'detail': 'You have no RSVP for this event.'}, status=status.HTTP_404_NOT_FOUND)
+            else:
+                record = rsvps.rsvp(pk, request.user)
+        except Event.DoesNotExist:
+            return Response({'detail': 'Event not found.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        event = Event.objects.only('capacity', 'seats_taken').get(pk=pk)
+        position = None
+        if record.status == rsvps.WAITLISTED:
+            position = EventRSVP.objects.filter(
+                event_id=pk, status=rsvps.WAITLISTED, queued_at__lte=record.queued_at
+            ).count()
+        return Response({
+            'status': record.status,
+            'waitlist_position': position,
+            'seats_taken': event.seats_taken,
+            'seats_left': event.seats_left,
+        }, status=200)
 
 class MembershipApplicationViewSet(viewsets.ModelViewSet):
     queryset = MembershipApplication.objects.all()
     serializer_class = MembershipApplicationSerializer
     permission_classes = [permissions.AllowAny]
+    # Ids only, so /applications/abc/decide/ is a 404 rather than a ValueError in decide
+    lookup_value_regex = r'\d+'
+    
+    def get_throttles(self):
+        # The public apply form; admin actions are not throttled
+        if self.action == 'create':
+            return [ApplicationThrottle()]
+        return super().get_throttles()
+    
+    @action(detail=False, methods=['post'], url_path='batch-approve', permission_classes=[permissions.IsAuthenticated])
+    def batch_approve(self, request):
+        """
+        Approve many pending applications at once, creating a member account
+        and profile for each (admins only).
+        
+        POST /api/org/applications/batch-approve/
+        {"ids": [1, 2, 3]}
+        
+        Response: {"results": {"1": {"status": "approved", "detail": "", "user_id": 42}, ...}}
+        Possible statuses: approved, email_exists, email_too_long,
+        duplicate_in_batch, already_processed, claimed, locked, not_found.
+        Welcome emails go out in the background after the batch is saved.
+        """
+        if request.user.role != 'admin':
+            return Response(
+                {'detail': 'Only admins can approve applications.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = ApplicationBatchApproveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = approve_applications(serializer.validated_data['ids'], reviewer=request.user)
+        return Response({'results': results}, status=200)
+    
+    def _admin_only(self, request):
+        if request.user.role != 'admin':
+            return Response(
+                {'detail': 'Only admins can review applications.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return None
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def claim(self, request):
+        """
+        Claim the next pending applications to review (admins only).
+        
+        POST /api/org/applications/claim/
+        {"count": 10}
+        
+        Returns the applications you now hold, oldest first. Claims you
+        already hold count towards `count` and are renewed; each claim
+        lapses after the lease (lease_expires_at) and returns to the queue.
+        """
+        denied = self._admin_only(request)
+        if denied:
+            return denied
+        serializer = ApplicationClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        applications = review_queue.claim(request.user, serializer.validated_data['count'])
+        return Response(ReviewQueueApplicationSerializer(applications, many=True).data, status=200)
+    
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def release(self, request):
+        """
+        Put claimed applications back in the queue (admins only).
+        
+        POST /api/org/applications/release/
+        {"ids": [1, 2]}   (omit ids to release everything you hold)
+        """
+        denied = self._admin_only(request)
+        if denied:
+            return denied
+        serializer = ApplicationReleaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        released = review_queue.release(request.user, serializer.validated_data.get('ids'))
+        return Response({'released': released}, status=200)
+    
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def decide(self, request, pk=None):
+        """
+        Approve or reject an application you have claimed (admins only).
+        
+        POST /api/org/applications/{id}/decide/
+        {"decision": "approve" | "reject"}
+        
+        Approving creates the member account and profile.
+        """
+        denied = self._admin_only(request)
+        if denied:
+            return denied
+        serializer = ApplicationDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        application_id = int(pk)
+        try:
+            result = review_queue.decide(request.user, application_id, serializer.validated_data['decision'])
+        except MembershipApplication.DoesNotExist as e:
+            return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except review_queue.ClaimError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(result, status=200)
+    
+    @action(detail=False, methods=['get'], url_path='review-metrics', permission_classes=[permissions.IsAuthenticated])
+    def review_metrics(self, request):
+        """
+        Reviewer throughput over the last N days (default 7, max 90; admins only).
+        
+        GET /api/org/applications/review-metrics/?days=7
+        """
+        denied = self._admin_only(request)
+        if denied:
+            return denied
+        try:
+            days = max(1, min(int(request.query_params.get('days', 7)), 90))
+        except ValueError:
+            days = 7
+        since = timezone.now() - timedelta(days=days)
+        pending = MembershipApplication.objects.filter(status='Pending').count()
+        return Response({
+            'days': days,
+            'pending': pending,
+            'reviewers': review_queue.reviewer_metrics(since),
+        }, status=200)
 
+@cached_response(dependencies=[ANNOUNCEMENTS])
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def recent_announcements(request):
-    announcements = Announcement.objects.all()[:5]
-    serializer = AnnouncementSerializer(announcements, many=True)
+    announcements = recent_announcements_queryset()
+    serializer = AnnouncementSerializer(announcements, many=True, context={'request': request})
     return Response(serializer.data)
 
+@cached_response(dependencies=[EVENTS], expires=next_event_start)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def next_event(request):
-    event = Event.objects.filter(date__gte=timezone.now()).first()
-    if event:
-        serializer = EventSerializer(event)
-        return Response(serializer.data)
+    """
+    The next event to start, recurring series included.
+    
+    GET /api/org/events/next/
+    Response: the event plus `occurrence_start`, the start of that occurrence.
+    """
+    now = timezone.now()
+    one_off, series = next_event_candidates(now)
+    found = recurrence.next_occurrence([*one_off, *series], now)
+    if found:
+        return Response(next_event_payload(found, request))
     return Response({'detail': 'No upcoming events'}, status=status.HTTP_404_NOT_FOUND)
 
+@cached_response(dependencies=[APPLICATIONS, EVENTS, ANNOUNCEMENTS], expires=next_event_start)
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def organization_stats(request):
-    pending_apps = MembershipApplication.objects.filter(status='Pending').count()
-    total_events = Event.objects.filter(date__gte=timezone.now()).count()
-    total_announcements = Announcement.objects.count()
+    return Response({key: queryset.count() for key, queryset in organization_stats_querysets().items()})
+
+# ==================== ASYNC READ PATH (ASGI, see GNET/async_api.py) ====================
+
+@acached_response(dependencies=[ANNOUNCEMENTS])
+@require_safe
+async def recent_announcements_async(request):
+    announcements = [announcement async for announcement in recent_announcements_queryset()]
+    serializer = AnnouncementSerializer(announcements, many=True, context={'request': request})
+    return json_response(serializer.data)
+
+@acached_response(dependencies=[EVENTS], expires=next_event_start)
+@require_safe
+async def next_event_async(request):
+    now = timezone.now()
+    one_off, series = next_event_candidates(now)
+    events = [event async for event in one_off] + [event async for event in series]
+    found = recurrence.next_occurrence(events, now)
+    if found:
+        return json_response(next_event_payload(found, request))
+    return json_response({'detail': 'No upcoming events'}, status=status.HTTP_404_NOT_FOUND)
+
+@acached_response(dependencies=[APPLICATIONS, EVENTS, ANNOUNCEMENTS], expires=next_event_start)
+@require_safe
+async def organization_stats_async(request):
+    querysets = organization_stats_querysets()
+    counts = await asyncio.gather(*(queryset.acount() for queryset in querysets.values()))
+    return json_response(dict(zip(querysets, counts)))
+
+# ==================== CALENDAR FEEDS ====================
+
+@cached_response(dependencies=[EVENTS])
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@renderer_classes([ical.ICalendarRenderer])
+def events_calendar(request):
+    """
+    All organization events as an iCalendar feed.
+    
+    GET /api/org/events/calendar.ics
+    
+    Subscribe to it from any calendar app. Polls are answered from cache
+    (and with 304 when If-None-Match matches) until an event changes.
+    """
+    return Response(ical.organization_calendar(), content_type='text/calendar; charset=utf-8')
+
+@cached_response(dependencies=[EVENTS, MILESTONES, CALENDAR_FEEDS])
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+@renderer_classes([ical.ICalendarRenderer])
+def member_calendar(request, token):
+    """
+    Personal feed: organization events plus milestones of the member's ideas.
+    
+    GET /api/org/events/calendar/{token}.ics
+    
+    The token comes from /api/org/events/calendar-link/ and stops working
+    once the member rotates it there.
+    """
+    parsed = ical.parse_member_feed_token(token)
+    user = None
+    if parsed:
+        user_id, version = parsed
+        user = CustomUser.objects.filter(pk=user_id, calendar_feed_version=version, is_active=True).first()
+    if user is None:
+        return Response('', status=status.HTTP_404_NOT_FOUND)
+    return Response(ical.member_calendar(user), content_type='text/calendar; charset=utf-8')
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def my_rsvps(request):
+    """
+    The logged-in member's RSVPs to upcoming events (not response-cached: per user).
+    
+    GET /api/org/events/rsvps/
+    """
+    queryset = (
+        EventRSVP.objects.filter(user=request.user)
+        .filter(Q(event__last_occurrence_at__gte=timezone.now()) | Q(event__last_occurrence_at__isnull=True))
+        .exclude(status=rsvps.CANCELLED)
+        .select_related('event')
+        .order_by('event__date')
+    )
+    return Response(EventRSVPSerializer(queryset, many=True).data, status=200)
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def calendar_link(request):
+    """
+    The logged-in member's personal calendar feed URL.
     
+    GET /api/org/events/calendar-link/
+    POST /api/org/events/calendar-link/  (rotate: a new URL; the old one stops working)
+    
+    Anyone with the URL can read the feed, so rotate it if it leaked.
+    """
+    if request.method == 'POST':
+        token = ical.rotate_member_feed(request.user)
+    else:
+        token = ical.member_feed_token(request.user)
+    path = reverse('member_calendar', kwargs={'token': token})
     return Response({
-        'pending_applications': pending_apps,
-        'upcoming_events': total_events,
-        'total_announcements': total_announcements,
-    })
\ No newline at end of file
+        'url': request.build_absolute_uri(path),
+        'organization_url': request.build_absolute_uri(reverse('events_calendar')),
+    }, status=200)
+
+
+# ==================== LIVE UPDATES (SSE) ====================
+
+LIVE_HEARTBEAT_SECONDS = getattr(settings, 'LIVE_EVENTS_HEARTBEAT', 15)
+LIVE_RETRY_MS = 5000
+
+
+async def live_stream(request):
+    """
+    Server-sent events: announcement.* and event.* changes as they happen.
+    
+    GET /api/org/live/
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get what
+    they missed; if that is more than the buffer holds they get a `reset`
+    event and should refetch. So do clients of other workers when a message
+    is too big to fan out (`data` names the event, see GNET/broadcast.py). Serve through GNET.asgi (e.g. daphne) so each
+    open connection is a coroutine rather than a worker thread.
+    """
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id') or 0)
+    except ValueError:
+        last_id = 0
+
+    async def events():
+        broadcast.get_backend()
+        # Subscribe inside the stream so the queue lives on the server's event
+        # loop, and before replaying so nothing published in between is lost
+        subscription = broadcast.hub.subscribe()
+        try:
+            yield f'retry: {LIVE_RETRY_MS}\n\n'.encode()
+            replayed = set()
+            if last_id:
+                missed = broadcast.hub.replay(last_id)
+                if missed is None:
+                    yield b'event: reset\ndata: {}\n\n'
+                else:
+                    for message in missed:
+                        replayed.add(message.id)
+                        yield message.encode()
+            while not subscription.overflowed:
+                try:
+                    message = await subscription.get(LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield b': ping\n\n'
+                    continue
+                if message.id in replayed:
+                    continue
+                yield message.encode()
+            # Too far behind: end the stream, the client reconnects with Last-Event-ID
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,9 +1,9 @@
 from django.contrib import admin
-from projects.models import Idea, Proposal, Milestone
+from projects.models import Idea, Proposal, Milestone, IdeaVote
 
 @admin.register(Idea)
 class IdeaAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'status', 'created_at']
+    list_display = ['title', 'user', 'status', 'vote_count', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['title', 'user__email']
 
@@ -15,4 +15,9 @@ class ProposalAdmin(admin.ModelAdmin):
 @admin.register(Milestone)
 class MilestoneAdmin(admin.ModelAdmin):
     list_display = ['title', 'idea', 'status', 'due_date']
-    list_filter = ['status', 'due_date']
\ No newline at end of file
+    list_filter = ['status', 'due_date']
+
+@admin.register(IdeaVote)
+class IdeaVoteAdmin(admin.ModelAdmin):
+    list_display = ['idea', 'user', 'created_at']
+    search_fields = ['idea__title', 'user__email']
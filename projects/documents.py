@@ -0,0 +1,89 @@
+"""
+Proposal document storage.
+
+Uploads are streamed to a temporary file chunk by chunk (never held in
+memory) while their SHA-256 is computed on the fly. The file is then stored
+under its hash, proposals/sha256/ab/abcdef..., so uploading the same PDF
+twice keeps a single copy on disk and every proposal points at it.
+"""
+import hashlib
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+DOCUMENT_PREFIX = 'proposals/sha256'
+
+MAX_DOCUMENT_BYTES = getattr(settings, 'PROPOSAL_DOCUMENT_MAX_BYTES', 25 * 1024 * 1024)
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """
+    TemporaryFileUploadHandler that also hashes each chunk as it arrives and
+    drops files larger than MAX_DOCUMENT_BYTES without writing the rest.
+
+    The finished UploadedFile gets a `sha256` attribute; skipped field names
+    are recorded on `request.oversized_uploads`.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_DOCUMENT_BYTES:
+            self.file.close()
+            if not hasattr(self.request, 'oversized_uploads'):
+                self.request.oversized_uploads = []
+            self.request.oversized_uploads.append(self.field_name)
+            raise SkipFile()
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.hasher.hexdigest()
+        return uploaded
+
+
+def document_path(sha256):
+    return f'{DOCUMENT_PREFIX}/{sha256[:2]}/{sha256}'
+
+
+def _hash_file(uploaded):
+    hasher = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def store_document(uploaded):
+    """
+    Store an uploaded file content-addressed and return the Proposal fields
+    describing it. Identical content already on disk is reused as-is.
+    """
+    sha256 = getattr(uploaded, 'sha256', None) or _hash_file(uploaded)
+    path = document_path(sha256)
+    if not default_storage.exists(path):
+        saved = default_storage.save(path, uploaded)
+        if saved != path:
+            # Lost a race with an identical upload; keep the first copy
+            default_storage.delete(saved)
+
+    name = os.path.basename(uploaded.name or '') or sha256
+    content_type = (
+        uploaded.content_type
+        or mimetypes.guess_type(name)[0]
+        or 'application/octet-stream'
+    )
+    return {
+        'document': path,
+        'document_sha256': sha256,
+        'document_name': name[:255],
+        'document_size': uploaded.size,
+        'document_content_type': content_type[:100],
+    }
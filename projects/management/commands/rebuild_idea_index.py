@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from projects import similarity
+from projects.models import Idea
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the near-duplicate (MinHash/LSH) index for every idea.'
+
+    def handle(self, *args, **options):
+        count = 0
+        for idea in Idea.objects.only('id', 'title', 'problem_statement', 'proposed_solution').iterator(chunk_size=500):
+            similarity.index_idea(idea)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} ideas'))
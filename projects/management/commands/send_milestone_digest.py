@@ -0,0 +1,84 @@
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.html import escape
+
+from members.views import send_email_sendgrid
+from projects.models import Milestone
+
+
+class Command(BaseCommand):
+    help = (
+        "Email every idea owner a digest of their overdue and upcoming milestones. "
+        "Meant to run nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='How many days ahead count as upcoming (default 7)')
+        parser.add_argument('--dry-run', action='store_true', help="Print the digests instead of sending them")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon = today + timedelta(days=options['days'])
+
+        # One pass over every open milestone due up to the horizon (overdue included),
+        # already sorted by owner so it can be grouped without extra queries.
+        milestones = (
+            Milestone.objects
+            .filter(status__in=Milestone.OPEN_STATUSES, due_date__lte=horizon)
+            .select_related('idea__user')
+            .order_by('idea__user_id', 'due_date', 'id')
+        )
+
+        sent = failed = 0
+        for _, owner_milestones in groupby(milestones.iterator(chunk_size=1000), key=lambda m: m.idea.user_id):
+            owner_milestones = list(owner_milestones)
+            owner = owner_milestones[0].idea.user
+            overdue = [m for m in owner_milestones if m.due_date < today]
+            upcoming = [m for m in owner_milestones if m.due_date >= today]
+
+            if options['dry_run']:
+                self.stdout.write(f"{owner.email}: {len(overdue)} overdue, {len(upcoming)} upcoming")
+                continue
+
+            html_message = self._render(owner, overdue, upcoming, options['days'])
+            if send_email_sendgrid('Your G-NET milestone digest', html_message, owner.email):
+                sent += 1
+            else:
+                failed += 1
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} digests ({failed} failed)'))
+
+    def _render(self, owner, overdue, upcoming, days):
+        frontend_url = getattr(settings, 'FRONTEND_URL', 'https://genentreprenuersnetwork.netlify.app')
+
+        def rows(items):
+            return ''.join(
+                f"<li><strong>{escape(m.title)}</strong> ({escape(m.idea.title)}) - due {m.due_date:%d %b %Y}, {escape(m.status)}</li>"
+                for m in items
+            )
+
+        sections = ''
+        if overdue:
+            sections += f'<h3 style="color: #dc2626;">Overdue</h3><ul>{rows(overdue)}</ul>'
+        if upcoming:
+            sections += f'<h3 style="color: #2563eb;">Due in the next {days} days</h3><ul>{rows(upcoming)}</ul>'
+
+        return f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                    <h2 style="color: #2563eb;">Milestone Digest</h2>
+                    <p>Hi {escape(owner.full_name)},</p>
+                    <p>Here is where your Blessed Mind milestones stand:</p>
+                    {sections}
+                    <p><a href="{frontend_url}/dashboard">Open your dashboard</a> to update them.</p>
+                    <p>Best regards,<br><strong>The G-NET Team</strong></p>
+                </div>
+            </body>
+        </html>
+        """
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='idea_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='idea_user_created_idx'),
+        ),
+    ]
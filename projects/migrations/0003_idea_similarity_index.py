@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_idea_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaSignature',
+            fields=[
+                ('idea', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='projects.idea')),
+                ('minhash', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IdeaLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.CharField(max_length=16)),
+                ('idea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='projects.idea')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='idea_lsh_band_bucket_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_idea_similarity_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='milestone',
+            index=models.Index(fields=['status', 'due_date'], name='milestone_status_due_idx'),
+        ),
+    ]
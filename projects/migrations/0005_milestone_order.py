@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_milestone_status_due_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='milestone',
+            options={'ordering': ['order', 'id']},
+        ),
+        migrations.AddField(
+            model_name='milestone',
+            name='order',
+            field=models.PositiveIntegerField(default=0, help_text="Position within the idea's milestone plan"),
+        ),
+    ]
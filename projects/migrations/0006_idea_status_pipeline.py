@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def backfill_pipeline(apps, schema_editor):
+    """Seed one counter per status from the ideas that already exist."""
+    Idea = apps.get_model('projects', 'Idea')
+    IdeaStatusCounter = apps.get_model('projects', 'IdeaStatusCounter')
+    
+    # Best available guess for when existing ideas entered their status
+    Idea.objects.filter(status_changed_at__isnull=True).update(status_changed_at=F('updated_at'))
+    
+    counts = dict(Idea.objects.values('status').annotate(n=Count('id')).values_list('status', 'n').order_by())
+    statuses = ['Submitted', 'Reviewing', 'Approved', 'Rejected']
+    IdeaStatusCounter.objects.bulk_create([
+        IdeaStatusCounter(status=status, current_count=counts.get(status, 0), entered_total=counts.get(status, 0))
+        for status in statuses
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_milestone_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaStatusCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('current_count', models.IntegerField(default=0)),
+                ('entered_total', models.PositiveBigIntegerField(default=0)),
+                ('exited_total', models.PositiveBigIntegerField(default=0)),
+                ('exited_seconds_total', models.PositiveBigIntegerField(default=0, help_text='Sum of time spent in this status by ideas that left it')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='idea',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, help_text='When the idea entered its current status', null=True),
+        ),
+        migrations.CreateModel(
+            name='IdeaStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('seconds_in_previous', models.PositiveBigIntegerField(blank=True, help_text='Time spent in from_status', null=True)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='idea_status_changes', to=settings.AUTH_USER_MODEL)),
+                ('idea', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_transitions', to='projects.idea')),
+            ],
+            options={
+                'ordering': ['changed_at', 'id'],
+            },
+        ),
+        migrations.RunPython(backfill_pipeline, migrations.RunPython.noop),
+    ]
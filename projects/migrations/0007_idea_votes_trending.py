@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:58
+
+from datetime import datetime, timezone as dt_timezone
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The formula as of this migration (projects.trending at the time), inlined
+# so later changes to that module don't change what this migration does
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+DECAY_SECONDS = 45000
+
+
+def backfill_trending_score(apps, schema_editor):
+    """Give existing ideas (no votes yet) their time-based starting score."""
+    Idea = apps.get_model('projects', 'Idea')
+    for idea in Idea.objects.only('id', 'status_changed_at', 'created_at').iterator():
+        age = ((idea.status_changed_at or idea.created_at) - EPOCH).total_seconds()
+        # log10(0 votes + 1) is 0
+        Idea.objects.filter(pk=idea.pk).update(trending_score=round(age / DECAY_SECONDS, 7))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_idea_status_pipeline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaVote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='idea',
+            name='trending_score',
+            field=models.FloatField(default=0, help_text='Vote count with time decay, see projects.trending'),
+        ),
+        migrations.AddField(
+            model_name='idea',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, help_text='Denormalized number of IdeaVote rows'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['status', '-trending_score', '-id'], name='idea_status_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['status', '-vote_count', '-id'], name='idea_status_votes_idx'),
+        ),
+        migrations.AddField(
+            model_name='ideavote',
+            name='idea',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='projects.idea'),
+        ),
+        migrations.AddField(
+            model_name='ideavote',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='idea_votes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='ideavote',
+            constraint=models.UniqueConstraint(fields=('user', 'idea'), name='unique_idea_vote'),
+        ),
+        migrations.RunPython(backfill_trending_score, migrations.RunPython.noop),
+    ]
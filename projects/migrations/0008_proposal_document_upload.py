@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_idea_votes_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposal',
+            name='document',
+            field=models.FileField(blank=True, help_text='Uploaded file, stored under its SHA-256 (see projects.documents)', max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='document_content_type',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='document_name',
+            field=models.CharField(blank=True, help_text='Original filename', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='document_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='proposal',
+            name='document_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='proposal',
+            name='document_url',
+            field=models.URLField(blank=True, help_text='External link, used when no document is uploaded'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_proposal_document_upload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['-created_at', '-id'], name='idea_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['-created_at', '-id'], name='proposal_created_idx'),
+        ),
+    ]
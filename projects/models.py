@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 
 class Idea(models.Model):
     STATUS_CHOICES = [
@@ -14,6 +15,9 @@ class Idea(models.Model):
     problem_statement = models.TextField()
     proposed_solution = models.TextField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Submitted')
+    status_changed_at = models.DateTimeField(null=True, blank=True, help_text="When the idea entered its current status")
+    vote_count = models.PositiveIntegerField(default=0, help_text="Denormalized number of IdeaVote rows")
+    trending_score = models.FloatField(default=0, help_text="Vote count with time decay, see projects.trending")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -21,13 +25,80 @@ class Idea(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Blessed Mind Idea'
         verbose_name_plural = 'Blessed Mind Ideas'
+        indexes = [
+            # Idea feed: "own ideas OR approved ideas" ordered by newest first
+            models.Index(fields=['status', '-created_at', '-id'], name='idea_status_created_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='idea_user_created_idx'),
+            # Admins' unfiltered list
+            models.Index(fields=['-created_at', '-id'], name='idea_created_idx'),
+            # Trending / top listings of approved ideas
+            models.Index(fields=['status', '-trending_score', '-id'], name='idea_status_trending_idx'),
+            models.Index(fields=['status', '-vote_count', '-id'], name='idea_status_votes_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        """
+        Save the idea and, if its status changed, append to the transition log
+        and update the pipeline counters in the same transaction.
+        
+        Set `idea._status_changed_by = user` before saving to record who made the change.
+        """
+        from projects.pipeline import record_transition
+        from projects.trending import trending_score
+        
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                # Lock the row so concurrent status changes are counted one at a time
+                previous = (
+                    Idea.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values('status', 'status_changed_at', 'created_at', 'vote_count', 'trending_score')
+                    .first()
+                )
+            if previous is not None:
+                # The counters only move through F() updates in projects.trending;
+                # a save from a stale instance (serializer, admin) must not undo votes
+                self.vote_count = previous['vote_count']
+                self.trending_score = previous['trending_score']
+            
+            changed = previous is None or previous['status'] != self.status
+            if changed:
+                now = timezone.now()
+                self.status_changed_at = now
+                changed_fields = ['status_changed_at']
+                if self.status == 'Approved':
+                    # Trending time starts when the idea becomes votable
+                    self.trending_score = trending_score(self.vote_count, now)
+                    changed_fields.append('trending_score')
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    kwargs['update_fields'] = list(update_fields) + [
+                        field for field in changed_fields if field not in update_fields
+                    ]
+            
+            super().save(*args, **kwargs)
+            
+            if changed:
+                record_transition(
+                    self,
+                    from_status=previous['status'] if previous else '',
+                    entered_previous_at=(previous['status_changed_at'] or previous['created_at']) if previous else None,
+                    changed_by=getattr(self, '_status_changed_by', None),
+                    now=now,
+                )
 
 class Proposal(models.Model):
     idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='proposals')
-    document_url = models.URLField()
+    document_url = models.URLField(blank=True, help_text="External link, used when no document is uploaded")
+    document = models.FileField(max_length=255, blank=True, help_text="Uploaded file, stored under its SHA-256 (see projects.documents)")
+    document_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    document_name = models.CharField(max_length=255, blank=True, help_text="Original filename")
+    document_size = models.PositiveBigIntegerField(null=True, blank=True)
+    document_content_type = models.CharField(max_length=100, blank=True)
     description = models.TextField(blank=True)
     approved_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_proposals')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -35,16 +106,101 @@ class Proposal(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='proposal_created_idx'),
+        ]
     
     def __str__(self):
         return f"Proposal for {self.idea.title}"
 
 class Milestone(models.Model):
+    STATUS_CHOICES = [
+        ('Not Started', 'Not Started'),
+        ('In Progress', 'In Progress'),
+        ('Completed', 'Completed'),
+    ]
+    # Statuses that still need work (listed explicitly so the (status, due_date) index is used)
+    OPEN_STATUSES = ['Not Started', 'In Progress']
+    
     idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='milestones')
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateField()
-    status = models.CharField(max_length=20, choices=[('Not Started', 'Not Started'), ('In Progress', 'In Progress'), ('Completed', 'Completed')])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    order = models.PositiveIntegerField(default=0, help_text="Position within the idea's milestone plan")
+    
+    class Meta:
+        ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='milestone_status_due_idx'),
+        ]
+    
+    def __str__(self):
+        return self.title
+
+class IdeaSignature(models.Model):
+    """MinHash signature of an idea's text (see projects/similarity.py)."""
+    idea = models.OneToOneField(Idea, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Signature for {self.idea_id}"
+
+class IdeaLSHBucket(models.Model):
+    """One LSH band bucket per signature band; ideas sharing a bucket are duplicate candidates."""
+    idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='lsh_buckets')
+    band = models.PositiveSmallIntegerField()
+    bucket = models.CharField(max_length=16)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='idea_lsh_band_bucket_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.idea_id} band {self.band}: {self.bucket}"
+
+class IdeaStatusTransition(models.Model):
+    """Append-only log of idea status changes (from_status is blank when the idea was created)."""
+    idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='status_transitions')
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20)
+    changed_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='idea_status_changes')
+    changed_at = models.DateTimeField(default=timezone.now)
+    seconds_in_previous = models.PositiveBigIntegerField(null=True, blank=True, help_text="Time spent in from_status")
+    
+    class Meta:
+        ordering = ['changed_at', 'id']
+    
+    def __str__(self):
+        return f"{self.idea_id}: {self.from_status or '-'} -> {self.to_status}"
+
+class IdeaStatusCounter(models.Model):
+    """
+    Running totals per idea status, updated with F() expressions on every
+    transition so the funnel report never has to scan Idea.
+    """
+    status = models.CharField(max_length=20, unique=True)
+    current_count = models.IntegerField(default=0)
+    entered_total = models.PositiveBigIntegerField(default=0)
+    exited_total = models.PositiveBigIntegerField(default=0)
+    exited_seconds_total = models.PositiveBigIntegerField(default=0, help_text="Sum of time spent in this status by ideas that left it")
+    
+    def __str__(self):
+        return f"{self.status}: {self.current_count}"
+
+class IdeaVote(models.Model):
+    """One member's upvote on an approved idea. Idea.vote_count mirrors the row count."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idea_votes')
+    idea = models.ForeignKey(Idea, on_delete=models.CASCADE, related_name='votes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idea'], name='unique_idea_vote'),
+        ]
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.user} upvoted {self.idea}"
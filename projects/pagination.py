@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdeaFeedPagination(CursorPagination):
+    """
+    Cursor pagination for the idea feed.
+    
+    Cursors are stable while new ideas are being submitted (no skipped or
+    repeated items between pages) and each page is a single index range
+    scan on created_at, however deep the client scrolls.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class MilestoneTimelinePagination(CursorPagination):
+    """Cursor pagination for milestone timelines, soonest due first."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('due_date', 'id')
@@ -0,0 +1,59 @@
+from django.db.models import F
+
+from projects.models import Idea, IdeaStatusCounter, IdeaStatusTransition
+
+
+def _bump(status, **changes):
+    """Apply F() increments to one status counter, creating the row if it is missing."""
+    updates = {field: F(field) + delta for field, delta in changes.items()}
+    if not IdeaStatusCounter.objects.filter(status=status).update(**updates):
+        IdeaStatusCounter.objects.get_or_create(status=status)
+        IdeaStatusCounter.objects.filter(status=status).update(**updates)
+
+
+def record_transition(idea, from_status, entered_previous_at, changed_by, now):
+    """
+    Log one status change and move the counters. Called from Idea.save()
+    inside its transaction, so the log, the counters and the idea always agree.
+    """
+    seconds = None
+    if from_status and entered_previous_at:
+        seconds = max(0, int((now - entered_previous_at).total_seconds()))
+    
+    # A new idea is "moved" into its first status by its author
+    changed_by_id = changed_by.pk if changed_by is not None else (None if from_status else idea.user_id)
+    
+    IdeaStatusTransition.objects.create(
+        idea=idea,
+        from_status=from_status,
+        to_status=idea.status,
+        changed_by_id=changed_by_id,
+        changed_at=now,
+        seconds_in_previous=seconds,
+    )
+    
+    if from_status:
+        _bump(from_status, current_count=-1, exited_total=1, exited_seconds_total=seconds or 0)
+    _bump(idea.status, current_count=1, entered_total=1)
+
+
+def record_deletion(idea):
+    _bump(idea.status, current_count=-1)
+
+
+def funnel():
+    """The pipeline funnel, read straight from the counters (one small query)."""
+    counters = {counter.status: counter for counter in IdeaStatusCounter.objects.all()}
+    stages = []
+    for status, _ in Idea.STATUS_CHOICES:
+        counter = counters.get(status) or IdeaStatusCounter(status=status)
+        average = counter.exited_seconds_total / counter.exited_total if counter.exited_total else None
+        stages.append({
+            'status': status,
+            'current': counter.current_count,
+            'entered': counter.entered_total,
+            'exited': counter.exited_total,
+            'avg_seconds_in_status': round(average) if average is not None else None,
+            'avg_days_in_status': round(average / 86400, 2) if average is not None else None,
+        })
+    return stages
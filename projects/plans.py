@@ -0,0 +1,58 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from GNET import response_cache
+from projects.models import Idea, Milestone
+from projects.signals import MILESTONES
+
+PLAN_FIELDS = ['title', 'description', 'due_date', 'status', 'order']
+
+
+def save_milestone_plan(idea, items):
+    """
+    Replace an idea's milestone plan in one transaction.
+    
+    - items with an id update that milestone (one bulk_update)
+    - items without an id are created (one bulk_create)
+    - milestones of the idea that are not in the plan are deleted
+    
+    The idea row is locked for the duration so two concurrent plan edits
+    can't interleave. Returns the saved plan in order.
+    """
+    with transaction.atomic():
+        list(Idea.objects.select_for_update().filter(pk=idea.pk).values_list('pk', flat=True))
+        
+        existing = {milestone.id: milestone for milestone in Milestone.objects.filter(idea=idea)}
+        unknown = [item['id'] for item in items if 'id' in item and item['id'] not in existing]
+        if unknown:
+            raise ValidationError({'milestones': f'Milestones {unknown} do not belong to this idea.'})
+        
+        to_update, to_create = [], []
+        for item in items:
+            if 'id' in item:
+                milestone = existing[item['id']]
+                for field in PLAN_FIELDS:
+                    if field in item:
+                        setattr(milestone, field, item[field])
+                to_update.append(milestone)
+            else:
+                to_create.append(Milestone(
+                    idea=idea,
+                    title=item['title'],
+                    description=item.get('description', ''),
+                    due_date=item['due_date'],
+                    status=item.get('status', 'Not Started'),
+                    order=item['order'],
+                ))
+        
+        kept = [milestone.id for milestone in to_update]
+        Milestone.objects.filter(idea=idea).exclude(id__in=kept).delete()
+        if to_update:
+            Milestone.objects.bulk_update(to_update, PLAN_FIELDS)
+        if to_create:
+            Milestone.objects.bulk_create(to_create)
+        
+        # bulk_update/bulk_create don't send save signals
+        response_cache.bump(MILESTONES)
+    
+    return Milestone.objects.filter(idea=idea).order_by('order', 'id')
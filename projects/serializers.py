@@ -1,19 +1,118 @@
 from rest_framework import serializers
-from projects.models import Idea, Proposal, Milestone
+from django.urls import reverse
+from projects.documents import store_document
+from projects.models import Idea, Proposal, Milestone, IdeaStatusTransition
 from accounts.serializers import CustomUserSerializer
 
 class MilestoneSerializer(serializers.ModelSerializer):
     class Meta:
         model = Milestone
-        fields = ['id', 'title', 'description', 'due_date', 'status']
+        fields = ['id', 'title', 'description', 'due_date', 'status', 'order']
+
+class MilestonePlanItemSerializer(serializers.Serializer):
+    """
+    One row of a milestone plan. Rows with an id update that milestone
+    (omitted description/status are left as they are), rows without one
+    create a milestone.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_blank=True)
+    due_date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Milestone.STATUS_CHOICES, required=False)
+    order = serializers.IntegerField(required=False, min_value=0)
+
+class MilestonePlanSerializer(serializers.Serializer):
+    """
+    A whole milestone plan for one idea.
+    
+    {"milestones": [{"id": 3, "title": ..., "due_date": "2025-03-01"}, {"title": "New step", ...}]}
+    
+    `order` defaults to the row's position in the list.
+    """
+    milestones = MilestonePlanItemSerializer(many=True, max_length=200)
+    
+    def validate_milestones(self, value):
+        ids = [item['id'] for item in value if 'id' in item]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each milestone id may appear only once.')
+        for position, item in enumerate(value):
+            item.setdefault('order', position)
+        return value
+
+class MilestoneTimelineSerializer(serializers.ModelSerializer):
+    """
+    Milestone plus the idea and owner it belongs to, for cross-idea timelines.
+    `owner_email` is only included for admins (pass the request in the context).
+    """
+    idea_id = serializers.IntegerField(read_only=True)
+    idea_title = serializers.CharField(source='idea.title', read_only=True)
+    owner_id = serializers.IntegerField(source='idea.user_id', read_only=True)
+    owner_name = serializers.CharField(source='idea.user.full_name', read_only=True)
+    owner_email = serializers.EmailField(source='idea.user.email', read_only=True)
+    
+    class Meta:
+        model = Milestone
+        fields = ['id', 'title', 'description', 'due_date', 'status', 'idea_id', 'idea_title', 'owner_id', 'owner_name', 'owner_email']
+        read_only_fields = fields
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if getattr(getattr(request, 'user', None), 'role', None) != 'admin':
+            fields.pop('owner_email')
+        return fields
 
 class ProposalSerializer(serializers.ModelSerializer):
+    """
+    A proposal carries either an uploaded `document` (multipart) or an
+    external `document_url`. Uploaded files are downloaded from `download_url`.
+    """
     approved_by = CustomUserSerializer(read_only=True)
+    document = serializers.FileField(write_only=True, required=False)
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Proposal
-        fields = ['id', 'document_url', 'description', 'approved_by', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = [
+            'id', 'idea', 'document_url', 'document', 'document_name', 'document_size',
+            'document_content_type', 'document_sha256', 'download_url',
+            'description', 'approved_by', 'created_at',
+        ]
+        read_only_fields = [
+            'id', 'document_name', 'document_size', 'document_content_type',
+            'document_sha256', 'created_at',
+        ]
+    
+    def get_download_url(self, obj):
+        if not obj.document:
+            return None
+        path = reverse('proposal-document', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+    
+    def validate_idea(self, idea):
+        request = self.context.get('request')
+        if request and idea.user_id != request.user.id and request.user.role != 'admin':
+            raise serializers.ValidationError('You can only add proposals to your own ideas.')
+        return idea
+    
+    def validate(self, attrs):
+        if self.instance is None and not attrs.get('document') and not attrs.get('document_url'):
+            raise serializers.ValidationError('Upload a document or provide a document_url.')
+        return attrs
+    
+    def _with_document(self, validated_data):
+        uploaded = validated_data.pop('document', None)
+        if uploaded is not None:
+            validated_data.update(store_document(uploaded))
+        return validated_data
+    
+    def create(self, validated_data):
+        return super().create(self._with_document(validated_data))
+    
+    def update(self, instance, validated_data):
+        return super().update(instance, self._with_document(validated_data))
 
 class IdeaSerializer(serializers.ModelSerializer):
     user = CustomUserSerializer(read_only=True)
@@ -22,5 +121,13 @@ class IdeaSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Idea
-        fields = ['id', 'user', 'title', 'problem_statement', 'proposed_solution', 'status', 'proposals', 'milestones', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        fields = ['id', 'user', 'title', 'problem_statement', 'proposed_solution', 'status', 'vote_count', 'proposals', 'milestones', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'vote_count', 'created_at', 'updated_at']
+
+class IdeaStatusTransitionSerializer(serializers.ModelSerializer):
+    changed_by = serializers.CharField(source='changed_by.full_name', read_only=True, default=None)
+    
+    class Meta:
+        model = IdeaStatusTransition
+        fields = ['id', 'from_status', 'to_status', 'changed_by', 'changed_at', 'seconds_in_previous']
+        read_only_fields = fields
\ No newline at end of file
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from GNET import response_cache
+from projects import pipeline, similarity
+from projects.models import Idea, Milestone
+
+# Response cache dependency for anything built from milestones (member calendar feeds)
+MILESTONES = 'projects.milestone'
+
+
+TEXT_FIELDS = ('title', 'problem_statement', 'proposed_solution')
+
+
+def _text_fields(idea):
+    return (idea.title, idea.problem_statement, idea.proposed_solution)
+
+
+@receiver(post_init, sender=Idea)
+def remember_idea_text(sender, instance, **kwargs):
+    # Reading a deferred field here (e.g. after .only()) would trigger another
+    # fetch and another post_init, so only snapshot fully loaded rows
+    if instance.get_deferred_fields().intersection(TEXT_FIELDS):
+        instance._indexed_text = None
+    else:
+        instance._indexed_text = _text_fields(instance)
+
+
+@receiver(post_save, sender=Idea)
+def update_similarity_index(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Only re-shingle when the text actually changed (status updates are free)
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields).intersection(TEXT_FIELDS):
+        return
+    if created or getattr(instance, '_indexed_text', None) != _text_fields(instance):
+        similarity.index_idea(instance)
+        instance._indexed_text = _text_fields(instance)
+
+
+@receiver(post_delete, sender=Idea)
+def update_pipeline_counters_on_delete(sender, instance, **kwargs):
+    pipeline.record_deletion(instance)
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+@receiver(post_delete, sender=Idea)
+def invalidate_milestone_responses(sender, **kwargs):
+    response_cache.bump(MILESTONES)
+
+
+@receiver(post_save, sender=Idea)
+def invalidate_milestone_responses_on_idea_change(sender, instance, created, raw=False, **kwargs):
+    # Milestone entries show the idea title; a brand new idea has no milestones yet
+    if not created and not raw:
+        response_cache.bump(MILESTONES)
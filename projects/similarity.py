@@ -0,0 +1,141 @@
+"""
+Near-duplicate detection for ideas with MinHash + locality-sensitive hashing.
+
+Each idea's title, problem statement and proposed solution are split into
+word shingles and reduced to a NUM_PERM-value MinHash signature. The
+signature is cut into BANDS bands; ideas that share any band hash land in
+the same LSH bucket. A lookup only compares against ideas sharing a bucket
+(an indexed (band, bucket) query), so it stays sublinear as ideas grow.
+With 16 bands of 4 rows, pairs above ~50% Jaccard similarity are found
+with high probability while unrelated ideas are rarely candidates.
+"""
+import hashlib
+import random
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 2
+
+# Estimated Jaccard similarity below which a candidate isn't reported
+MIN_SIMILARITY = 0.3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)  # fixed seed: signatures must be stable across processes
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def idea_text(idea):
+    return ' '.join([idea.title or '', idea.problem_statement or '', idea.proposed_solution or ''])
+
+
+def shingles(text):
+    tokens = [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 1]
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(text):
+    hashed = [_hash64(shingle) for shingle in shingles(text)]
+    if not hashed:
+        return None
+    return [
+        min((a * x + b) % _MERSENNE_PRIME for x in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_hashes(signature):
+    """(band, bucket) pairs for a signature."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        raw = ','.join(str(value) for value in rows)
+        buckets.append((band, hashlib.blake2b(raw.encode('ascii'), digest_size=8).hexdigest()))
+    return buckets
+
+
+def estimated_similarity(sig_a, sig_b):
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+# ==================== INDEX MAINTENANCE ====================
+
+def index_idea(idea):
+    """(Re)compute an idea's signature and LSH buckets."""
+    from projects.models import IdeaLSHBucket, IdeaSignature
+
+    signature = minhash(idea_text(idea))
+    with transaction.atomic():
+        IdeaLSHBucket.objects.filter(idea=idea).delete()
+        if signature is None:
+            IdeaSignature.objects.filter(idea=idea).delete()
+            return
+        IdeaSignature.objects.update_or_create(idea=idea, defaults={'minhash': signature})
+        IdeaLSHBucket.objects.bulk_create([
+            IdeaLSHBucket(idea=idea, band=band, bucket=bucket)
+            for band, bucket in band_hashes(signature)
+        ])
+
+
+# ==================== LOOKUP ====================
+
+def find_similar(text, limit=5, exclude_id=None, queryset=None):
+    """
+    Top `limit` existing ideas most similar to `text`.
+    
+    `queryset` restricts results to ideas the caller may see. Returns a list
+    of {'id', 'title', 'status', 'similarity'} dicts, best match first.
+    """
+    from projects.models import Idea, IdeaLSHBucket, IdeaSignature
+
+    signature = minhash(text)
+    if signature is None:
+        return []
+
+    bucket_filter = Q()
+    for band, bucket in band_hashes(signature):
+        bucket_filter |= Q(band=band, bucket=bucket)
+    candidates = IdeaLSHBucket.objects.filter(bucket_filter)
+    if exclude_id is not None:
+        candidates = candidates.exclude(idea_id=exclude_id)
+    candidate_ids = set(candidates.values_list('idea_id', flat=True))
+    if not candidate_ids:
+        return []
+
+    scored = []
+    for idea_id, other in IdeaSignature.objects.filter(idea_id__in=candidate_ids).values_list('idea_id', 'minhash'):
+        score = estimated_similarity(signature, other)
+        if score >= MIN_SIMILARITY:
+            scored.append((score, idea_id))
+    scored.sort(reverse=True)
+
+    ideas = queryset if queryset is not None else Idea.objects.all()
+    visible = {
+        row['id']: row
+        for row in ideas.filter(id__in=[idea_id for _, idea_id in scored])
+        .values('id', 'title', 'status')
+        .order_by()
+    }
+
+    results = []
+    for score, idea_id in scored:
+        if idea_id in visible:
+            results.append(dict(visible[idea_id], similarity=round(score, 2)))
+            if len(results) >= limit:
+                break
+    return results
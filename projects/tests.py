@@ -1,3 +1,444 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from GNET.testing import QueryBudgetMixin, make_user
+from projects import similarity, trending
+from projects.documents import store_document
+from projects.models import Idea, IdeaStatusCounter, Milestone, Proposal
+
+TOPICS = ['solar water pumps', 'mobile savings groups', 'coding bootcamps', 'organic fertilizer', 'boda boda logistics']
+
+
+class ProjectsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    routes_prefix = 'api/projects/'
+    budgets = {
+        'idea-list': {'get': 5, 'post': 22},
+        'idea-feed': 5,
+        'idea-funnel': 3,
+        'idea-top': 5,
+        'idea-trending': 5,
+        'idea-detail': {'get': 5, 'patch': 15},
+        'idea-milestone-plan': {'get': 6, 'put': 13},
+        'idea-similar': 8,
+        'idea-status-history': 6,
+        'idea-vote': {'post': 12, 'delete': 9},
+        'proposal-list': {'get': 3, 'post': 4},
+        'proposal-detail': 3,
+        'proposal-document': 3,
+        'milestone-list': 3,
+        'milestone-by-owner': 3,
+        'milestone-overdue': 3,
+        'milestone-upcoming': 3,
+        'milestone-detail': {'get': 3, 'patch': 4},
+    }
+
+    def seed(self, count):
+        # Ideas (a third of them the member's) moved through review, each with
+        # proposals, a milestone plan around today and a vote
+        start = Idea.objects.count()
+        today = timezone.localdate()
+        for number in range(start, start + count):
+            owner = self.member if number % 3 == 0 else make_user(f'founder{number}@example.com')
+            topic = TOPICS[number % len(TOPICS)]
+            idea = Idea.objects.create(
+                user=owner, title=f'{topic.capitalize()} #{number}',
+                problem_statement=f'Rural communities lack affordable {topic}.',
+                proposed_solution=f'A member-run cooperative offering {topic} on credit.',
+            )
+            idea.status = 'Rejected' if number % 5 == 4 else 'Approved'
+            idea._status_changed_by = self.admin
+            idea.save()
+            Proposal.objects.create(idea=idea, document_url='https://example.com/plan.pdf', description='Business plan', approved_by=self.admin)
+            Proposal.objects.create(idea=idea, document_url='https://example.com/budget.xlsx', description='Budget')
+            for order, (days, status) in enumerate([(-3, 'In Progress'), (3, 'Not Started'), (30, 'Completed')]):
+                Milestone.objects.create(
+                    idea=idea, title=f'Step {order + 1}', description='Milestone',
+                    due_date=today + timedelta(days=days), status=status, order=order,
+                )
+            if idea.status == 'Approved':
+                trending.add_vote(idea, self.admin)
+
+    def approved_idea(self, user=None):
+        ideas = Idea.objects.filter(status='Approved')
+        return (ideas.filter(user=user) if user else ideas).first()
+
+    def test_idea_list(self):
+        self.assertConstantQueries('idea-list', 'get', '/api/projects/ideas/', user=self.admin)
+        self.assertConstantQueries('idea-list', 'get', '/api/projects/ideas/', user=self.member)
+        self.assertConstantQueries('idea-list', 'post', '/api/projects/ideas/', {
+            'title': 'Solar water pumps for schools',
+            'problem_statement': 'Rural schools lack affordable solar water pumps.',
+            'proposed_solution': 'A member-run cooperative offering solar water pumps on credit.',
+        }, user=self.member, status=201)
+
+    def test_idea_feed(self):
+        self.assertConstantQueries('idea-feed', 'get', '/api/projects/ideas/feed/', user=self.member)
+
+    def test_idea_funnel(self):
+        self.assertConstantQueries('idea-funnel', 'get', '/api/projects/ideas/funnel/', user=self.member)
+
+    def test_idea_top(self):
+        self.assertConstantQueries('idea-top', 'get', '/api/projects/ideas/top/', user=self.member)
+
+    def test_idea_trending(self):
+        self.assertConstantQueries('idea-trending', 'get', '/api/projects/ideas/trending/', user=self.member)
+
+    def test_idea_detail(self):
+        idea = self.approved_idea(self.member)
+        self.assertQueryBudget('idea-detail', 'get', f'/api/projects/ideas/{idea.pk}/', user=self.member)
+        self.assertQueryBudget('idea-detail', 'patch', f'/api/projects/ideas/{idea.pk}/', {'status': 'Reviewing'}, user=self.admin)
+
+    def test_idea_milestone_plan(self):
+        idea = self.approved_idea(self.member)
+        self.assertQueryBudget('idea-milestone-plan', 'get', f'/api/projects/ideas/{idea.pk}/milestone-plan/', user=self.member)
+        plan = [
+            {'id': milestone.pk, 'title': milestone.title, 'due_date': milestone.due_date.isoformat(), 'status': 'Completed'}
+            for milestone in idea.milestones.all()
+        ] + [{'title': 'Launch', 'due_date': (timezone.localdate() + timedelta(days=60)).isoformat()}]
+        self.assertQueryBudget('idea-milestone-plan', 'put', f'/api/projects/ideas/{idea.pk}/milestone-plan/', {'milestones': plan}, user=self.member)
+
+    def test_idea_similar(self):
+        idea = self.approved_idea()
+        self.assertConstantQueries('idea-similar', 'get', f'/api/projects/ideas/{idea.pk}/similar/', user=self.member)
+
+    def test_idea_status_history(self):
+        idea = self.approved_idea()
+        self.assertQueryBudget('idea-status-history', 'get', f'/api/projects/ideas/{idea.pk}/status-history/', user=self.admin)
+
+    def test_idea_vote(self):
+        idea = self.approved_idea()
+        self.assertQueryBudget('idea-vote', 'post', f'/api/projects/ideas/{idea.pk}/vote/', user=self.member)
+        self.assertQueryBudget('idea-vote', 'delete', f'/api/projects/ideas/{idea.pk}/vote/', user=self.member)
+
+    def test_proposal_list(self):
+        self.assertConstantQueries('proposal-list', 'get', '/api/projects/proposals/', user=self.member)
+        idea = self.approved_idea(self.member)
+        self.assertQueryBudget('proposal-list', 'post', '/api/projects/proposals/', {
+            'idea': idea.pk, 'document_url': 'https://example.com/pitch.pdf', 'description': 'Pitch deck',
+        }, user=self.member, status=201)
+
+    def test_proposal_detail(self):
+        proposal = Proposal.objects.filter(approved_by__isnull=False).first()
+        self.assertQueryBudget('proposal-detail', 'get', f'/api/projects/proposals/{proposal.pk}/', user=self.member)
+
+    def test_proposal_document(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root):
+            upload = SimpleUploadedFile('plan.pdf', b'%PDF-1.4 business plan', content_type='application/pdf')
+            proposal = Proposal.objects.create(idea=self.approved_idea(self.member), description='Plan', **store_document(upload))
+            self.assertQueryBudget('proposal-document', 'get', f'/api/projects/proposals/{proposal.pk}/document/', user=self.member)
+
+    def test_milestone_list(self):
+        self.assertConstantQueries('milestone-list', 'get', '/api/projects/milestones/', user=self.member)
+
+    def test_milestone_by_owner(self):
+        self.assertConstantQueries('milestone-by-owner', 'get', '/api/projects/milestones/by-owner/', user=self.member)
+
+    def test_milestone_overdue(self):
+        self.assertConstantQueries('milestone-overdue', 'get', '/api/projects/milestones/overdue/', user=self.member)
+
+    def test_milestone_upcoming(self):
+        self.assertConstantQueries('milestone-upcoming', 'get', '/api/projects/milestones/upcoming/?days=14', user=self.member)
+
+    def test_milestone_detail(self):
+        milestone = Milestone.objects.first()
+        self.assertQueryBudget('milestone-detail', 'get', f'/api/projects/milestones/{milestone.pk}/', user=self.member)
+        self.assertQueryBudget('milestone-detail', 'patch', f'/api/projects/milestones/{milestone.pk}/', {'status': 'Completed'}, user=self.member)
+
+
+
+class MilestonePlanTests(TestCase):
+    def setUp(self):
+        self.owner = make_user('owner@example.com')
+        self.other = make_user('other@example.com')
+        self.admin = make_user('admin@example.com', role='admin')
+        self.idea = Idea.objects.create(user=self.owner, title='Solar pumps', problem_statement='P', proposed_solution='S', status='Approved')
+        self.prototype = Milestone.objects.create(idea=self.idea, title='Prototype', due_date='2025-03-01', status='In Progress', order=0)
+        self.pilot = Milestone.objects.create(idea=self.idea, title='Pilot', due_date='2025-04-01', status='Not Started', order=1)
+        self.url = f'/api/projects/ideas/{self.idea.pk}/milestone-plan/'
+
+    def put(self, milestones, user=None, url=None):
+        self.client.force_login(user or self.owner)
+        return self.client.put(url or self.url, {'milestones': milestones}, content_type='application/json')
+
+    def plan(self):
+        return list(Milestone.objects.filter(idea=self.idea).order_by('order', 'id').values_list('title', 'status', 'order'))
+
+    def test_update_create_and_delete_in_one_put(self):
+        response = self.put([
+            {'id': self.pilot.pk, 'title': 'Pilot in Kisumu', 'due_date': '2025-04-15'},
+            {'title': 'Launch', 'due_date': '2025-06-01'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.plan(), [('Pilot in Kisumu', 'Not Started', 0), ('Launch', 'Not Started', 1)])
+        self.assertFalse(Milestone.objects.filter(pk=self.prototype.pk).exists())
+        self.assertEqual([item['title'] for item in response.json()['milestones']], ['Pilot in Kisumu', 'Launch'])
+
+    def test_omitted_fields_are_kept(self):
+        self.put([{'id': self.prototype.pk, 'title': 'Prototype', 'due_date': '2025-03-01', 'order': 5}])
+        self.prototype.refresh_from_db()
+        self.assertEqual((self.prototype.status, self.prototype.order), ('In Progress', 5))
+
+    def test_empty_plan_deletes_everything(self):
+        self.assertEqual(self.put([]).status_code, 200)
+        self.assertEqual(self.plan(), [])
+
+    def test_only_owner_and_admins_can_change_the_plan(self):
+        self.assertEqual(self.put([], user=self.other).status_code, 403)
+        self.assertEqual(len(self.plan()), 2)
+        self.assertEqual(self.put([{'title': 'Audit', 'due_date': '2025-05-01'}], user=self.admin).status_code, 200)
+        self.assertEqual(self.plan(), [('Audit', 'Not Started', 0)])
+
+    def test_hidden_ideas_are_not_found(self):
+        Idea.objects.filter(pk=self.idea.pk).update(status='Submitted')
+        self.assertEqual(self.put([], user=self.other).status_code, 404)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_validation_errors_change_nothing(self):
+        other_idea = Idea.objects.create(user=self.owner, title='Library', problem_statement='P', proposed_solution='S')
+        foreign = Milestone.objects.create(idea=other_idea, title='Books', due_date='2025-03-01', status='Not Started')
+        cases = {
+            'foreign id': [{'id': foreign.pk, 'title': 'Books', 'due_date': '2025-03-01'}],
+            'duplicate id': [{'id': self.pilot.pk, 'title': 'A', 'due_date': '2025-03-01'}, {'id': self.pilot.pk, 'title': 'B', 'due_date': '2025-03-01'}],
+            'missing title': [{'due_date': '2025-03-01'}],
+            'bad status': [{'title': 'Launch', 'due_date': '2025-03-01', 'status': 'Done'}],
+            'bad date': [{'title': 'Launch', 'due_date': 'March'}],
+        }
+        for name, milestones in cases.items():
+            with self.subTest(name):
+                self.assertEqual(self.put(milestones).status_code, 400)
+                self.assertEqual(self.plan(), [('Prototype', 'In Progress', 0), ('Pilot', 'Not Started', 1)])
+        self.assertTrue(Milestone.objects.filter(pk=foreign.pk, idea=other_idea).exists())
+
+class IdeaCounterTests(TestCase):
+    def test_saving_a_stale_idea_keeps_concurrent_votes(self):
+        owner, voter = make_user('owner@example.com'), make_user('voter@example.com')
+        idea = Idea.objects.create(user=owner, title='Solar pumps', problem_statement='Dry farms.', proposed_solution='Pumps.', status='Approved')
+        stale = Idea.objects.get(pk=idea.pk)
+        trending.add_vote(idea, voter)
+        stale.title = 'Solar water pumps'
+        stale.save()
+        idea.refresh_from_db()
+        self.assertEqual((idea.title, idea.vote_count), ('Solar water pumps', 1))
+        self.assertEqual(idea.trending_score, trending.trending_score(1, idea.status_changed_at))
+
+    def test_votes_move_the_counter_once_per_voter(self):
+        owner = make_user('owner@example.com')
+        voters = [make_user(f'voter{number}@example.com') for number in range(3)]
+        idea = Idea.objects.create(user=owner, title='Solar pumps', problem_statement='Dry farms.', proposed_solution='Pumps.', status='Approved')
+        for voter in voters:
+            trending.add_vote(idea, voter)
+        self.assertEqual(trending.add_vote(idea, voters[0]), (3, False))
+        self.assertEqual(trending.remove_vote(idea, voters[1]), (2, True))
+        self.assertEqual(trending.remove_vote(idea, voters[1]), (2, False))
+        idea.refresh_from_db()
+        self.assertEqual(idea.vote_count, 2)
+        self.assertEqual(idea.vote_count, idea.votes.count())
+
+    def test_stale_status_change_keeps_concurrent_votes(self):
+        owner, voter = make_user('owner@example.com'), make_user('voter@example.com')
+        idea = Idea.objects.create(user=owner, title='Solar pumps', problem_statement='Dry farms.', proposed_solution='Pumps.', status='Approved')
+        stale = Idea.objects.get(pk=idea.pk)
+        trending.add_vote(idea, voter)
+        stale.status = 'Reviewing'
+        stale.save(update_fields=['status'])
+        idea.refresh_from_db()
+        self.assertEqual((idea.status, idea.vote_count), ('Reviewing', 1))
+
+    def test_vote_on_a_non_numeric_id_is_not_found(self):
+        self.client.force_login(make_user('voter@example.com'))
+        self.assertEqual(self.client.post('/api/projects/ideas/abc/vote/').status_code, 404)
+        self.assertEqual(self.client.delete('/api/projects/ideas/abc/vote/').status_code, 404)
+
+
+
+PUMPS_PROBLEM = 'Farmers in dry counties lose crops every dry season because irrigation depends on expensive diesel pumps.'
+
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        self.owner = make_user('owner@example.com')
+        self.other = make_user('other@example.com')
+        self.base = self.idea(self.owner, 'Solar water pumps for smallholder farms', PUMPS_PROBLEM,
+                              'Rent out solar powered water pumps to farmer groups on a pay as you go plan through mobile money.')
+        # One word changed
+        self.near = self.idea(self.other, 'Solar water pumps for smallholder farms', PUMPS_PROBLEM,
+                              'Rent out solar powered water pumps to farmer cooperatives on a pay as you go plan through mobile money.')
+        # Several words changed
+        self.loose = self.idea(self.other, 'Solar water pumps for small farms',
+                               'Farmers in arid counties lose crops every dry season because irrigation depends on costly diesel pumps.',
+                               'Lease solar powered water pumps to farmer groups on a pay as you go plan through mobile money.')
+        self.unrelated = self.idea(self.other, 'Community library on wheels',
+                                   'Children in informal settlements have no access to books after school hours.',
+                                   'A converted matatu visits estates on a weekly timetable and lends books for free.')
+
+    def idea(self, user, title, problem, solution, status='Approved'):
+        return Idea.objects.create(user=user, title=title, problem_statement=problem, proposed_solution=solution, status=status)
+
+    def test_near_duplicates_are_ranked_and_unrelated_excluded(self):
+        results = similarity.find_similar(similarity.idea_text(self.base), exclude_id=self.base.pk)
+        self.assertEqual([result['id'] for result in results], [self.near.pk, self.loose.pk])
+        self.assertGreater(results[0]['similarity'], results[1]['similarity'])
+        self.assertGreaterEqual(results[1]['similarity'], similarity.MIN_SIMILARITY)
+
+    def test_limit_and_visibility(self):
+        text = similarity.idea_text(self.base)
+        self.assertEqual([r['id'] for r in similarity.find_similar(text, limit=1, exclude_id=self.base.pk)], [self.near.pk])
+        visible = Idea.objects.exclude(pk=self.near.pk)
+        self.assertEqual([r['id'] for r in similarity.find_similar(text, exclude_id=self.base.pk, queryset=visible)], [self.loose.pk])
+
+    def test_edited_text_is_reindexed(self):
+        self.near.title, self.near.problem_statement, self.near.proposed_solution = (
+            self.unrelated.title, self.unrelated.problem_statement, self.unrelated.proposed_solution,
+        )
+        self.near.save()
+        results = similarity.find_similar(similarity.idea_text(self.base), exclude_id=self.base.pk)
+        self.assertEqual([result['id'] for result in results], [self.loose.pk])
+
+    def test_similar_endpoint_hides_ideas_the_member_cannot_see(self):
+        Idea.objects.filter(pk=self.near.pk).update(status='Submitted')
+        self.client.force_login(self.owner)
+        response = self.client.get(f'/api/projects/ideas/{self.base.pk}/similar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.loose.pk])
+        self.client.force_login(self.other)
+        response = self.client.get(f'/api/projects/ideas/{self.base.pk}/similar/')
+        self.assertEqual([result['id'] for result in response.json()['results']], [self.near.pk, self.loose.pk])
+
+    def test_create_returns_similar_ideas(self):
+        self.client.force_login(self.other)
+        response = self.client.post('/api/projects/ideas/', {
+            'title': self.base.title, 'problem_statement': PUMPS_PROBLEM,
+            'proposed_solution': self.base.proposed_solution,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        ids = [result['id'] for result in response.json()['similar_ideas']]
+        self.assertEqual(ids[0], self.base.pk)
+        self.assertNotIn(self.unrelated.pk, ids)
+        self.assertNotIn(response.json()['id'], ids)
+
+
+class StatusTransitionTests(TestCase):
+    def setUp(self):
+        self.owner = make_user('owner@example.com')
+        self.admin = make_user('admin@example.com', role='admin')
+        self.idea = Idea.objects.create(user=self.owner, title='Solar pumps', problem_statement='Dry farms.', proposed_solution='Pumps.')
+
+    def transitions(self):
+        return list(self.idea.status_transitions.values_list('from_status', 'to_status', 'changed_by_id'))
+
+    def counters(self):
+        return dict(IdeaStatusCounter.objects.exclude(current_count=0).values_list('status', 'current_count'))
+
+    def test_creation_is_logged_once(self):
+        self.assertEqual(self.transitions(), [('', 'Submitted', self.owner.pk)])
+        self.assertEqual(self.counters(), {'Submitted': 1})
+
+    def test_status_change_writes_exactly_one_row(self):
+        self.idea.status = 'Reviewing'
+        self.idea._status_changed_by = self.admin
+        self.idea.save()
+        self.assertEqual(self.transitions(), [('', 'Submitted', self.owner.pk), ('Submitted', 'Reviewing', self.admin.pk)])
+        self.assertEqual(self.counters(), {'Reviewing': 1})
+        self.idea.refresh_from_db()
+        self.assertEqual(self.idea.status_changed_at, self.idea.status_transitions.last().changed_at)
+
+    def test_saves_without_a_status_change_write_nothing(self):
+        self.idea.title = 'Solar water pumps'
+        self.idea.save()
+        self.idea.save(update_fields=['title'])
+        self.idea.save(update_fields=['status'])
+        self.assertEqual(len(self.transitions()), 1)
+        self.assertEqual(self.counters(), {'Submitted': 1})
+
+    def test_update_fields_status_change_also_saves_its_timestamp(self):
+        self.idea.status = 'Approved'
+        self.idea.save(update_fields=['status'])
+        stored = Idea.objects.get(pk=self.idea.pk)
+        self.assertIsNotNone(stored.status_changed_at)
+        self.assertEqual(stored.trending_score, trending.trending_score(0, stored.status_changed_at))
+        self.assertEqual(len(self.transitions()), 2)
+
+    def test_api_change_records_who_made_it(self):
+        self.client.force_login(self.admin)
+        response = self.client.patch(f'/api/projects/ideas/{self.idea.pk}/', {'status': 'Rejected'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.transitions()[-1], ('Submitted', 'Rejected', self.admin.pk))
+        self.assertEqual(len(self.transitions()), 2)
+
+class MilestoneVisibilityTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', role='admin')
+        self.member = make_user('member@example.com')
+        self.other = make_user('other@example.com')
+        today = timezone.localdate()
+        for user, status in [(self.member, 'Submitted'), (self.other, 'Submitted'), (self.other, 'Approved')]:
+            idea = Idea.objects.create(user=user, title=f'{status} idea of {user.email}', problem_statement='P', proposed_solution='S', status=status)
+            Milestone.objects.create(idea=idea, title='Prototype', due_date=today - timedelta(days=1), status='In Progress')
+            Milestone.objects.create(idea=idea, title='Pilot', due_date=today + timedelta(days=1), status='Not Started')
+
+    def timeline(self, url, user):
+        self.client.force_login(user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_members_only_see_their_own_and_approved_ideas(self):
+        for url in ['/api/projects/milestones/overdue/', '/api/projects/milestones/upcoming/',
+                    f'/api/projects/milestones/by-owner/?owner={self.other.pk}']:
+            items = self.timeline(url, self.member)
+            self.assertTrue(items, url)
+            self.assertNotIn('Submitted idea of other@example.com', {item['idea_title'] for item in items}, url)
+            self.assertTrue(all('owner_email' not in item for item in items), url)
+        items = self.timeline('/api/projects/milestones/overdue/', self.member)
+        self.assertEqual(
+            sorted(item['idea_title'] for item in items),
+            ['Approved idea of other@example.com', 'Submitted idea of member@example.com'],
+        )
+
+    def test_admins_see_everything_with_emails(self):
+        items = self.timeline('/api/projects/milestones/overdue/', self.admin)
+        self.assertEqual(len(items), 3)
+        self.assertEqual({item['owner_email'] for item in items}, {'member@example.com', 'other@example.com'})
+
+
+class ProposalAccessTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = make_user('owner@example.com')
+        self.other = make_user('other@example.com')
+        self.admin = make_user('admin@example.com', role='admin')
+        self.proposals = {}
+        for status in ['Approved', 'Submitted']:
+            idea = Idea.objects.create(user=self.owner, title=f'{status} idea', problem_statement='P', proposed_solution='S', status=status)
+            upload = SimpleUploadedFile('plan.pdf', b'%PDF-1.4 business plan', content_type='application/pdf')
+            self.proposals[status] = Proposal.objects.create(idea=idea, description='Plan', **store_document(upload))
+
+    def get(self, user, url):
+        self.client.force_login(user)
+        response = self.client.get(url)
+        if hasattr(response, 'streaming_content'):
+            b''.join(response.streaming_content)
+        return response.status_code
+
+    def test_only_owner_and_admins_download_documents(self):
+        url = f'/api/projects/proposals/{self.proposals["Approved"].pk}/document/'
+        self.assertEqual(self.get(self.owner, url), 200)
+        self.assertEqual(self.get(self.admin, url), 200)
+        self.assertEqual(self.get(self.other, url), 404)
+
+    def test_members_see_proposals_of_their_own_and_approved_ideas(self):
+        self.assertEqual(self.get(self.other, f'/api/projects/proposals/{self.proposals["Approved"].pk}/'), 200)
+        self.assertEqual(self.get(self.other, f'/api/projects/proposals/{self.proposals["Submitted"].pk}/'), 404)
+        self.assertEqual(self.get(self.owner, f'/api/projects/proposals/{self.proposals["Submitted"].pk}/'), 200)
@@ -1,45 +1,287 @@
-from rest_framework import viewsets, permissions
+from datetime import timedelta
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.http import HttpResponseRedirect
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from GNET.responses import serve_file
+from projects import pipeline, similarity, trending
+from projects.documents import MAX_DOCUMENT_BYTES, HashingUploadHandler
+from projects.plans import save_milestone_plan
 from projects.models import Idea, Proposal, Milestone
-from projects.serializers import IdeaSerializer, ProposalSerializer, MilestoneSerializer
+from projects.pagination import IdeaFeedPagination, MilestoneTimelinePagination
+from projects.serializers import (
+    IdeaSerializer,
+    ProposalSerializer,
+    MilestoneSerializer,
+    MilestonePlanSerializer,
+    MilestoneTimelineSerializer,
+    IdeaStatusTransitionSerializer,
+)
+
+
+def idea_queryset_with_relations():
+    """
+    Ideas with everything IdeaSerializer nests loaded up front:
+    1 query for ideas + owners, 1 for proposals + approvers, 1 for milestones,
+    no matter how many rows are serialized.
+    """
+    return Idea.objects.select_related('user').prefetch_related(
+        Prefetch('proposals', queryset=Proposal.objects.select_related('approved_by')),
+        'milestones',
+    )
 
 class IdeaViewSet(viewsets.ModelViewSet):
     serializer_class = IdeaSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
+    # Ids only, so /ideas/abc/vote/ is a 404 rather than a ValueError in get_object_or_404
+    lookup_value_regex = r'\d+'
     
     def get_queryset(self):
         user = self.request.user
         
+        queryset = idea_queryset_with_relations()
+        
         # Admin sees everything
         if hasattr(user, 'role') and user.role == 'admin':
-            return Idea.objects.all()
+            return queryset
         
-        # Regular users see their own ideas + approved ones
+        # Regular users see their own ideas + approved ones (one query, one WHERE)
         # This will return an empty queryset if no data exists - that's OK!
-        return Idea.objects.filter(user=user) | Idea.objects.filter(status='approved')
+        return queryset.filter(Q(user=user) | Q(status='Approved'))
     
-    def list(self, request, *args, **kwargs):
-        # Override list to always return 200 even if empty
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+    def create(self, request, *args, **kwargs):
+        """Create the idea and return the closest existing ideas as `similar_ideas`."""
+        response = super().create(request, *args, **kwargs)
+        idea = self.created_idea
+        response.data['similar_ideas'] = similarity.find_similar(
+            similarity.idea_text(idea),
+            exclude_id=idea.id,
+            queryset=self.get_queryset(),
+        )
+        return response
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        self.created_idea = serializer.save(user=self.request.user)
+    
+    def perform_update(self, serializer):
+        # Recorded on the status transition log if the status changes
+        serializer.instance._status_changed_by = self.request.user
+        idea = serializer.save()
+        # DRF drops the prefetched relations after an update; re-read them in
+        # 3 queries rather than one approver query per proposal
+        serializer.instance = idea_queryset_with_relations().get(pk=idea.pk)
+    
+    @action(detail=False, methods=['get'])
+    def funnel(self, request):
+        """
+        Idea pipeline funnel: ideas currently in each status, how many have
+        entered/left it, and the average time spent there.
+        
+        GET /api/projects/ideas/funnel/
+        
+        Served from running counters, so the cost doesn't grow with the number of ideas.
+        """
+        return Response({'stages': pipeline.funnel()}, status=200)
+    
+    @action(detail=True, methods=['get'], url_path='status-history')
+    def status_history(self, request, pk=None):
+        """
+        GET /api/projects/ideas/{id}/status-history/
+        """
+        idea = self.get_object()
+        transitions = idea.status_transitions.select_related('changed_by')
+        return Response(IdeaStatusTransitionSerializer(transitions, many=True).data, status=200)
+    
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Existing ideas that look like near-duplicates of this one.
+        
+        GET /api/projects/ideas/{id}/similar/?limit=5
+        """
+        idea = self.get_object()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 5)), 20))
+        except ValueError:
+            limit = 5
+        results = similarity.find_similar(
+            similarity.idea_text(idea),
+            limit=limit,
+            exclude_id=idea.id,
+            queryset=self.get_queryset(),
+        )
+        return Response({'results': results}, status=200)
+    
+    @action(detail=True, methods=['get', 'put'], url_path='milestone-plan')
+    def milestone_plan(self, request, pk=None):
+        """
+        Read or replace an idea's whole milestone plan in one request.
+        
+        GET /api/projects/ideas/{id}/milestone-plan/
+        PUT /api/projects/ideas/{id}/milestone-plan/
+        {"milestones": [{"id": 3, "title": "...", "due_date": "2025-03-01", "status": "In Progress"},
+                        {"title": "New step", "due_date": "2025-04-01"}]}
+        
+        Rows with an id are updated, rows without one are created, and
+        milestones left out of the plan are deleted. `order` defaults to
+        the row's position. Only the idea owner or an admin can change it.
+        """
+        idea = self.get_object()
+        
+        if request.method == 'PUT':
+            if idea.user_id != request.user.id and request.user.role != 'admin':
+                return Response(
+                    {'detail': 'Only the idea owner can change its milestone plan.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            serializer = MilestonePlanSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            milestones = save_milestone_plan(idea, serializer.validated_data['milestones'])
+        else:
+            milestones = Milestone.objects.filter(idea=idea).order_by('order', 'id')
+        
+        return Response({'milestones': MilestoneSerializer(milestones, many=True).data}, status=200)
+    
+    @action(detail=True, methods=['post', 'delete'])
+    def vote(self, request, pk=None):
+        """
+        Upvote an approved idea, or withdraw the upvote.
+        
+        POST   /api/projects/ideas/{id}/vote/
+        DELETE /api/projects/ideas/{id}/vote/
+        
+        Both are idempotent; the response carries the new vote count.
+        """
+        idea = get_object_or_404(Idea.objects.only('id', 'status'), pk=pk, status='Approved')
+        
+        if request.method == 'POST':
+            vote_count, _ = trending.add_vote(idea, request.user)
+            voted = True
+        else:
+            vote_count, _ = trending.remove_vote(idea, request.user)
+            voted = False
+        
+        return Response({'id': idea.id, 'vote_count': vote_count, 'voted': voted}, status=200)
+    
+    def _ranked(self, request, ordering):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+        except ValueError:
+            limit = 20
+        ideas = idea_queryset_with_relations().filter(status='Approved').order_by(*ordering)[:limit]
+        return Response(self.get_serializer(ideas, many=True).data, status=200)
+    
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """
+        Approved ideas ranked by votes with time decay.
+        
+        GET /api/projects/ideas/trending/?limit=20
+        """
+        return self._ranked(request, ['-trending_score', '-id'])
+    
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """
+        Approved ideas with the most votes of all time.
+        
+        GET /api/projects/ideas/top/?limit=20
+        """
+        return self._ranked(request, ['-vote_count', '-id'])
+    
+    @action(detail=False, methods=['get'], pagination_class=IdeaFeedPagination)
+    def feed(self, request):
+        """
+        Cursor-paginated idea feed (own ideas + approved ones, or everything for admins).
+        
+        GET /api/projects/ideas/feed/?page_size=20
+        Follow `next` for the following page. Each page costs a fixed
+        three queries regardless of how many proposals/milestones ideas have.
+        """
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class ProposalViewSet(viewsets.ModelViewSet):
     serializer_class = ProposalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('-created_at', '-id')
+    
+    def initialize_request(self, request, *args, **kwargs):
+        # Stream uploads to a temp file while hashing them, instead of
+        # Django's default of buffering small files in memory
+        request.upload_handlers = [HashingUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
     
     def get_queryset(self):
-        # Return all proposals for now - adjust as needed
-        return Proposal.objects.all()
+        user = self.request.user
+        queryset = Proposal.objects.select_related('approved_by')
+        
+        if hasattr(user, 'role') and user.role == 'admin':
+            return queryset
+        
+        # Like IdeaViewSet: proposals of the member's own ideas + approved ones
+        queryset = queryset.filter(Q(idea__user=user) | Q(idea__status='Approved'))
+        if self.action == 'document':
+            # Uploaded business documents only go to the idea's owner (and admins)
+            queryset = queryset.filter(idea__user=user)
+        return queryset
+    
+    def _reject_oversized(self, request):
+        if getattr(request._request, 'oversized_uploads', None):
+            limit_mb = MAX_DOCUMENT_BYTES // (1024 * 1024)
+            return Response(
+                {'document': [f'File too large. The limit is {limit_mb} MB.']},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        return None
     
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=200)
+    def create(self, request, *args, **kwargs):
+        # Touch request.data first so the upload (and any size rejection) is processed
+        request.data
+        return self._reject_oversized(request) or super().create(request, *args, **kwargs)
+    
+    def update(self, request, *args, **kwargs):
+        request.data
+        return self._reject_oversized(request) or super().update(request, *args, **kwargs)
+    
+    @action(detail=True, methods=['get', 'head'])
+    def document(self, request, pk=None):
+        """
+        Download the uploaded proposal document.
+        
+        GET /api/projects/proposals/{id}/document/
+        
+        Supports Range requests (resumable downloads, PDF page streaming) and
+        If-None-Match. Proposals that only have an external document_url
+        redirect there.
+        """
+        proposal = self.get_object()
+        if not proposal.document:
+            if proposal.document_url:
+                return HttpResponseRedirect(proposal.document_url)
+            return Response({'detail': 'This proposal has no document.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            fileobj = proposal.document.open('rb')
+        except FileNotFoundError:
+            return Response({'detail': 'Document file is missing.'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return serve_file(
+            request._request,
+            fileobj,
+            size=proposal.document.size,
+            etag=proposal.document_sha256,
+            content_type=proposal.document_content_type or 'application/octet-stream',
+            filename=proposal.document_name,
+            # Content-addressed: the bytes behind this ETag never change
+            cache_control='private, max-age=86400',
+        )
 
 
 class MilestoneViewSet(viewsets.ModelViewSet):
@@ -47,4 +289,63 @@ class MilestoneViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Milestone.objects.all()
\ No newline at end of file
+        user = self.request.user
+        
+        # Admin sees everything
+        if hasattr(user, 'role') and user.role == 'admin':
+            return Milestone.objects.all()
+        
+        # Same visibility as IdeaViewSet: milestones of your own ideas + approved ones
+        return Milestone.objects.filter(Q(idea__user=user) | Q(idea__status='Approved'))
+    
+    def _timeline(self, queryset):
+        queryset = queryset.select_related('idea__user')
+        page = self.paginate_queryset(queryset)
+        serializer = MilestoneTimelineSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=['get'], pagination_class=MilestoneTimelinePagination)
+    def overdue(self, request):
+        """
+        Open milestones whose due date has passed, across all ideas you can see.
+        
+        GET /api/projects/milestones/overdue/
+        """
+        return self._timeline(self.get_queryset().filter(
+            status__in=Milestone.OPEN_STATUSES,
+            due_date__lt=timezone.localdate(),
+        ))
+    
+    @action(detail=False, methods=['get'], pagination_class=MilestoneTimelinePagination)
+    def upcoming(self, request):
+        """
+        Open milestones due within the next N days (default 7, max 365).
+        
+        GET /api/projects/milestones/upcoming/?days=14
+        """
+        try:
+            days = max(0, min(int(request.query_params.get('days', 7)), 365))
+        except ValueError:
+            days = 7
+        today = timezone.localdate()
+        return self._timeline(self.get_queryset().filter(
+            status__in=Milestone.OPEN_STATUSES,
+            due_date__gte=today,
+            due_date__lte=today + timedelta(days=days),
+        ))
+    
+    @action(detail=False, methods=['get'], url_path='by-owner', pagination_class=MilestoneTimelinePagination)
+    def by_owner(self, request):
+        """
+        Open milestones across every idea owned by one member (default: you)
+        that you can see.
+        
+        GET /api/projects/milestones/by-owner/?owner=<user id>&include_completed=true
+        """
+        owner = request.query_params.get('owner')
+        if owner and not owner.isdigit():
+            return Response({'detail': 'owner must be a numeric user id'}, status=400)
+        queryset = self.get_queryset().filter(idea__user_id=int(owner) if owner else request.user.id)
+        if request.query_params.get('include_completed', '').lower() not in ('1', 'true', 'yes'):
+            queryset = queryset.filter(status__in=Milestone.OPEN_STATUSES)
+        return self._timeline(queryset)
\ No newline at end of file